@@ -0,0 +1,56 @@
+"""
+Microbenchmark for vela.core.adjustments.calculate_adjustment_amounts_batch against calculate_adjustment_amounts.
+
+usage: python -m benchmarks.adjustments [--transactions N]
+"""
+
+import argparse
+import random
+import timeit
+
+from decimal import Decimal
+
+from vela.core.adjustments import calculate_adjustment_amounts_batch, compile_adjustment_rules
+from vela.core.utils import calculate_adjustment_amounts
+from vela.enums import LoyaltyTypes
+from vela.models.retailer import Campaign, EarnRule, RewardRule
+
+CAMPAIGNS = [
+    Campaign(
+        slug="accumulator",
+        loyalty_type=LoyaltyTypes.ACCUMULATOR,
+        earn_rules=[EarnRule(threshold=500, increment=None, increment_multiplier=Decimal("1.50"), max_amount=2000)],
+        reward_rule=RewardRule(allocation_window=7),
+    ),
+    Campaign(
+        slug="stamps",
+        loyalty_type=LoyaltyTypes.STAMPS,
+        earn_rules=[EarnRule(threshold=500, increment=100, increment_multiplier=Decimal("1.00"), max_amount=0)],
+        reward_rule=RewardRule(allocation_window=0),
+    ),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=10000)
+    args = parser.parse_args()
+
+    tx_amounts = [random.randint(-5000, 5000) for _ in range(args.transactions)]  # noqa: S311
+    expected = [calculate_adjustment_amounts(CAMPAIGNS, tx_amount) for tx_amount in tx_amounts]
+    if calculate_adjustment_amounts_batch(CAMPAIGNS, tx_amounts) != expected:
+        raise ValueError("batched adjustments do not match calculate_adjustment_amounts")
+
+    scalar_time = timeit.timeit(
+        lambda: [calculate_adjustment_amounts(CAMPAIGNS, tx_amount) for tx_amount in tx_amounts], number=5
+    )
+    rule_table = compile_adjustment_rules(CAMPAIGNS)
+    batch_time = timeit.timeit(lambda: calculate_adjustment_amounts_batch(rule_table, tx_amounts), number=5)
+    print(  # noqa: T201
+        f"{args.transactions} transactions: per transaction {scalar_time / 5 * 1e3:.1f}ms, "
+        f"batched {batch_time / 5 * 1e3:.1f}ms, speedup {scalar_time / batch_time:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Microbenchmark for vela.activity_utils.utils.pence_integer_to_currency_string against babel's format_currency.
+
+usage: python -m benchmarks.currency_format [--number N]
+"""
+
+import argparse
+import timeit
+
+from collections.abc import Callable
+
+from babel.numbers import format_currency
+
+from vela.activity_utils.utils import pence_integer_to_currency_string
+
+VALUES = (0, 1, -1, 99, 1188, -1188, 110099, -3210099)
+
+
+def babel_format(value: int, currency: str, currency_sign: bool = True) -> str:
+    return format_currency(
+        number=value / 100,
+        currency=currency,
+        locale="en_GB",
+        format=None if currency_sign else "#,##0.##",
+    )
+
+
+def _run(func: Callable[[int, str, bool], str], currency: str, currency_sign: bool, number: int) -> float:
+    return timeit.timeit(lambda: [func(value, currency, currency_sign) for value in VALUES], number=number) / (
+        number * len(VALUES)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'case':<24}{'babel (us)':>12}{'vela (us)':>12}{'speedup':>10}")  # noqa: T201
+    for currency, currency_sign in (("GBP", True), ("GBP", False), ("EUR", True), ("EUR", False)):
+        for value in VALUES:
+            if pence_integer_to_currency_string(value, currency, currency_sign) != babel_format(
+                value, currency, currency_sign
+            ):
+                raise ValueError(f"{currency} {value} does not match babel's output")
+
+        babel_time = _run(babel_format, currency, currency_sign, args.number)
+        vela_time = _run(pence_integer_to_currency_string, currency, currency_sign, args.number)
+        case = f"{currency} sign={currency_sign}"
+        print(f"{case:<24}{babel_time * 1e6:>12.2f}{vela_time * 1e6:>12.2f}{babel_time / vela_time:>9.1f}x")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
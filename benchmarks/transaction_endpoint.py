@@ -0,0 +1,354 @@
+"""
+Load test for the record_transaction endpoint.
+
+The app is driven in process through httpx's ASGI transport by --concurrency clients. Polaris and Carina are replaced
+by a local aiohttp stand-in server and RabbitMQ by a publisher that only counts the activities it is handed. Postgres
+and Redis are the ones configured in vela.core.config.settings: point them at a dedicated database migrated with
+`alembic upgrade head` and a redis nothing else is using, as redis ops are read from the server's command counter.
+Each run creates its own retailer and campaign and leaves them in place.
+
+With --drain-tasks the reward adjustment tasks enqueued by the run are then processed by in process task workers,
+against the same stand-ins.
+
+usage: python -m benchmarks.transaction_endpoint [--requests N] [--concurrency N] [--output results.json]
+                                                 [--baseline previous_results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from random import randint
+from threading import Thread
+from typing import TYPE_CHECKING, Any
+from uuid import uuid4
+
+import httpx
+
+from aiohttp import web
+from retry_tasks_lib.utils.error_handler import job_meta_handler
+from sqlalchemy import event
+
+from vela import create_app
+from vela.activity_utils import tasks as activity_tasks
+from vela.api.tasks import flush_enqueued_tasks
+from vela.core.config import redis_raw, settings
+from vela.db.session import SyncSessionMaker, async_engine, sync_engine
+from vela.enums import CampaignStatuses
+from vela.models import Campaign, EarnRule, RetailerRewards, RetailerStore, RewardRule
+from vela.tasks import requests_session_manager
+from vela.tasks.worker import ThreadWorker
+
+if TYPE_CHECKING:  # pragma: no cover
+    from kombu import Connection, Exchange
+
+ACCOUNT_HOLDERS_CREATED_AT = (datetime.now(tz=timezone.utc) - timedelta(days=1)).timestamp()
+COMPARED_METRICS = (
+    "req_per_s",
+    "latency_ms.p50",
+    "latency_ms.p95",
+    "latency_ms.p99",
+    "db_queries_per_request",
+    "redis_ops_per_request",
+)
+
+
+class StandIns:
+    """The Polaris and Carina endpoints called by the transaction endpoint and by the reward adjustment task."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.requests: Counter[str] = Counter()
+        self.balances: Counter[tuple[str, str]] = Counter()
+        self.base_url = ""
+        self._runner: web.AppRunner | None = None
+
+    async def _account_status(self, request: web.Request) -> web.Response:  # noqa: ARG002
+        self.requests["polaris_account_status"] += 1
+        await asyncio.sleep(self.latency)
+        return web.json_response({"status": "active", "created_at": ACCOUNT_HOLDERS_CREATED_AT})
+
+    async def _adjustment(self, request: web.Request) -> web.Response:
+        self.requests["polaris_adjustment"] += 1
+        body = await request.json()
+        key = (request.match_info["account_holder_uuid"], body["campaign_slug"])
+        self.balances[key] += body["balance_change"]
+        await asyncio.sleep(self.latency)
+        return web.json_response({"campaign_slug": body["campaign_slug"], "new_balance": self.balances[key]})
+
+    async def _accepted(self, request: web.Request) -> web.Response:
+        self.requests[request.match_info.route.name or "other"] += 1
+        await asyncio.sleep(self.latency)
+        return web.json_response({}, status=202)
+
+    async def start(self) -> None:
+        stand_ins = web.Application()
+        stand_ins.router.add_get("/loyalty/{retailer_slug}/accounts/{account_holder_uuid}/status", self._account_status)
+        stand_ins.router.add_post(
+            "/loyalty/{retailer_slug}/accounts/{account_holder_uuid}/adjustments", self._adjustment
+        )
+        stand_ins.router.add_post(
+            "/loyalty/{retailer_slug}/accounts/{account_holder_uuid}/pendingrewardallocation",
+            self._accepted,
+            name="polaris_pending_reward_allocation",
+        )
+        stand_ins.router.add_post(
+            "/rewards/{retailer_slug}/rewards/{reward_slug}/allocation", self._accepted, name="carina_allocation"
+        )
+
+        self._runner = web.AppRunner(stand_ins, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", 0).start()
+        host, port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+class QueryCounter:
+    """Counts the statements sent to postgres by both the async and the sync engine."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def _before_cursor_execute(self, *args: Any) -> None:  # noqa: ARG002
+        self.count += 1
+
+    def __enter__(self) -> "QueryCounter":
+        for engine in (async_engine.sync_engine, sync_engine):
+            event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        for engine in (async_engine.sync_engine, sync_engine):
+            event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+
+
+def _redis_commands_processed() -> int:
+    # the INFO command itself is counted too
+    return redis_raw.info("stats")["total_commands_processed"] - 1
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True).strip()  # noqa: S603, S607
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _create_retailer(run_id: str) -> tuple[str, str]:
+    retailer_slug = f"bench-{run_id}"
+    mid = f"bench-mid-{run_id}"
+    with SyncSessionMaker() as db_session:
+        retailer = RetailerRewards(slug=retailer_slug)
+        db_session.add(retailer)
+        db_session.flush()
+        campaign = Campaign(
+            retailer_id=retailer.id,
+            slug=f"bench-campaign-{run_id}",
+            name="benchmark campaign",
+            status=CampaignStatuses.ACTIVE,
+            start_date=datetime.now(tz=timezone.utc) - timedelta(days=1),
+        )
+        db_session.add(campaign)
+        db_session.flush()
+        db_session.add_all(
+            [
+                EarnRule(campaign_id=campaign.id, threshold=500, increment=100, increment_multiplier=1),
+                RewardRule(campaign_id=campaign.id, reward_goal=1000, reward_slug="bench-reward"),
+                RetailerStore(retailer_id=retailer.id, mid=mid, store_name="Benchmark store"),
+            ]
+        )
+        db_session.commit()
+
+    return retailer_slug, mid
+
+
+def _transaction_payloads(n: int, mid: str, account_holders: list[str], prefix: str) -> list[dict]:
+    tx_datetime = str(int((datetime.now(tz=timezone.utc) - timedelta(minutes=1)).timestamp()))
+    return [
+        {
+            "id": str(uuid4()),
+            "transaction_id": f"bench-{prefix}-{i}",
+            "transaction_total": randint(100, 2000),  # noqa: S311
+            "datetime": tx_datetime,
+            "MID": mid,
+            "loyalty_id": account_holders[i % len(account_holders)],
+        }
+        for i in range(n)
+    ]
+
+
+async def _drive(
+    client: httpx.AsyncClient, path: str, payloads: list[dict], concurrency: int
+) -> tuple[list[float], Counter[int]]:
+    latencies: list[float] = []
+    responses: Counter[int] = Counter()
+    pending = iter(payloads)
+    headers = {"Authorization": f"Token {settings.VELA_API_AUTH_TOKEN}"}
+
+    async def _client() -> None:
+        for payload in pending:
+            start = time.perf_counter()
+            resp = await client.post(path, json=payload, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            responses[resp.status_code] += 1
+
+    await asyncio.gather(*(_client() for _ in range(concurrency)))
+    return latencies, responses
+
+
+def _drain_tasks(concurrency: int) -> None:
+    threads = [
+        Thread(
+            target=ThreadWorker(
+                queues=settings.TASK_QUEUES,
+                name=f"bench-{uuid4().hex}",
+                connection=redis_raw,
+                exception_handlers=[job_meta_handler],
+            ).work,
+            kwargs={"burst": True},
+        )
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    finally:
+        requests_session_manager.close()
+
+
+async def run(args: argparse.Namespace) -> dict:
+    stand_ins = StandIns(latency=args.stand_in_latency_ms / 1000)
+    await stand_ins.start()
+    settings.POLARIS_BASE_URL = f"{stand_ins.base_url}/loyalty"
+    settings.CARINA_BASE_URL = f"{stand_ins.base_url}/rewards"
+
+    activities: Counter[str] = Counter()
+
+    def _send_activity(connection: "Connection", exchange: "Exchange", payload: dict, routing_key: str) -> None:
+        activities[routing_key] += 1
+
+    activity_tasks.verify_payload_and_send_activity = _send_activity
+
+    run_id = uuid4().hex[:8]
+    retailer_slug, mid = _create_retailer(run_id)
+    account_holders = [str(uuid4()) for _ in range(args.account_holders)]
+    warmup_payloads = _transaction_payloads(args.warmup, mid, account_holders, prefix="warmup")
+    payloads = _transaction_payloads(args.requests, mid, account_holders, prefix="run")
+    path = f"{settings.API_PREFIX}/{retailer_slug}/transaction"
+
+    app = create_app()
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    try:
+        with QueryCounter() as query_counter:
+            async with (
+                app.router.lifespan_context(app),
+                httpx.AsyncClient(transport=transport, base_url="http://vela") as client,
+            ):
+                await _drive(client, path, warmup_payloads, args.concurrency)
+                await flush_enqueued_tasks()
+                activities.clear()
+                query_counter.count = 0
+                redis_commands = _redis_commands_processed()
+
+                start = time.perf_counter()
+                latencies, responses = await _drive(client, path, payloads, args.concurrency)
+                duration = time.perf_counter() - start
+
+            # the app's shutdown flushes the retry tasks and activities still pending, their cost is counted too
+            redis_commands = _redis_commands_processed() - redis_commands
+            db_queries = query_counter.count
+
+        task_drain_s = None
+        if args.drain_tasks:
+            start = time.perf_counter()
+            await asyncio.to_thread(_drain_tasks, args.concurrency)
+            task_drain_s = round(time.perf_counter() - start, 3)
+    finally:
+        await stand_ins.stop()
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    percentiles = statistics.quantiles(latencies_ms, n=100, method="inclusive")
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(tz=timezone.utc).isoformat(),
+        "environment": {"python": platform.python_version(), "cpus": os.cpu_count()},
+        "config": {
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "account_holders": args.account_holders,
+            "stand_in_latency_ms": args.stand_in_latency_ms,
+        },
+        "responses": {str(status_code): n for status_code, n in sorted(responses.items())},
+        "duration_s": round(duration, 3),
+        "req_per_s": round(args.requests / duration, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies_ms), 2),
+            "p50": round(percentiles[49], 2),
+            "p95": round(percentiles[94], 2),
+            "p99": round(percentiles[98], 2),
+            "max": round(latencies_ms[-1], 2),
+        },
+        "db_queries_per_request": round(db_queries / args.requests, 2),
+        "redis_ops_per_request": round(redis_commands / args.requests, 2),
+        "activities_per_request": round(sum(activities.values()) / args.requests, 2),
+        "stand_in_requests": dict(stand_ins.requests),
+        "task_drain_s": task_drain_s,
+    }
+
+
+def _metric(results: dict, name: str) -> float:
+    value: Any = results
+    for key in name.split("."):
+        value = value[key]
+    return value
+
+
+def compare(baseline: dict, results: dict) -> list[str]:
+    lines = [f"compared to {baseline.get('commit') or 'baseline'}:"]
+    for name in COMPARED_METRICS:
+        old, new = _metric(baseline, name), _metric(results, name)
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        lines.append(f"  {name}: {old} -> {new} ({change})")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--account-holders", type=int, default=500)
+    parser.add_argument("--stand-in-latency-ms", type=float, default=5)
+    parser.add_argument("--drain-tasks", action="store_true")
+    parser.add_argument("--output", help="write the results to this file instead of stdout")
+    parser.add_argument("--baseline", help="results of a previous run to compare against")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))  # noqa: T201
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            print("\n".join(compare(json.load(f), results)))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -220,6 +220,66 @@ def test_update_multiple_campaigns_ok(
     assert mock_async_send_activity.call_count == len(campaigns_to_update)
 
 
+def test_update_multiple_campaigns_partial_carina_failure(
+    setup: SetupType,
+    create_mock_campaign: Callable,
+    create_mock_reward_rule: Callable,
+    reward_rule: RewardRule,
+    delete_campaign_balances_task_type: TaskType,
+    mocker: MockerFixture,
+) -> None:
+    """Test that the campaigns carina has updated are updated in vela when carina fails for another campaign"""
+    db_session, retailer, campaign = setup
+
+    campaign.status = CampaignStatuses.ACTIVE
+    db_session.commit()
+    second_campaign: Campaign = create_mock_campaign(
+        **{"status": CampaignStatuses.ACTIVE, "name": "secondtestcampaign", "slug": "second-test-campaign"}
+    )
+    create_mock_reward_rule(reward_slug="second-reward-type", campaign_id=second_campaign.id)
+    create_mock_campaign(
+        **{"status": CampaignStatuses.ACTIVE, "name": "thirdtestcampaign", "slug": "third-test-campaign"}
+    )
+
+    mock_carina_resp_msg = "Carina responded with: 404 - Reward slug does not exist"
+
+    async def _put_carina_campaign(campaign_slug: str, **kwargs: str) -> tuple[int, str]:
+        if campaign_slug == second_campaign.slug:
+            return fastapi_http_status.HTTP_404_NOT_FOUND, mock_carina_resp_msg
+        return fastapi_http_status.HTTP_200_OK, "Carina responded with: 200"
+
+    mocker.patch("vela.api.endpoints.campaign.put_carina_campaign", side_effect=_put_carina_campaign)
+    mock_enqueue_many_tasks = mocker.patch("vela.api.endpoints.campaign.enqueue_many_tasks")
+    mock_async_send_activity = mocker.patch("vela.api.endpoints.campaign.async_send_activity")
+
+    resp = client.post(
+        f"{settings.API_PREFIX}/{retailer.slug}/campaigns/status_change",
+        json={
+            "requested_status": "ended",
+            "campaign_slugs": [campaign.slug, second_campaign.slug],
+            "activity_metadata": {"sso_username": "Jane Doe"},
+        },
+        headers=auth_headers,
+    )
+
+    assert resp.status_code == fastapi_http_status.HTTP_404_NOT_FOUND
+    assert resp.json() == {
+        "display_message": f"Unable to update campaign: {second_campaign.slug} due to upstream errors. "
+        f"Carina responses: {{'{campaign.slug}': 'Carina responded with: 200', "
+        f"'{second_campaign.slug}': '{mock_carina_resp_msg}'}}. "
+        f"Successfully updated campaigns: ['{campaign.slug}'].",
+        "code": "CARINA_RESPONSE_ERROR",
+    }
+
+    db_session.refresh(campaign)
+    assert campaign.status == CampaignStatuses.ENDED
+    db_session.refresh(second_campaign)
+    assert second_campaign.status == CampaignStatuses.ACTIVE
+    mock_enqueue_many_tasks.assert_called_once()
+    assert len(mock_enqueue_many_tasks.call_args.kwargs["retry_tasks_ids"]) == 1
+    mock_async_send_activity.assert_called_once()
+
+
 def test_status_change_mangled_json(setup: SetupType) -> None:
     retailer = setup.retailer
 
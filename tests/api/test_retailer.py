@@ -5,13 +5,15 @@ from typing import TYPE_CHECKING, Any
 import pytest
 
 from fastapi.testclient import TestClient
+from pytest_mock import MockerFixture
 from sqlalchemy.exc import StatementError
 from sqlalchemy.future import select
 from starlette import status
 
 from asgi import app
+from vela import crud
 from vela.core.config import settings
-from vela.enums import RewardCap
+from vela.enums import RetailerStatuses, RewardCap
 from vela.models import Campaign, RetailerRewards
 from vela.models.retailer import RewardRule
 
@@ -124,3 +126,21 @@ def test_reward_cap_enum_invalid(setup: SetupType, reward_rule: RewardRule) -> N
         == f"'{invalid_reward_cap}' is not among the defined enum values. Enum name: rewardcap."
         " Possible values: 1, 2, 3, ..., 10"
     )
+
+
+def test_retailer_is_valid_uses_cached_retailer(setup: SetupType, mocker: MockerFixture) -> None:
+    db_session, retailer, _ = setup
+    spy = mocker.spy(crud, "get_retailer_by_slug")
+
+    for _ in range(2):
+        resp = client.get(f"{settings.API_PREFIX}/{retailer.slug}/active-campaign-slugs", headers=auth_headers)
+        assert resp.status_code == status.HTTP_200_OK
+
+    assert spy.call_count == 1
+
+    retailer.status = RetailerStatuses.ACTIVE
+    db_session.commit()
+
+    resp = client.get(f"{settings.API_PREFIX}/{retailer.slug}/active-campaign-slugs", headers=auth_headers)
+    assert resp.status_code == status.HTTP_200_OK
+    assert spy.call_count == 2
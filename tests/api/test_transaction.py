@@ -2,7 +2,7 @@ from collections.abc import Callable
 from copy import deepcopy
 from datetime import datetime, timedelta, timezone
 from typing import TYPE_CHECKING
-from unittest.mock import MagicMock, call
+from unittest.mock import ANY, MagicMock
 from uuid import uuid4
 
 import pytest
@@ -15,7 +15,9 @@ from sqlalchemy import func, select
 
 from asgi import app
 from tests.conftest import SetupType
+from vela import crud
 from vela.activity_utils.enums import ActivityType
+from vela.caches.account_holders import account_holder_status_cache
 from vela.core.config import settings
 from vela.enums import CampaignStatuses, LoyaltyTypes, TransactionProcessingStatuses
 from vela.models import EarnRule, ProcessedTransaction, RetailerRewards, Transaction
@@ -25,6 +27,8 @@ if TYPE_CHECKING:
     from retry_tasks_lib.db.models import TaskType
     from sqlalchemy.orm import Session
 
+    from vela.activity_utils.deferred import DeferredActivity
+
 client = TestClient(app, raise_server_exceptions=False)
 auth_headers = {"Authorization": f"Token {settings.VELA_API_AUTH_TOKEN}"}
 
@@ -34,6 +38,17 @@ timestamp_now = int(datetime_now.timestamp())
 account_holder_created_at = (datetime_now - timedelta(days=1)).timestamp()
 
 
+def _patch_async_send_activity(mocker: MockerFixture) -> list[tuple[dict, str]]:
+    """Patches async_send_activity, returns the list each sent activity's payload and routing key is appended to"""
+    sent_activities: list[tuple[dict, str]] = []
+
+    async def _send(activity: "DeferredActivity", *, routing_key: str) -> None:
+        sent_activities.append((activity.payload(), routing_key))
+
+    mocker.patch("vela.api.endpoints.transaction.async_send_activity", side_effect=_send)
+    return sent_activities
+
+
 @pytest.fixture(scope="function")
 def payload() -> dict:
     return {
@@ -70,7 +85,7 @@ def test_post_transaction_happy_path(
         "vela.activity_utils.enums.ActivityType.get_processed_tx_activity_data",
         return_value={"mock": "payload"},
     )
-    mock_async_send_activity = mocker.patch("vela.api.endpoints.transaction.async_send_activity")
+    sent_activities = _patch_async_send_activity(mocker)
     create_mock_reward_rule(reward_slug="negative-test-reward", campaign_id=campaign.id, reward_goal=10)
 
     resp = client.post(f"{settings.API_PREFIX}/{retailer.slug}/transaction", json=payload, headers=auth_headers)
@@ -102,15 +117,13 @@ def test_post_transaction_happy_path(
         "error": "N/A",
     }
     mock_get_tx_import_activity_data.assert_called_once_with(
-        transaction=transaction_data,
-        data=tx_import_activity_data,
+        transaction=transaction_data, data=tx_import_activity_data, activity_datetime=ANY
     )
     mock_get_processed_tx_activity_data.assert_called_once()
-    expected_calls = [  # The expected call stack for send_activity, in order
-        call().send({"mock": "payload"}, routing_key=ActivityType.TX_HISTORY.value),
-        call().send({"mock": "payload"}, routing_key=ActivityType.TX_IMPORT.value),
+    assert sent_activities == [  # in the order they were sent
+        ({"mock": "payload"}, ActivityType.TX_HISTORY.value),
+        ({"mock": "payload"}, ActivityType.TX_IMPORT.value),
     ]
-    mock_async_send_activity.assert_has_calls(expected_calls)
 
 
 def test_post_transaction_not_awarded(
@@ -158,7 +171,7 @@ def test_post_transaction_no_active_campaigns(
         "vela.activity_utils.enums.ActivityType.get_tx_import_activity_data",
         return_value={"mock": "payload"},
     )
-    mock_async_send_activity = mocker.patch("vela.api.endpoints.transaction.async_send_activity")
+    sent_activities = _patch_async_send_activity(mocker)
 
     resp = client.post(f"{settings.API_PREFIX}/{retailer.slug}/transaction", json=payload, headers=auth_headers)
 
@@ -188,10 +201,9 @@ def test_post_transaction_no_active_campaigns(
         "error": "NO_ACTIVE_CAMPAIGNS",
     }
     mock_get_tx_import_activity_data.assert_called_once_with(
-        transaction=transaction_data,
-        data=tx_import_activity_data,
+        transaction=transaction_data, data=tx_import_activity_data, activity_datetime=ANY
     )
-    mock_async_send_activity.assert_called_once_with({"mock": "payload"}, routing_key=ActivityType.TX_IMPORT.value)
+    assert sent_activities == [({"mock": "payload"}, ActivityType.TX_IMPORT.value)]
 
 
 def test_post_transaction_no_active_campaigns_pre_start_date(
@@ -269,7 +281,7 @@ def test_post_transaction_account_holder_created_after_tx_datetime(
         "vela.activity_utils.enums.ActivityType.get_tx_import_activity_data",
         return_value={"mock": "payload"},
     )
-    mock_async_send_activity = mocker.patch("vela.api.endpoints.transaction.async_send_activity")
+    sent_activities = _patch_async_send_activity(mocker)
     create_mock_reward_rule(reward_slug="negative-test-reward", campaign_id=campaign.id, reward_goal=10)
 
     resp = client.post(f"{settings.API_PREFIX}/{retailer.slug}/transaction", json=payload, headers=auth_headers)
@@ -291,10 +303,9 @@ def test_post_transaction_account_holder_created_after_tx_datetime(
         "error": "INVALID_TX_DATE",
     }
     mock_get_tx_import_activity_data.assert_called_once_with(
-        transaction=transaction_data,
-        data=tx_import_activity_data,
+        transaction=transaction_data, data=tx_import_activity_data, activity_datetime=ANY
     )
-    mock_async_send_activity.assert_called_once_with({"mock": "payload"}, routing_key=ActivityType.TX_IMPORT.value)
+    assert sent_activities == [({"mock": "payload"}, ActivityType.TX_IMPORT.value)]
 
 
 def test_post_transaction_existing_transaction(
@@ -322,7 +333,7 @@ def test_post_transaction_existing_transaction(
         "vela.activity_utils.enums.ActivityType.get_processed_tx_activity_data",
         return_value={"mock": "payload"},
     )
-    mock_async_send_activity = mocker.patch("vela.api.endpoints.transaction.async_send_activity")
+    sent_activities = _patch_async_send_activity(mocker)
     create_mock_reward_rule(reward_slug="negative-test-reward", campaign_id=campaign.id, reward_goal=10)
 
     resp = client.post(f"{settings.API_PREFIX}/{retailer_slug}/transaction", json=payload, headers=auth_headers)
@@ -355,16 +366,14 @@ def test_post_transaction_existing_transaction(
         "error": "DUPLICATE_TRANSACTION",
     }
     mock_get_tx_import_activity_data.assert_called_with(
-        transaction=transaction_data,
-        data=tx_import_activity_data,
+        transaction=transaction_data, data=tx_import_activity_data, activity_datetime=ANY
     )
     mock_get_processed_tx_activity_data.assert_called_once()
-    expected_calls = [  # The expected call stack for send_activity, in order
-        call().send({"mock": "payload"}, routing_key=ActivityType.TX_HISTORY.value),
-        call().send({"mock": "payload"}, routing_key=ActivityType.TX_IMPORT.value),
-        call().send({"mock": "payload"}, routing_key=ActivityType.TX_IMPORT.value),
+    assert sent_activities == [  # in the order they were sent
+        ({"mock": "payload"}, ActivityType.TX_HISTORY.value),
+        ({"mock": "payload"}, ActivityType.TX_IMPORT.value),
+        ({"mock": "payload"}, ActivityType.TX_IMPORT.value),
     ]
-    mock_async_send_activity.assert_has_calls(expected_calls)
 
 
 def test_post_transaction_wrong_retailer(payload: dict) -> None:
@@ -402,7 +411,7 @@ def test_post_transaction_account_holder_validation_errors(
         "vela.activity_utils.enums.ActivityType.get_processed_tx_activity_data",
         return_value={"mock": "payload"},
     )
-    mock_async_send_activity = mocker.patch("vela.api.endpoints.transaction.async_send_activity")
+    sent_activities = _patch_async_send_activity(mocker)
     create_mock_reward_rule(reward_slug="negative-test-reward", campaign_id=campaign.id, reward_goal=10)
 
     mocked_session = mocker.patch("vela.internal_requests.send_async_request_with_retry")
@@ -419,7 +428,7 @@ def test_post_transaction_account_holder_validation_errors(
         "error": "USER_NOT_ACTIVE",
     }
     mock_get_tx_import_activity_data.assert_called_with(
-        transaction=transaction_data, data=tx_import_activity_data_not_active
+        transaction=transaction_data, data=tx_import_activity_data_not_active, activity_datetime=ANY
     )
 
     mocked_session.return_value = (status.HTTP_404_NOT_FOUND, {})
@@ -435,9 +444,10 @@ def test_post_transaction_account_holder_validation_errors(
         "error": "USER_NOT_FOUND",
     }
     mock_get_tx_import_activity_data.assert_called_with(
-        transaction=transaction_data, data=tx_import_activity_data_not_found
+        transaction=transaction_data, data=tx_import_activity_data_not_found, activity_datetime=ANY
     )
 
+    account_holder_status_cache.clear()  # USER_NOT_FOUND responses are cached
     mocked_session.return_value = (status.HTTP_500_INTERNAL_SERVER_ERROR, {})
 
     resp = client.post(f"{settings.API_PREFIX}/{retailer_slug}/transaction", json=payload, headers=auth_headers)
@@ -454,18 +464,16 @@ def test_post_transaction_account_holder_validation_errors(
         "error": "INTERNAL_ERROR",
     }
     mock_get_tx_import_activity_data.assert_called_with(
-        transaction=transaction_data,
-        data=tx_import_activity_data_client_error,
+        transaction=transaction_data, data=tx_import_activity_data_client_error, activity_datetime=ANY
     )
 
     mock_get_processed_tx_activity_data.assert_not_called()
 
-    expected_calls = [  # The expected call stack for send_activity, in order
-        call().send({"mock": "payload"}, routing_key=ActivityType.TX_IMPORT.value),
-        call().send({"mock": "payload"}, routing_key=ActivityType.TX_IMPORT.value),
-        call().send({"mock": "payload"}, routing_key=ActivityType.TX_IMPORT.value),
+    assert sent_activities == [  # in the order they were sent
+        ({"mock": "payload"}, ActivityType.TX_IMPORT.value),
+        ({"mock": "payload"}, ActivityType.TX_IMPORT.value),
+        ({"mock": "payload"}, ActivityType.TX_IMPORT.value),
     ]
-    mock_async_send_activity.assert_has_calls(expected_calls)
 
 
 def test_post_transaction_account_holder_empty_val_validation_errors(
@@ -579,7 +587,7 @@ def test_post_transaction_zero_amount(
         "vela.activity_utils.enums.ActivityType.get_processed_tx_activity_data",
         return_value={"mock": "payload"},
     )
-    mock_async_send_activity = mocker.patch("vela.api.endpoints.transaction.async_send_activity")
+    sent_activities = _patch_async_send_activity(mocker)
     create_mock_reward_rule(
         reward_slug="zero-test-reward", campaign_id=mock_campaign.id, reward_goal=10, allocation_window=5
     )
@@ -617,17 +625,15 @@ def test_post_transaction_zero_amount(
         "error": "N/A",
     }
     mock_get_tx_import_activity_data.assert_called_with(
-        transaction=transaction_data,
-        data=tx_import_activity_data,
+        transaction=transaction_data, data=tx_import_activity_data, activity_datetime=ANY
     )
 
     mock_get_processed_tx_activity_data.assert_called_once()
 
-    expected_calls = [  # The expected call stack for send_activity, in order
-        call().send({"mock": "payload"}, routing_key=ActivityType.TX_HISTORY.value),
-        call().send({"mock": "payload"}, routing_key=ActivityType.TX_IMPORT.value),
+    assert sent_activities == [  # in the order they were sent
+        ({"mock": "payload"}, ActivityType.TX_HISTORY.value),
+        ({"mock": "payload"}, ActivityType.TX_IMPORT.value),
     ]
-    mock_async_send_activity.assert_has_calls(expected_calls)
 
 
 def test_post_transaction_negative_amount_but_no_allocation_window(
@@ -653,7 +659,7 @@ def test_post_transaction_negative_amount_but_no_allocation_window(
         "vela.activity_utils.enums.ActivityType.get_processed_tx_activity_data",
         return_value={"mock": "payload"},
     )
-    mock_async_send_activity = mocker.patch("vela.api.endpoints.transaction.async_send_activity")
+    sent_activities = _patch_async_send_activity(mocker)
     mocker.patch("retry_tasks_lib.utils.asynchronous.enqueue_many_retry_tasks")
     mock_campaign = create_mock_campaign(
         **{
@@ -701,17 +707,15 @@ def test_post_transaction_negative_amount_but_no_allocation_window(
         "error": "N/A",
     }
     mock_get_tx_import_activity_data.assert_called_with(
-        transaction=transaction_data,
-        data=tx_import_activity_data,
+        transaction=transaction_data, data=tx_import_activity_data, activity_datetime=ANY
     )
 
     mock_get_processed_tx_activity_data.assert_called_once()
 
-    expected_calls = [  # The expected call stack for send_activity, in order
-        call().send({"mock": "payload"}, routing_key=ActivityType.TX_HISTORY.value),
-        call().send({"mock": "payload"}, routing_key=ActivityType.TX_IMPORT.value),
+    assert sent_activities == [  # in the order they were sent
+        ({"mock": "payload"}, ActivityType.TX_HISTORY.value),
+        ({"mock": "payload"}, ActivityType.TX_IMPORT.value),
     ]
-    mock_async_send_activity.assert_has_calls(expected_calls)
 
 
 def test_post_transaction_negative_amount_but_not_accumulator(
@@ -738,7 +742,7 @@ def test_post_transaction_negative_amount_but_not_accumulator(
         "vela.activity_utils.enums.ActivityType.get_processed_tx_activity_data",
         return_value={"mock": "payload"},
     )
-    mock_async_send_activity = mocker.patch("vela.api.endpoints.transaction.async_send_activity")
+    sent_activities = _patch_async_send_activity(mocker)
     mock_campaign = create_mock_campaign(
         **{
             "status": CampaignStatuses.ACTIVE,
@@ -785,14 +789,200 @@ def test_post_transaction_negative_amount_but_not_accumulator(
         "error": "N/A",
     }
     mock_get_tx_import_activity_data.assert_called_with(
-        transaction=transaction_data,
-        data=tx_import_activity_data,
+        transaction=transaction_data, data=tx_import_activity_data, activity_datetime=ANY
     )
 
     mock_get_processed_tx_activity_data.assert_called_once()
 
-    expected_calls = [  # The expected call stack for send_activity, in order
-        call().send({"mock": "payload"}, routing_key=ActivityType.TX_HISTORY.value),
-        call().send({"mock": "payload"}, routing_key=ActivityType.TX_IMPORT.value),
+    assert sent_activities == [  # in the order they were sent
+        ({"mock": "payload"}, ActivityType.TX_HISTORY.value),
+        ({"mock": "payload"}, ActivityType.TX_IMPORT.value),
     ]
-    mock_async_send_activity.assert_has_calls(expected_calls)
+
+
+def test_post_transactions_batch(
+    setup: SetupType,
+    payload: dict,
+    earn_rule: EarnRule,
+    mocker: MockerFixture,
+    reward_adjustment_task_type: "TaskType",
+    create_mock_reward_rule: Callable,
+) -> None:
+    db_session, retailer, campaign = setup
+
+    mocker.patch(
+        "vela.internal_requests.send_async_request_with_retry",
+        return_value=(status.HTTP_200_OK, {"status": "active", "created_at": account_holder_created_at}),
+    )
+    mock_enqueue_many_tasks = mocker.patch("vela.api.endpoints.transaction.enqueue_many_tasks")
+    mock_get_processed_tx_activity_data = mocker.patch(
+        "vela.activity_utils.enums.ActivityType.get_processed_tx_activity_data",
+        return_value={"mock": "payload"},
+    )
+    mock_get_tx_import_activity_data = mocker.patch(
+        "vela.activity_utils.enums.ActivityType.get_tx_import_activity_data",
+        return_value={"mock": "payload"},
+    )
+    _patch_async_send_activity(mocker)
+    create_mock_reward_rule(reward_slug="negative-test-reward", campaign_id=campaign.id, reward_goal=10)
+
+    below_threshold_payload = payload | {"id": "BATCH-TX-2", "transaction_total": 250}
+    invalid_payload = payload | {"id": "BATCH-TX-3", "MID": ""}
+    resp = client.post(
+        f"{settings.API_PREFIX}/{retailer.slug}/transactions",
+        json=[payload, below_threshold_payload, payload, invalid_payload],
+        headers=auth_headers,
+    )
+
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.json() == [
+        {"id": payload["id"], "status_code": status.HTTP_200_OK, "response": "Awarded"},
+        {"id": "BATCH-TX-2", "status_code": status.HTTP_200_OK, "response": "Threshold not met"},
+        {
+            "id": payload["id"],
+            "status_code": status.HTTP_409_CONFLICT,
+            "response": {"display_message": "Duplicate Transaction.", "code": "DUPLICATE_TRANSACTION"},
+        },
+        {
+            "id": "BATCH-TX-3",
+            "status_code": status.HTTP_422_UNPROCESSABLE_ENTITY,
+            "response": {
+                "display_message": "Submitted fields are missing or invalid.",
+                "code": "FIELD_VALIDATION_ERROR",
+                "fields": ["MID"],
+            },
+        },
+    ]
+    assert db_session.execute(select(func.count()).select_from(ProcessedTransaction)).scalar() == 2
+    # the repeated transaction is stored as a duplicate, as it would have been by the single transaction endpoint
+    duplicate_transaction = db_session.execute(select(Transaction)).scalar_one()
+    assert duplicate_transaction.transaction_id == payload["id"]
+    assert duplicate_transaction.status == TransactionProcessingStatuses.DUPLICATE
+    mock_enqueue_many_tasks.assert_called_once()
+    assert len(mock_enqueue_many_tasks.call_args.kwargs["retry_tasks_ids"]) == 1
+    assert mock_get_processed_tx_activity_data.call_count == 2
+    assert mock_get_tx_import_activity_data.call_count == 3
+
+
+def test_post_transactions_batch_resubmission_of_rejected_transaction(
+    setup: SetupType,
+    payload: dict,
+    earn_rule: EarnRule,
+    reward_rule: RewardRule,
+    mocker: MockerFixture,
+    reward_adjustment_task_type: "TaskType",
+) -> None:
+    db_session, retailer, _ = setup
+    unknown_account_holder_uuid = uuid4()
+
+    def mock_account_holder_status(url: str, **_: object) -> tuple[int, dict]:
+        if str(unknown_account_holder_uuid) in url:
+            return status.HTTP_404_NOT_FOUND, {}
+
+        return status.HTTP_200_OK, {"status": "active", "created_at": account_holder_created_at}
+
+    mocker.patch("vela.internal_requests.send_async_request_with_retry", side_effect=mock_account_holder_status)
+    mocker.patch("vela.api.endpoints.transaction.enqueue_many_tasks")
+    _patch_async_send_activity(mocker)
+
+    # the first submission is rejected before being stored, so the second is not a duplicate of it
+    resp = client.post(
+        f"{settings.API_PREFIX}/{retailer.slug}/transactions",
+        json=[payload | {"loyalty_id": str(unknown_account_holder_uuid)}, payload],
+        headers=auth_headers,
+    )
+
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.json() == [
+        {
+            "id": payload["id"],
+            "status_code": status.HTTP_404_NOT_FOUND,
+            "response": {"display_message": "Unknown User.", "code": "USER_NOT_FOUND"},
+        },
+        {"id": payload["id"], "status_code": status.HTTP_200_OK, "response": "Awarded"},
+    ]
+    processed_transaction = db_session.execute(select(ProcessedTransaction)).scalar_one()
+    assert processed_transaction.account_holder_uuid == account_holder_uuid
+    assert db_session.execute(select(func.count()).select_from(Transaction)).scalar() == 0
+
+
+def test_post_transactions_batch_existing_and_no_active_campaigns(
+    setup: SetupType,
+    payload: dict,
+    earn_rule: EarnRule,
+    reward_rule: RewardRule,
+    mocker: MockerFixture,
+    create_mock_transaction: Callable,
+) -> None:
+    db_session, retailer, campaign = setup
+
+    mocker.patch(
+        "vela.internal_requests.send_async_request_with_retry",
+        return_value=(status.HTTP_200_OK, {"status": "active", "created_at": account_holder_created_at}),
+    )
+    _patch_async_send_activity(mocker)
+    create_mock_transaction(
+        retailer.id,
+        transaction_id=payload["id"],
+        amount=payload["transaction_total"],
+        mid=payload["MID"],
+        datetime=datetime_now.replace(tzinfo=None),
+        account_holder_uuid=account_holder_uuid,
+        status=TransactionProcessingStatuses.NO_ACTIVE_CAMPAIGNS,
+    )
+    pre_campaign_timestamp = int((campaign.start_date.replace(tzinfo=timezone.utc) - timedelta(days=1)).timestamp())
+    pre_campaign_payload = payload | {"id": "BATCH-TX-2", "datetime": pre_campaign_timestamp}
+
+    resp = client.post(
+        f"{settings.API_PREFIX}/{retailer.slug}/transactions",
+        json=[payload, pre_campaign_payload],
+        headers=auth_headers,
+    )
+
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.json() == [
+        {
+            "id": payload["id"],
+            "status_code": status.HTTP_409_CONFLICT,
+            "response": {"display_message": "Duplicate Transaction.", "code": "DUPLICATE_TRANSACTION"},
+        },
+        {
+            "id": "BATCH-TX-2",
+            "status_code": status.HTTP_404_NOT_FOUND,
+            "response": {"display_message": "No active campaigns found for retailer.", "code": "NO_ACTIVE_CAMPAIGNS"},
+        },
+    ]
+    assert db_session.execute(select(func.count()).select_from(ProcessedTransaction)).scalar() == 0
+    transaction = db_session.execute(select(Transaction).where(Transaction.transaction_id == "BATCH-TX-2")).scalar_one()
+    assert transaction.status == TransactionProcessingStatuses.NO_ACTIVE_CAMPAIGNS
+
+
+def test_post_transaction_uses_active_campaigns_snapshot(
+    setup: SetupType, payload: dict, earn_rule: EarnRule, reward_rule: RewardRule, mocker: MockerFixture
+) -> None:
+    db_session, retailer, campaign = setup
+
+    mocker.patch(
+        "vela.internal_requests.send_async_request_with_retry",
+        return_value=(status.HTTP_200_OK, {"status": "active", "created_at": account_holder_created_at}),
+    )
+    _patch_async_send_activity(mocker)
+    spy = mocker.spy(crud, "get_active_campaigns")
+
+    for transaction_id in ("TX1", "TX2"):
+        payload["id"] = transaction_id
+        payload["transaction_total"] = 250
+        resp = client.post(f"{settings.API_PREFIX}/{retailer.slug}/transaction", json=payload, headers=auth_headers)
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.json() == "Threshold not met"
+
+    assert spy.call_count == 1
+
+    campaign.status = CampaignStatuses.ENDED
+    db_session.commit()
+
+    payload["id"] = "TX3"
+    resp = client.post(f"{settings.API_PREFIX}/{retailer.slug}/transaction", json=payload, headers=auth_headers)
+    assert resp.status_code == status.HTTP_404_NOT_FOUND
+    assert resp.json() == {"display_message": "No active campaigns found for retailer.", "code": "NO_ACTIVE_CAMPAIGNS"}
+    assert spy.call_count == 2
@@ -10,6 +10,10 @@ from retry_tasks_lib.db.models import RetryTask, TaskType, TaskTypeKey
 from retry_tasks_lib.enums import RetryTaskStatuses, TaskParamsKeyTypes
 from sqlalchemy_utils import create_database, database_exists, drop_database
 
+from vela.caches.account_holders import account_holder_status_cache
+from vela.caches.active_campaigns import active_campaigns_cache
+from vela.caches.retailers import retailers_cache
+from vela.caches.stores import clear_store_names
 from vela.core.config import redis, settings
 from vela.db.base import Base
 from vela.db.session import SyncSessionMaker, sync_engine
@@ -63,6 +67,17 @@ def setup_tables() -> Generator:
     Base.metadata.drop_all(bind=sync_engine)
 
 
+@pytest.fixture(scope="function", autouse=True)
+def clear_caches() -> Generator:
+    yield
+
+    # in-process caches would otherwise leak db rows dropped by setup_tables into the next test
+    retailers_cache.clear()
+    active_campaigns_cache.clear()
+    account_holder_status_cache.clear()
+    clear_store_names()
+
+
 @pytest.fixture(scope="function")
 def setup(db_session: "Session", retailer: RetailerRewards, campaign: Campaign) -> Generator[SetupType, None, None]:
     yield SetupType(db_session, retailer, campaign)
@@ -64,7 +64,7 @@ async def test_tx_history_activity_payload(
     }
     actual_payload = ActivityType.get_processed_tx_activity_data(
         processed_tx=processed_transaction,
-        retailer=retailer,
+        retailer_slug=retailer.slug,
         adjustment_amounts={
             campaign.slug: {
                 "threshold": 0,
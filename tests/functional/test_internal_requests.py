@@ -1,12 +1,28 @@
+import asyncio
+
+from collections.abc import AsyncGenerator
 from datetime import datetime, timezone
 from uuid import uuid4
 
+import aiohttp
 import pytest
+import pytest_asyncio
 
 from aioresponses import aioresponses
 
 from vela import settings
-from vela.internal_requests import put_carina_campaign, send_async_request_with_retry
+from vela.internal_requests import (
+    client_session_manager,
+    close_client_session,
+    put_carina_campaign,
+    send_async_request_with_retry,
+)
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def shared_client_session() -> AsyncGenerator:
+    yield
+    await close_client_session()
 
 
 @pytest.mark.asyncio
@@ -83,3 +99,37 @@ async def test_put_carina_campaign_404() -> None:
 
         assert status_code == 404
         assert resp_json == f"Carina responded with: {status_code} - {mock_carina_404_response['display_message']}"
+
+
+@pytest.mark.asyncio
+async def test_send_async_request_with_retry_reuses_client_session() -> None:
+    mock_url = f"{settings.CARINA_BASE_URL}/test-retailer/test-reward/campaign"
+    session = client_session_manager.get()
+
+    with aioresponses() as mocked_clientreq:
+        mocked_clientreq.put(mock_url, payload={}, repeat=True)
+
+        for _ in range(2):
+            await put_carina_campaign(
+                retailer_slug="test-retailer",
+                campaign_slug="test-campaign",
+                reward_slug="test-reward",
+                requested_status="active",
+            )
+            assert client_session_manager.get() is session
+
+    await close_client_session()
+    assert session.closed
+    assert client_session_manager.get() is not session
+
+
+def test_client_session_manager_closes_session_of_previous_loop() -> None:
+    async def get_session() -> aiohttp.ClientSession:
+        return client_session_manager.get()
+
+    session = asyncio.run(get_session())
+    new_session = asyncio.run(get_session())
+
+    assert new_session is not session
+    assert session.closed
+    assert not new_session.closed
@@ -6,8 +6,17 @@ from zoneinfo import ZoneInfo
 from pytest_mock import MockerFixture
 from retry_tasks_lib.db.models import RetryTask, TaskType
 from retry_tasks_lib.enums import RetryTaskStatuses
-
-from vela.scheduled_tasks.task_cleanup import cleanup_old_tasks
+from sqlalchemy import insert, select, text
+
+from vela.core.config import redis, settings
+from vela.models import RetailerRewards, processed_transaction_key
+from vela.scheduled_tasks.partitions import (
+    _get_monthly_partitions,
+    add_months,
+    maintain_processed_transaction_partitions,
+    partition_name,
+)
+from vela.scheduled_tasks.task_cleanup import PROGRESS_KEY, cleanup_old_tasks
 
 if TYPE_CHECKING:
     from sqlalchemy.orm import Session
@@ -51,3 +60,102 @@ def test_cleanup_old_tasks(
     assert not db_session.get(RetryTask, deleteable_task_id)
     assert wrong_status_task.retry_task_id
     assert not_old_enough_task.retry_task_id
+
+
+def test_cleanup_old_tasks_in_batches_and_resume(
+    create_mock_task: "Callable[..., RetryTask]",
+    reward_adjustment_task_type: "TaskType",
+    db_session: "Session",
+    mocker: MockerFixture,
+) -> None:
+    mocker.patch.object(settings, "TASK_CLEANUP_BATCH_SIZE", 1)
+    mocker.patch.object(settings, "TASK_CLEANUP_BATCH_PAUSE_SECONDS", 0)
+    mock_extend_lock = mocker.patch("vela.scheduled_tasks.task_cleanup.extend_lock")
+
+    now = datetime.now(tz=timezone.utc)
+    tasks = [create_mock_task(reward_adjustment_task_type, {"status": RetryTaskStatuses.SUCCESS}) for _ in range(3)]
+    for task in tasks:
+        task.created_at = now - timedelta(days=181)
+    db_session.commit()
+    task_ids = [task.retry_task_id for task in tasks]
+
+    # a previous run for the same day stopped after deleting the first task
+    time_reference = datetime.now(tz=ZoneInfo("Europe/London")).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    ) - timedelta(days=180)
+    redis.set(PROGRESS_KEY, f"{time_reference.isoformat()}|{task_ids[0]}")
+
+    cleanup_old_tasks()
+
+    db_session.expire_all()
+    assert db_session.get(RetryTask, task_ids[0])
+    assert not db_session.get(RetryTask, task_ids[1])
+    assert not db_session.get(RetryTask, task_ids[2])
+    assert redis.get(PROGRESS_KEY) is None
+    assert mock_extend_lock.call_count == 2
+
+
+def test_maintain_processed_transaction_partitions(
+    db_session: "Session", retailer: RetailerRewards, mocker: MockerFixture
+) -> None:
+    mocker.patch.object(settings, "PROCESSED_TRANSACTION_PARTITIONS_PREMAKE_MONTHS", 1)
+    mocker.patch.object(settings, "PROCESSED_TRANSACTION_RETENTION_MONTHS", 2)
+    mocker.patch.object(settings, "PROCESSED_TRANSACTION_KEY_CLEANUP_BATCH_SIZE", 2)
+
+    current_month = datetime.now(tz=ZoneInfo("Europe/London")).date().replace(day=1)
+    expired_month, kept_month = add_months(current_month, -3), add_months(current_month, -2)
+    for month in (expired_month, kept_month):
+        db_session.execute(
+            text(
+                f"CREATE TABLE {partition_name(month)} PARTITION OF processed_transaction "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            )
+        )
+    db_session.execute(
+        insert(processed_transaction_key).values(
+            [
+                {"retailer_id": retailer.id, "transaction_id": f"tx-{i}", "created_at": created_at}
+                for i, created_at in enumerate(
+                    [datetime.combine(expired_month, datetime.min.time())] * 3
+                    + [datetime.combine(kept_month, datetime.min.time())]
+                )
+            ]
+        )
+    )
+    db_session.commit()
+
+    maintain_processed_transaction_partitions()
+
+    assert _get_monthly_partitions(db_session) == {
+        month: partition_name(month) for month in (kept_month, current_month, add_months(current_month, 1))
+    }
+    assert db_session.execute(select(processed_transaction_key.c.transaction_id)).scalars().all() == ["tx-3"]
+    # idempotent
+    maintain_processed_transaction_partitions()
+    assert len(_get_monthly_partitions(db_session)) == 3
+
+
+def test_maintain_processed_transaction_partitions_moves_default_partition_rows(
+    db_session: "Session", mocker: MockerFixture
+) -> None:
+    mocker.patch.object(settings, "PROCESSED_TRANSACTION_PARTITIONS_PREMAKE_MONTHS", 0)
+    mocker.patch.object(settings, "PROCESSED_TRANSACTION_RETENTION_MONTHS", 1)
+
+    current_month = datetime.now(tz=ZoneInfo("Europe/London")).date().replace(day=1)
+    db_session.execute(
+        text(
+            "INSERT INTO processed_transaction "
+            "(created_at, transaction_id, amount, mid, datetime, account_holder_uuid, campaign_slugs) "
+            "VALUES (:created_at, 'tx-id', 1000, 'mid', :created_at, gen_random_uuid(), ARRAY['test-campaign'])"
+        ),
+        {"created_at": datetime.combine(current_month, datetime.min.time())},
+    )
+    db_session.commit()
+
+    maintain_processed_transaction_partitions()
+
+    assert _get_monthly_partitions(db_session) == {current_month: partition_name(current_month)}
+    assert not db_session.execute(text("SELECT count(*) FROM processed_transaction_default")).scalar_one()
+    assert db_session.execute(text("SELECT tableoid::regclass::text FROM processed_transaction")).scalars().all() == [
+        partition_name(current_month)
+    ]
@@ -13,6 +13,8 @@ import requests
 from retry_tasks_lib.db.models import RetryTask, TaskType
 from retry_tasks_lib.enums import RetryTaskStatuses
 from retry_tasks_lib.utils.synchronous import IncorrectRetryTaskStatusError, sync_create_task
+from sqlalchemy import inspect
+from sqlalchemy.exc import NoResultFound
 
 from vela.core.config import settings
 from vela.enums import CampaignStatuses
@@ -21,10 +23,11 @@ from vela.tasks.campaign_balances import update_campaign_balances
 from vela.tasks.pending_rewards import convert_or_delete_pending_rewards
 from vela.tasks.reward_adjustment import (
     _get_balance_adjustment_reason,
+    _get_campaign,
     _number_of_rewards_achieved,
     _process_balance_adjustment,
     _process_reward_allocation,
-    _set_param_value,
+    _set_param_values,
     adjust_balance,
 )
 from vela.tasks.reward_cancellation import _process_cancel_account_holder_rewards, cancel_account_holder_rewards
@@ -471,6 +474,18 @@ def test_adjust_balance_task_cancelled_when_campaign_cancelled_or_ended(
         assert reward_adjustment_task.status == RetryTaskStatuses.CANCELLED
 
 
+def test_get_campaign_loads_reward_rule(db_session: "Session", campaign: Campaign, reward_rule: RewardRule) -> None:
+    retailer_slug = campaign.retailer.slug
+    db_session.expunge_all()
+
+    loaded_campaign = _get_campaign(db_session, retailer_slug, campaign.slug)
+    assert "reward_rule" in inspect(loaded_campaign).dict
+    assert loaded_campaign.reward_rule.reward_goal == reward_rule.reward_goal
+
+    with pytest.raises(NoResultFound):
+        _get_campaign(db_session, "wrong-retailer", campaign.slug)
+
+
 @httpretty.activate
 @mock.patch("vela.tasks.reward_adjustment._number_of_rewards_achieved")
 def test_adjust_balance_fails_with_409_no_balance_for_campaign_slug(
@@ -527,6 +542,12 @@ def test_adjust_balance_reward_allocation_call_fails(
     assert reward_adjustment_task.attempts == 1
     assert reward_adjustment_task.status == RetryTaskStatuses.IN_PROGRESS
     assert len(reward_adjustment_task.audit_data) == 1
+    # all the tokens have been persisted before the first request so that a retry reuses them
+    db_session.expire(reward_adjustment_task)
+    task_params = reward_adjustment_task.get_params()
+    assert task_params["allocation_token"]
+    assert task_params["post_allocation_token"]
+    assert httpretty.latest_requests()[-1].headers["idempotency-token"] == str(task_params["allocation_token"])
 
 
 def test_adjust_balance_wrong_status(
@@ -733,10 +754,17 @@ def test__process_reward_status_adjustment_connection_error(
     assert excinfo.value.response is None
 
 
-def test__set_param_value(db_session: "Session", reward_adjustment_task: RetryTask) -> None:
+def test__set_param_values(db_session: "Session", reward_adjustment_task: RetryTask) -> None:
     value = str(uuid4())
-    assert _set_param_value(db_session, reward_adjustment_task, "secondary_reward_retry_task_id", 999) == "999"
-    assert value == _set_param_value(db_session, reward_adjustment_task, "post_allocation_token", value)
+    _set_param_values(
+        db_session,
+        reward_adjustment_task,
+        {"secondary_reward_retry_task_id": 999, "post_allocation_token": value},
+    )
+    db_session.expire(reward_adjustment_task)
+    task_params = reward_adjustment_task.get_params()
+    assert task_params["secondary_reward_retry_task_id"] == 999
+    assert task_params["post_allocation_token"] == value
 
 
 @httpretty.activate
@@ -1,5 +1,20 @@
-from vela.activity_utils.utils import build_tx_history_earns, build_tx_history_reasons
+import asyncio
+
+import pytest
+
+from babel.numbers import format_currency
+from prometheus_client import REGISTRY
+from pytest_mock import MockerFixture
+
+from vela.activity_utils.utils import (
+    build_tx_history_earns,
+    build_tx_history_reasons,
+    pence_integer_to_currency_string,
+)
+from vela.api.tasks import enqueue_many_tasks
+from vela.core.config import settings
 from vela.enums import LoyaltyTypes
+from vela.tasks.prometheus.metrics import METRIC_NAME_PREFIX
 
 
 def test_build_tx_history_reasons() -> None:
@@ -47,3 +62,44 @@ def test_build_tx_history_earns() -> None:
         {"value": "-£32,100.99", "type": LoyaltyTypes.ACCUMULATOR},
         {"value": "5", "type": LoyaltyTypes.STAMPS},
     ]
+
+
+@pytest.mark.asyncio
+async def test_enqueue_many_tasks_coalesces_concurrent_calls(mocker: MockerFixture) -> None:
+    mock_enqueue = mocker.patch("vela.api.tasks._enqueue_many_tasks")
+    metric_labels = {"app": settings.PROJECT_NAME}
+    batches_before = REGISTRY.get_sample_value(
+        f"{METRIC_NAME_PREFIX}task_enqueue_batch_duration_seconds_count", metric_labels
+    )
+
+    await asyncio.gather(enqueue_many_tasks(retry_tasks_ids=[1, 2]), enqueue_many_tasks(retry_tasks_ids=[3]))
+
+    mock_enqueue.assert_called_once_with([1, 2, 3])
+    batches = REGISTRY.get_sample_value(f"{METRIC_NAME_PREFIX}task_enqueue_batch_duration_seconds_count", metric_labels)
+    assert batches == (batches_before or 0) + 1
+
+
+@pytest.mark.asyncio
+async def test_enqueue_many_tasks_flushes_full_batch_and_propagates_errors(mocker: MockerFixture) -> None:
+    mocker.patch.object(settings, "TASK_ENQUEUE_MAX_BATCH_SIZE", 2)
+    mocker.patch.object(settings, "TASK_ENQUEUE_MAX_DELAY", 60)
+    mock_enqueue = mocker.patch("vela.api.tasks._enqueue_many_tasks", side_effect=ValueError("redis is down"))
+
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(enqueue_many_tasks(retry_tasks_ids=[1, 2]), timeout=5)
+
+    await enqueue_many_tasks(retry_tasks_ids=[3, 4], raise_exc=False)
+
+    assert mock_enqueue.call_args_list == [mocker.call([1, 2]), mocker.call([3, 4])]
+
+
+@pytest.mark.parametrize("currency", ["GBP", "EUR", "JPY"])
+@pytest.mark.parametrize("currency_sign", [True, False])
+def test_pence_integer_to_currency_string_matches_babel(currency: str, currency_sign: bool) -> None:
+    for value in (0, 1, -1, 99, -100, 1188, -1188, 110099, -3210099, 123456789012):
+        assert pence_integer_to_currency_string(value, currency, currency_sign) == format_currency(
+            number=value / 100,
+            currency=currency,
+            locale="en_GB",
+            format=None if currency_sign else "#,##0.##",
+        )
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from pytest_mock import MockerFixture
+
+from vela.activity_utils.deferred import TxImportActivity
+from vela.activity_utils.enums import ActivityType
+from vela.activity_utils.tasks import ActivityPublisher
+from vela.core.config import settings
+
+
+@pytest.mark.asyncio
+async def test_activity_publisher_drains_and_flushes_on_stop(mocker: MockerFixture) -> None:
+    mocker.patch.object(settings, "ACTIVITY_PUBLISHER_CONNECTIONS", 1)
+    mock_connection = mocker.patch("vela.activity_utils.tasks.connection")
+    mock_send = mocker.patch("vela.activity_utils.tasks.verify_payload_and_send_activity")
+    mock_to_thread = mocker.spy(asyncio, "to_thread")
+    publisher = ActivityPublisher()
+
+    publisher.start()
+    for i in range(3):
+        await publisher.publish({"id": i}, "routing-key")
+    await publisher.stop()
+
+    worker_connection = mock_connection.clone.return_value
+    assert mock_send.call_args_list == [
+        mocker.call(worker_connection, mocker.ANY, {"id": i}, "routing-key") for i in range(3)
+    ]
+    mock_to_thread.assert_called_once()
+    worker_connection.release.assert_called_once()
+    assert not publisher.running
+
+
+@pytest.mark.asyncio
+async def test_activity_publisher_drop_policy(mocker: MockerFixture) -> None:
+    mocker.patch.object(settings, "ACTIVITY_PUBLISHER_CONNECTIONS", 0)
+    mocker.patch.object(settings, "ACTIVITY_PUBLISHER_QUEUE_SIZE", 1)
+    mocker.patch.object(settings, "ACTIVITY_PUBLISHER_HIGH_WATER_MARK_POLICY", "drop")
+    mocker.patch.object(settings, "ACTIVITY_PUBLISHER_SHUTDOWN_TIMEOUT", 0)
+    mock_dropped = mocker.patch("vela.activity_utils.tasks.activities_dropped_total")
+    publisher = ActivityPublisher()
+
+    publisher.start()
+    await publisher.publish({"id": 1}, "routing-key")
+    await asyncio.wait_for(publisher.publish({"id": 2}, "routing-key"), timeout=1)
+    await publisher.stop()
+
+    mock_dropped.labels.assert_called_once_with(app=settings.PROJECT_NAME, routing_key="routing-key")
+
+
+@pytest.mark.asyncio
+async def test_activity_publisher_not_started_sends_directly(mocker: MockerFixture) -> None:
+    mock_send = mocker.patch("vela.activity_utils.tasks.verify_payload_and_send_activity")
+
+    await ActivityPublisher().publish({"id": 1}, "routing-key")
+
+    mock_send.assert_called_once_with(mocker.ANY, mocker.ANY, {"id": 1}, "routing-key")
+
+
+@pytest.mark.asyncio
+async def test_activity_publisher_builds_deferred_payloads(mocker: MockerFixture) -> None:
+    mock_send = mocker.patch("vela.activity_utils.tasks.verify_payload_and_send_activity")
+    mock_get_tx_import_activity_data = mocker.patch(
+        "vela.activity_utils.enums.ActivityType.get_tx_import_activity_data", return_value={"mock": "payload"}
+    )
+    transaction = {"transaction_id": "tx-id"}
+    data = {"error": "N/A"}
+    activity = TxImportActivity(transaction=transaction, data=data)
+    data["error"] = "DUPLICATE_TRANSACTION"
+
+    mock_get_tx_import_activity_data.assert_not_called()
+    await ActivityPublisher().publish(activity, activity.routing_key)
+
+    mock_get_tx_import_activity_data.assert_called_once_with(
+        transaction=transaction, data={"error": "N/A"}, activity_datetime=activity.activity_datetime
+    )
+    mock_send.assert_called_once_with(mocker.ANY, mocker.ANY, {"mock": "payload"}, ActivityType.TX_IMPORT.value)
+
+
+@pytest.mark.asyncio
+async def test_activity_publisher_block_policy_applies_backpressure(mocker: MockerFixture) -> None:
+    mocker.patch.object(settings, "ACTIVITY_PUBLISHER_CONNECTIONS", 0)
+    mocker.patch.object(settings, "ACTIVITY_PUBLISHER_QUEUE_SIZE", 1)
+    mocker.patch.object(settings, "ACTIVITY_PUBLISHER_HIGH_WATER_MARK_POLICY", "block")
+    mocker.patch.object(settings, "ACTIVITY_PUBLISHER_SHUTDOWN_TIMEOUT", 0)
+    publisher = ActivityPublisher()
+
+    publisher.start()
+    await publisher.publish({"id": 1}, "routing-key")
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(publisher.publish({"id": 2}, "routing-key"), timeout=0.1)
+    await publisher.stop()
@@ -0,0 +1,209 @@
+import asyncio
+
+from typing import Any
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from fastapi import HTTPException
+from pytest_mock import MockerFixture
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from vela.caches.account_holders import account_holder_status_cache, get_cached_account_holder_status
+from vela.caches.active_campaigns import (
+    ActiveCampaignsSnapshot,
+    active_campaigns_cache,
+    get_active_campaigns_snapshot,
+    invalidate_active_campaigns,
+)
+from vela.caches.base import TTLCache
+from vela.caches.stores import (
+    UNKNOWN_STORE_NAME,
+    _refresh_tasks,
+    clear_store_names,
+    get_cached_store_name,
+    invalidate_store_names,
+)
+from vela.core.config import settings
+from vela.enums import HttpErrors
+from vela.models import Campaign, RetailerRewards
+
+
+def test_ttl_cache_get_set_and_metrics(mocker: MockerFixture) -> None:
+    mock_metric = mocker.patch("vela.caches.base.cache_requests_total")
+    cache: TTLCache[str, int] = TTLCache("test", maxsize=2, ttl=60)
+
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    mock_metric.labels.assert_any_call(app="vela", cache="test", result="miss")
+    mock_metric.labels.assert_any_call(app="vela", cache="test", result="hit")
+    assert mock_metric.labels.return_value.inc.call_count == 2
+
+
+def test_ttl_cache_evicts_least_recently_used() -> None:
+    cache: TTLCache[str, int] = TTLCache("test", maxsize=2, ttl=60)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expiry_and_invalidation(mocker: MockerFixture) -> None:
+    mock_time = mocker.patch("vela.caches.base.time", monotonic=MagicMock(return_value=100.0))
+    cache: TTLCache[str, int] = TTLCache("test", maxsize=10, ttl=5)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    mock_time.monotonic.return_value = 104.0
+    assert cache.get("a") == 1
+
+    mock_time.monotonic.return_value = 105.0
+    assert cache.get("a") is None
+
+    cache.invalidate("b")
+    assert cache.get("b") is None
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_active_campaigns_snapshot_not_stored_if_invalidated_while_building(mocker: MockerFixture) -> None:
+    retailer = RetailerRewards(id=1, slug="test-retailer")
+
+    async def _get_active_campaigns(*args: Any, **kwargs: Any) -> list:
+        invalidate_active_campaigns(retailer.id)
+        raise HttpErrors.NO_ACTIVE_CAMPAIGNS.value
+
+    mocker.patch("vela.caches.active_campaigns.crud.get_active_campaigns", side_effect=_get_active_campaigns)
+    mocker.patch("vela.caches.active_campaigns._get_shared_version", return_value=(0, 0))
+
+    snapshot = await get_active_campaigns_snapshot(MagicMock(), retailer)
+
+    assert snapshot.campaigns == ()
+    assert active_campaigns_cache.get(retailer.id) is None
+
+
+@pytest.mark.asyncio
+async def test_active_campaigns_snapshot_rebuilt_when_shared_version_changes(mocker: MockerFixture) -> None:
+    retailer = RetailerRewards(id=1, slug="test-retailer")
+    mock_get_active_campaigns = mocker.patch("vela.caches.active_campaigns.crud.get_active_campaigns", return_value=[])
+    mock_get_shared_version = mocker.patch("vela.caches.active_campaigns._get_shared_version", return_value=(0, 1))
+
+    snapshot = await get_active_campaigns_snapshot(MagicMock(), retailer)
+    assert await get_active_campaigns_snapshot(MagicMock(), retailer) is snapshot
+    assert mock_get_active_campaigns.call_count == 1
+
+    # another process changed the retailer's campaigns
+    mock_get_shared_version.return_value = (0, 2)
+    rebuilt_snapshot = await get_active_campaigns_snapshot(MagicMock(), retailer)
+    assert rebuilt_snapshot is not snapshot
+    assert rebuilt_snapshot.shared_version == (0, 2)
+    assert mock_get_active_campaigns.call_count == 2
+
+    # without redis the cached snapshot is used until it expires
+    mock_get_shared_version.return_value = None
+    assert await get_active_campaigns_snapshot(MagicMock(), retailer) is rebuilt_snapshot
+
+
+def test_active_campaigns_invalidated_by_bulk_campaign_statements(mocker: MockerFixture) -> None:
+    mock_bump_shared_versions = mocker.patch("vela.caches.active_campaigns._bump_shared_versions")
+    active_campaigns_cache.set(1, ActiveCampaignsSnapshot(version=0, campaigns=()))
+
+    with Session(create_engine("sqlite://", future=True), future=True) as db_session:
+        db_session.execute(text("CREATE TABLE campaign (id INTEGER)"))
+        db_session.commit()
+        assert active_campaigns_cache.get(1) is not None
+
+        db_session.execute(Campaign.__table__.delete().where(Campaign.id == 1))
+        db_session.commit()
+        assert active_campaigns_cache.get(1) is None
+
+    mock_bump_shared_versions.assert_called_once_with({"*"})
+
+
+@pytest.mark.asyncio
+async def test_get_cached_account_holder_status(mocker: MockerFixture) -> None:
+    account_holder_uuid = uuid4()
+    mock_get_status = mocker.patch(
+        "vela.caches.account_holders.get_account_holder_status",
+        side_effect=[
+            {"status": "pending", "created_at": 1.0},
+            {"status": "active", "created_at": 1.0, "extra": "ignored"},
+            HttpErrors.USER_NOT_FOUND.value,
+        ],
+    )
+
+    assert await get_cached_account_holder_status(account_holder_uuid, "test-retailer") == {
+        "status": "pending",
+        "created_at": 1.0,
+    }
+    for _ in range(2):
+        assert await get_cached_account_holder_status(account_holder_uuid, "test-retailer") == {
+            "status": "active",
+            "created_at": 1.0,
+        }
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            await get_cached_account_holder_status(account_holder_uuid, "other-retailer")
+
+        assert exc_info.value == HttpErrors.USER_NOT_FOUND.value
+
+    assert mock_get_status.call_count == 3
+    account_holder_status_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_cached_account_holder_status_redis_tier(mocker: MockerFixture) -> None:
+    account_holder_uuid = uuid4()
+    mocker.patch.object(settings, "ACCOUNT_HOLDER_STATUS_CACHE_USE_REDIS", True)
+    mock_get_from_redis = mocker.patch(
+        "vela.caches.account_holders._get_from_redis", return_value=({"status": "active", "created_at": 1.0}, 5)
+    )
+    mock_get_status = mocker.patch("vela.caches.account_holders.get_account_holder_status")
+
+    for _ in range(2):
+        assert await get_cached_account_holder_status(account_holder_uuid, "test-retailer") == {
+            "status": "active",
+            "created_at": 1.0,
+        }
+
+    mock_get_from_redis.assert_called_once_with("test-retailer", account_holder_uuid)
+    mock_get_status.assert_not_called()
+    account_holder_status_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_cached_store_name_refreshes_in_background(mocker: MockerFixture) -> None:
+    mocker.patch("vela.caches.stores.AsyncSessionMaker", return_value=mocker.AsyncMock())
+    mock_get_store_names = mocker.patch(
+        "vela.caches.stores.crud.get_retailer_store_names", return_value={"MID1": "Store 1"}
+    )
+    clear_store_names()
+
+    # never waits on the db, the first lookup schedules the load
+    assert get_cached_store_name(1, "MID1") == UNKNOWN_STORE_NAME
+    assert get_cached_store_name(1, "MID1") == UNKNOWN_STORE_NAME
+    await asyncio.gather(*_refresh_tasks.values())
+    mock_get_store_names.assert_awaited_once()
+
+    assert get_cached_store_name(1, "MID1") == "Store 1"
+    assert get_cached_store_name(1, "MID2") == UNKNOWN_STORE_NAME
+    assert not _refresh_tasks
+
+    # expired names are still served while they are reloaded
+    mock_get_store_names.return_value = {"MID1": "Store 1 renamed"}
+    invalidate_store_names(1)
+    assert get_cached_store_name(1, "MID1") == "Store 1"
+    await asyncio.gather(*_refresh_tasks.values())
+    assert get_cached_store_name(1, "MID1") == "Store 1 renamed"
+    clear_store_names()
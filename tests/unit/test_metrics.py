@@ -1,8 +1,16 @@
+import asyncio
+import logging
 import random
 
+import pytest
+
 from prometheus_client import REGISTRY
+from pytest_mock import MockerFixture
+from sqlalchemy import create_engine, text
 
 from vela.core.config import settings
+from vela.core.stage_timer import StageTimer
+from vela.db.instrumentation import db_query_metrics, instrument_engine, track_db_queries, untrack_db_queries
 from vela.tasks.prometheus.metrics import METRIC_NAME_PREFIX
 from vela.tasks.prometheus.synchronous import task_processing_time_callback_fn
 
@@ -25,3 +33,72 @@ def test_metrics_callback_fn_multiple_metrics() -> None:
 
     assert metric_count == num_of_metrics
     assert metric_value == sum(mock_task_processing_times)
+
+
+def test_db_query_metrics() -> None:
+    engine = create_engine("sqlite://", future=True)
+    instrument_engine(engine)
+
+    @db_query_metrics(task_name="mock-db-task")
+    def mock_task() -> None:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 0"))
+    mock_task()
+
+    metric_labels = {"app": settings.PROJECT_NAME, "name": "mock-db-task"}
+    assert REGISTRY.get_sample_value(f"{METRIC_NAME_PREFIX}db_statements_count", metric_labels) == 1
+    assert REGISTRY.get_sample_value(f"{METRIC_NAME_PREFIX}db_statements_sum", metric_labels) == 2
+    assert REGISTRY.get_sample_value(f"{METRIC_NAME_PREFIX}db_time_seconds_sum", metric_labels) > 0
+
+    with track_db_queries() as query_stats, engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert query_stats.statements == 1
+    assert 0 < query_stats.slowest == query_stats.total_time
+
+
+def test_untrack_db_queries_in_background_task() -> None:
+    engine = create_engine("sqlite://", future=True)
+    instrument_engine(engine)
+
+    def run_query() -> None:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    async def background_task() -> None:
+        untrack_db_queries()
+        run_query()
+
+    async def request() -> None:
+        run_query()
+        await asyncio.create_task(background_task())
+        run_query()
+
+    with track_db_queries() as query_stats:
+        asyncio.run(request())
+
+    assert query_stats.statements == 2
+
+
+def test_stage_timer(mocker: MockerFixture, caplog: pytest.LogCaptureFixture) -> None:
+    mocker.patch.object(settings, "SLOW_REQUEST_LOG_THRESHOLD", 0)
+    stage_timer = StageTimer("mock_endpoint")
+    for _ in range(2):
+        with stage_timer.stage("mock_stage"):
+            pass
+
+    metric_labels = {"app": settings.PROJECT_NAME, "endpoint": "mock_endpoint", "stage": "mock_stage"}
+    assert REGISTRY.get_sample_value(f"{METRIC_NAME_PREFIX}request_stage_duration_seconds_count", metric_labels) == 2
+    assert list(stage_timer.durations) == ["mock_stage"]
+
+    with caplog.at_level(logging.WARNING):
+        stage_timer.finish()
+        mocker.patch.object(settings, "SLOW_REQUEST_LOG_THRESHOLD", 0.000001)
+        stage_timer.finish()
+
+    assert len(caplog.records) == 1
+    assert caplog.records[0].data["stages_ms"].keys() == {"mock_stage"}  # type: ignore [attr-defined]
@@ -1,10 +1,16 @@
+import signal
+import threading
+import time
+
+from unittest.mock import MagicMock
 from uuid import uuid4
 
 import httpretty
 
 from pytest_mock import MockerFixture
 
-from vela.tasks import send_request_with_metrics
+from vela.tasks import requests_session_manager, send_request_with_metrics
+from vela.tasks.worker import ThreadPoolWorker, ThreadWorker
 
 
 @httpretty.activate
@@ -51,3 +57,88 @@ def test_send_request_with_metrics_no_excluded_val(mocker: MockerFixture, run_ta
     mocked_metric.labels.assert_called_once_with(
         app="vela", method="GET", response="HTTP_200", exception=None, url=f"{base_url}/{uuid_val}/test/url"
     )
+
+
+@httpretty.activate
+def test_send_request_with_metrics_reuses_session(mocker: MockerFixture) -> None:
+    base_url = "http://sample-domain"
+    httpretty.register_uri("GET", f"{base_url}/test/url", body="OK", status=200)
+    session = requests_session_manager.get()
+    spy = mocker.spy(session, "request")
+
+    for _ in range(2):
+        resp = send_request_with_metrics(
+            "GET", "{base_url}/test/url", {"base_url": base_url}, exclude_from_label_url=[]
+        )
+        assert resp.status_code == 200
+
+    assert spy.call_count == 2
+    assert requests_session_manager.get() is session
+
+    mocker.patch("vela.tasks.os.getpid", return_value=-1)
+    assert requests_session_manager.get() is not session
+
+
+def test_requests_session_manager_creates_one_session_across_threads(mocker: MockerFixture) -> None:
+    requests_session_manager.close()
+
+    def slow_create_session() -> MagicMock:
+        # lets every thread pass the first check before a session exists
+        time.sleep(0.05)
+        return MagicMock()
+
+    create_session = mocker.patch.object(requests_session_manager, "_create_session", side_effect=slow_create_session)
+    barrier = threading.Barrier(4)
+    sessions: list = []
+
+    def get_session() -> None:
+        barrier.wait()
+        sessions.append(requests_session_manager.get())
+
+    threads = [threading.Thread(target=get_session) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert create_session.call_count == 1
+    assert len({id(session) for session in sessions}) == 1
+    requests_session_manager.close()
+
+
+def test_thread_pool_worker_runs_workers_in_threads(mocker: MockerFixture) -> None:
+    mocker.patch("vela.tasks.worker.signal.signal")
+    mocker.patch("vela.tasks.worker.redis_raw")
+    mock_scheduler_class = mocker.patch("vela.tasks.worker.RQScheduler")
+    work_calls: list[tuple[str, dict]] = []
+    mocker.patch.object(
+        ThreadWorker,
+        "work",
+        autospec=True,
+        side_effect=lambda _worker, **kwargs: work_calls.append((threading.current_thread().name, kwargs)),
+    )
+
+    pool = ThreadPoolWorker(queues=["vela:default"], concurrency=3)
+    pool.work(burst=True, with_scheduler=True)
+
+    assert sorted(work_calls) == sorted(
+        (worker.name, {"burst": True, "with_scheduler": False}) for worker in pool.workers
+    )
+    # the scheduler is run from the main thread instead of one of the workers'
+    mock_scheduler_class.assert_called_once_with(["vela:default"], connection=mocker.ANY)
+    mock_scheduler_class.return_value.enqueue_scheduled_jobs.assert_called_once_with()
+    assert len({worker.name for worker in pool.workers}) == 3
+    assert all(worker.dequeue_timeout <= ThreadWorker.idle_dequeue_timeout for worker in pool.workers)
+
+
+def test_thread_pool_worker_stops_all_workers_on_signal(mocker: MockerFixture) -> None:
+    mock_signal = mocker.patch("vela.tasks.worker.signal.signal")
+    mocker.patch("vela.tasks.worker.redis_raw")
+    mocker.patch.object(ThreadWorker, "work", autospec=True)
+
+    pool = ThreadPoolWorker(queues=["vela:default"], concurrency=2)
+    pool.work()
+    handler = dict(call.args for call in mock_signal.call_args_list)[signal.SIGTERM]
+    handler(signal.SIGTERM, None)
+
+    assert all(worker._stop_requested for worker in pool.workers)
@@ -1,8 +1,12 @@
 from dataclasses import dataclass
+from decimal import Decimal
 
-from vela.core.utils import calculate_adjustment_amount_for_earn_rule
+import pytest
+
+from vela.core.adjustments import calculate_adjustment_amounts_batch, compile_adjustment_rules
+from vela.core.utils import calculate_adjustment_amount_for_earn_rule, calculate_adjustment_amounts
 from vela.enums import LoyaltyTypes
-from vela.models.retailer import EarnRule
+from vela.models.retailer import Campaign, EarnRule, RewardRule
 
 
 @dataclass
@@ -176,3 +180,64 @@ def test_calculate_adjustment_amount_for_earn_rule() -> None:
             adjustment_data.expected_accepted,
             adjustment_data.expected_adjustment_amount,
         ), f"Test case: {data[0]} ({data[1].loyalty_type.name})"
+
+
+def test_calculate_adjustment_amounts_batch_matches_calculate_adjustment_amounts() -> None:
+    campaigns = [
+        Campaign(
+            slug="accumulator-capped",
+            loyalty_type=LoyaltyTypes.ACCUMULATOR,
+            earn_rules=[EarnRule(threshold=500, increment=None, increment_multiplier=Decimal("1.50"), max_amount=2000)],
+            reward_rule=RewardRule(allocation_window=7),
+        ),
+        Campaign(
+            slug="accumulator-no-refunds",
+            loyalty_type=LoyaltyTypes.ACCUMULATOR,
+            earn_rules=[
+                EarnRule(threshold=0, increment=None, increment_multiplier=Decimal("1.00"), max_amount=0),
+                EarnRule(threshold=300, increment=None, increment_multiplier=Decimal("0.33"), max_amount=1000),
+            ],
+            reward_rule=RewardRule(allocation_window=0),
+        ),
+        Campaign(
+            slug="stamps",
+            loyalty_type=LoyaltyTypes.STAMPS,
+            earn_rules=[EarnRule(threshold=500, increment=100, increment_multiplier=Decimal("2.00"), max_amount=0)],
+            reward_rule=RewardRule(allocation_window=0),
+        ),
+        Campaign(slug="no-earn-rules", loyalty_type=LoyaltyTypes.STAMPS, earn_rules=[], reward_rule=None),
+    ]
+    tx_amounts = [0, 1, 299, 300, 499, 500, 999, 1000, 1001, 2000, 2001, 150000, -1, -500, -1001, -2000, -2001]
+
+    expected = [calculate_adjustment_amounts(campaigns, tx_amount) for tx_amount in tx_amounts]
+
+    assert calculate_adjustment_amounts_batch(campaigns, tx_amounts) == expected
+    assert calculate_adjustment_amounts_batch(compile_adjustment_rules(campaigns), tx_amounts) == expected
+    assert calculate_adjustment_amounts_batch(campaigns, []) == []
+
+
+def test_compile_adjustment_rules_rejects_sub_hundredth_multipliers() -> None:
+    campaign = Campaign(
+        slug="campaign",
+        loyalty_type=LoyaltyTypes.ACCUMULATOR,
+        earn_rules=[EarnRule(threshold=0, increment=None, increment_multiplier=Decimal("1.005"), max_amount=0)],
+        reward_rule=RewardRule(allocation_window=0),
+    )
+    with pytest.raises(ValueError):
+        compile_adjustment_rules([campaign])
+
+
+def test_calculate_adjustment_amounts_uses_fixed_point_multipliers() -> None:
+    campaign = Campaign(
+        slug="campaign",
+        loyalty_type=LoyaltyTypes.ACCUMULATOR,
+        earn_rules=[EarnRule(threshold=0, increment=None, increment_multiplier=Decimal("1.15"), max_amount=0)],
+        reward_rule=RewardRule(allocation_window=0),
+    )
+    amount = calculate_adjustment_amounts([campaign], 333)["campaign"]["amount"]
+    assert amount == Decimal("382.95")
+
+    campaign.earn_rules[0].increment_multiplier = Decimal("2.00")
+    amount = calculate_adjustment_amounts([campaign], 333)["campaign"]["amount"]
+    assert amount == 666
+    assert isinstance(amount, int)
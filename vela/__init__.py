@@ -5,13 +5,17 @@ from fastapi_prometheus_metrics.manager import PrometheusManager
 from fastapi_prometheus_metrics.middleware import MetricsSecurityMiddleware, PrometheusMiddleware
 from starlette.exceptions import HTTPException
 
+from vela.activity_utils.tasks import start_activity_publisher, stop_activity_publisher
 from vela.api.api import api_router
+from vela.api.middleware import DBQueryMetricsMiddleware
+from vela.api.tasks import flush_enqueued_tasks
 from vela.core.config import settings
 from vela.core.exception_handlers import (
     http_exception_handler,
     request_validation_handler,
     unexpected_exception_handler,
 )
+from vela.internal_requests import close_client_session, open_client_session
 from vela.version import __version__
 
 
@@ -28,9 +32,17 @@ def create_app() -> FastAPI:
 
     app.add_middleware(MetricsSecurityMiddleware)
     app.add_middleware(PrometheusMiddleware)
+    if settings.DB_QUERY_METRICS:
+        app.add_middleware(DBQueryMetricsMiddleware)
 
     PrometheusManager(settings.PROJECT_NAME, metric_name_prefix="bpl")  # initialise signals
 
+    app.add_event_handler("startup", open_client_session)
+    app.add_event_handler("startup", start_activity_publisher)
+    app.add_event_handler("shutdown", flush_enqueued_tasks)
+    app.add_event_handler("shutdown", stop_activity_publisher)
+    app.add_event_handler("shutdown", close_client_session)
+
     # Prevent 307 temporary redirects if URLs have slashes on the end
     app.router.redirect_slashes = False
 
@@ -0,0 +1,93 @@
+"""
+Activities captured as plain immutable facts on the request path.
+
+Formatting and schema validation of their payloads is left to the activity publisher, which calls payload() right
+before sending them.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import TYPE_CHECKING, ClassVar, Protocol
+from uuid import UUID
+
+from vela.activity_utils.enums import ActivityType
+
+if TYPE_CHECKING:  # pragma: no cover
+    from vela.models import ProcessedTransaction
+
+
+class DeferredActivity(Protocol):
+    routing_key: ClassVar[str]
+
+    def payload(self) -> dict: ...
+
+
+def _now() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+
+@dataclass(frozen=True, slots=True)
+class ProcessedTxFacts:
+    transaction_id: str
+    datetime: datetime
+    amount: int
+    mid: str
+    account_holder_uuid: UUID
+    campaign_slugs: tuple[str, ...]
+
+    @classmethod
+    def from_processed_transaction(cls, processed_tx: "ProcessedTransaction") -> "ProcessedTxFacts":
+        return cls(
+            transaction_id=processed_tx.transaction_id,
+            datetime=processed_tx.datetime,
+            amount=processed_tx.amount,
+            mid=processed_tx.mid,
+            account_holder_uuid=processed_tx.account_holder_uuid,
+            campaign_slugs=tuple(processed_tx.campaign_slugs),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class TxHistoryActivity:
+    routing_key: ClassVar[str] = ActivityType.TX_HISTORY.value
+
+    processed_tx: ProcessedTxFacts
+    retailer_slug: str
+    adjustment_amounts: Mapping[str, dict]
+    is_refund: bool
+    store_name: str
+    activity_datetime: datetime = field(default_factory=_now)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "adjustment_amounts", MappingProxyType(dict(self.adjustment_amounts)))
+
+    def payload(self) -> dict:
+        return ActivityType.get_processed_tx_activity_data(
+            processed_tx=self.processed_tx,
+            retailer_slug=self.retailer_slug,
+            adjustment_amounts=dict(self.adjustment_amounts),
+            is_refund=self.is_refund,
+            store_name=self.store_name,
+            activity_datetime=self.activity_datetime,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class TxImportActivity:
+    routing_key: ClassVar[str] = ActivityType.TX_IMPORT.value
+
+    transaction: Mapping[str, object]
+    data: Mapping[str, object]
+    activity_datetime: datetime = field(default_factory=_now)
+
+    def __post_init__(self) -> None:
+        # the request keeps updating its own copies of these
+        object.__setattr__(self, "transaction", MappingProxyType(dict(self.transaction)))
+        object.__setattr__(self, "data", MappingProxyType(dict(self.data)))
+
+    def payload(self) -> dict:
+        return ActivityType.get_tx_import_activity_data(
+            transaction=dict(self.transaction), data=dict(self.data), activity_datetime=self.activity_datetime
+        )
@@ -10,7 +10,8 @@ from vela.enums import CampaignStatuses, HttpErrors
 from .utils import build_tx_history_earns, build_tx_history_reasons, pence_integer_to_currency_string
 
 if TYPE_CHECKING:
-    from vela.models import ProcessedTransaction, RetailerRewards
+    from vela.activity_utils.deferred import ProcessedTxFacts
+    from vela.models import ProcessedTransaction
 
 
 class TxImportReasons(Enum):
@@ -85,6 +86,7 @@ class ActivityType(Enum):
         transaction: dict,
         data: dict,
         currency: str = "GBP",
+        activity_datetime: datetime | None = None,
     ) -> dict:
         reason = []
         if data["error"] != "N/A":
@@ -98,7 +100,7 @@ class ActivityType(Enum):
         return cls._assemble_payload(
             ActivityType.TX_IMPORT,
             underlying_datetime=transaction["datetime"],
-            activity_datetime=datetime.now(tz=timezone.utc),
+            activity_datetime=activity_datetime or datetime.now(tz=timezone.utc),
             summary=summary,
             reasons=reason,
             activity_identifier=transaction["transaction_id"],
@@ -118,26 +120,25 @@ class ActivityType(Enum):
     def get_processed_tx_activity_data(  # noqa: PLR0913
         cls,
         *,
-        processed_tx: "ProcessedTransaction",
-        retailer: "RetailerRewards",
+        processed_tx: "ProcessedTransaction | ProcessedTxFacts",
+        retailer_slug: str,
         adjustment_amounts: dict,
         is_refund: bool,
         store_name: str,
         currency: str = "GBP",
+        activity_datetime: datetime | None = None,
     ) -> dict:
-        # NOTE: retailer and processed_tx are not bound to this db_session
-        # so we can't use the relationships on those objects i.e: retailer.stores & processed_tx.retailer
         return cls._assemble_payload(
             ActivityType.TX_HISTORY,
             underlying_datetime=processed_tx.datetime,
-            activity_datetime=datetime.now(tz=timezone.utc),
-            summary=f"{retailer.slug} Transaction Processed for {store_name} (MID: {processed_tx.mid})",
+            activity_datetime=activity_datetime or datetime.now(tz=timezone.utc),
+            summary=f"{retailer_slug} Transaction Processed for {store_name} (MID: {processed_tx.mid})",
             reasons=build_tx_history_reasons(processed_tx.amount, adjustment_amounts, is_refund, currency),
             activity_identifier=processed_tx.transaction_id,
             user_id=processed_tx.account_holder_uuid,
             associated_value=pence_integer_to_currency_string(processed_tx.amount, currency),
-            retailer_slug=retailer.slug,
-            campaigns=processed_tx.campaign_slugs,
+            retailer_slug=retailer_slug,
+            campaigns=list(processed_tx.campaign_slugs),
             data=ProcessedTXEventSchema(
                 transaction_id=processed_tx.transaction_id,
                 datetime=processed_tx.datetime,
@@ -1,8 +1,21 @@
 import asyncio
+import logging
+
+from typing import TYPE_CHECKING
 
 from cosmos_message_lib import get_connection_and_exchange, verify_payload_and_send_activity
 
 from vela.core.config import settings
+from vela.tasks.prometheus.metrics import activities_dropped_total, activity_publisher_queue_size
+
+if TYPE_CHECKING:  # pragma: no cover
+    from kombu import Connection
+
+    from vela.activity_utils.deferred import DeferredActivity
+
+    Activity = dict | DeferredActivity
+
+logger = logging.getLogger(__name__)
 
 connection, exchange = get_connection_and_exchange(
     rabbitmq_dsn=settings.RABBITMQ_DSN,
@@ -10,8 +23,110 @@ connection, exchange = get_connection_and_exchange(
 )
 
 
-async def async_send_activity(payload: dict, *, routing_key: str) -> None:
-    await asyncio.to_thread(verify_payload_and_send_activity, connection, exchange, payload, routing_key)
+class ActivityPublisher:
+    """
+    Publishes activities from a bounded in memory queue.
+
+    The queue is the only buffer between the request path and rabbitmq: callers await publish, so when the queue is
+    full they either wait for a free slot or have the activity dropped depending on
+    ACTIVITY_PUBLISHER_HIGH_WATER_MARK_POLICY.
+
+    The queue is drained by ACTIVITY_PUBLISHER_CONNECTIONS background tasks, each owning its own rabbitmq connection.
+    Each drain task hands up to ACTIVITY_PUBLISHER_MAX_PER_THREAD_HOP queued activities to a worker thread at once,
+    which only saves thread round trips: every activity is still published with its own send. cosmos_message_lib's
+    verify_payload_and_send_activity is the only send it offers and it takes a connection rather than a producer, so
+    a producer cannot be shared across a batch without bypassing the payload validation the library owns.
+
+    Deferred activities have their payload built in the publishing thread, right before being sent.
+    """
+
+    def __init__(self) -> None:
+        self._queue: asyncio.Queue[tuple[Activity, str]] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._connections: list[Connection] = []
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    def start(self) -> None:
+        if self.running:
+            return
+
+        self._queue = asyncio.Queue(maxsize=settings.ACTIVITY_PUBLISHER_QUEUE_SIZE)
+        for _ in range(settings.ACTIVITY_PUBLISHER_CONNECTIONS):
+            worker_connection = connection.clone()
+            self._connections.append(worker_connection)
+            self._workers.append(asyncio.create_task(self._drain(self._queue, worker_connection)))
+
+    async def stop(self) -> None:
+        if (queue := self._queue) is None:
+            return
+
+        # activities published from now on are sent straight away
+        self._queue = None
+        try:
+            await asyncio.wait_for(queue.join(), timeout=settings.ACTIVITY_PUBLISHER_SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.error("Timed out flushing activities, %d activities have not been sent.", queue.qsize())
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        for worker_connection in self._connections:
+            worker_connection.release()
+
+        self._workers, self._connections = [], []
+
+    async def publish(self, activity: "Activity", routing_key: str) -> None:
+        if self._queue is None:
+            await asyncio.to_thread(self._publish_each, connection, [(activity, routing_key)])
+            return
+
+        if self._queue.full() and settings.ACTIVITY_PUBLISHER_HIGH_WATER_MARK_POLICY == "drop":
+            activities_dropped_total.labels(app=settings.PROJECT_NAME, routing_key=routing_key).inc()
+            logger.warning("Activity queue full, dropping activity for routing key %s", routing_key)
+            return
+
+        await self._queue.put((activity, routing_key))
+        activity_publisher_queue_size.labels(app=settings.PROJECT_NAME).set(self._queue.qsize())
+
+    @staticmethod
+    def _publish_each(worker_connection: "Connection", activities: list[tuple["Activity", str]]) -> None:
+        for activity, routing_key in activities:
+            try:
+                payload = activity if isinstance(activity, dict) else activity.payload()
+                verify_payload_and_send_activity(worker_connection, exchange, payload, routing_key)
+            except Exception:
+                logger.exception("Failed to publish activity for routing key %s", routing_key)
+
+    async def _drain(self, queue: asyncio.Queue, worker_connection: "Connection") -> None:
+        while True:
+            activities: list[tuple[Activity, str]] = [await queue.get()]
+            while len(activities) < settings.ACTIVITY_PUBLISHER_MAX_PER_THREAD_HOP and not queue.empty():
+                activities.append(queue.get_nowait())
+
+            try:
+                await asyncio.to_thread(self._publish_each, worker_connection, activities)
+            finally:
+                for _ in activities:
+                    queue.task_done()
+                activity_publisher_queue_size.labels(app=settings.PROJECT_NAME).set(queue.qsize())
+
+
+activity_publisher = ActivityPublisher()
+
+
+async def start_activity_publisher() -> None:
+    activity_publisher.start()
+
+
+async def stop_activity_publisher() -> None:
+    await activity_publisher.stop()
+
+
+async def async_send_activity(activity: "Activity", *, routing_key: str) -> None:
+    await activity_publisher.publish(activity, routing_key)
 
 
 def sync_send_activity(payload: dict, *, routing_key: str) -> None:
@@ -1,7 +1,12 @@
-from babel.numbers import format_currency
+from functools import lru_cache
+
+from babel import Locale
+from babel.numbers import NumberPattern, parse_pattern
 
 from vela.enums import LoyaltyTypes
 
+LOCALE = "en_GB"
+
 
 def build_tx_history_reasons(tx_amount: int, adjustments: dict, is_refund: bool, currency: str) -> list[str]:
     reasons = []
@@ -35,10 +40,24 @@ def build_tx_history_earns(adjustments: dict, currency: str) -> list[dict[str, s
     return earns
 
 
+@lru_cache(maxsize=64)
+def _get_currency_pattern(locale: str, currency_sign: bool) -> tuple[Locale, NumberPattern]:
+    parsed_locale = Locale.parse(locale)
+    return parsed_locale, parsed_locale.currency_formats["standard"] if currency_sign else parse_pattern("#,##0.##")
+
+
+def _format_gbp_pence(value: int, currency_sign: bool) -> str:
+    pounds, pence = divmod(abs(value), 100)
+    return f"{'-' if value < 0 else ''}{'£' if currency_sign else ''}{pounds:,}.{pence:02d}"
+
+
 def pence_integer_to_currency_string(value: int, currency: str, currency_sign: bool = True) -> str:
-    return format_currency(
-        number=value / 100,
-        currency=currency,
-        locale="en_GB",
-        format=None if currency_sign else "#,##0.##",
-    )
+    """
+    Same output as babel's format_currency(value / 100, currency, locale="en_GB"), the locale and number pattern are
+    parsed once and GBP, our only currency at the moment, is formatted with integer arithmetic only.
+    """
+    if currency == "GBP" and isinstance(value, int):
+        return _format_gbp_pence(value, currency_sign)
+
+    locale, pattern = _get_currency_pattern(LOCALE, currency_sign)
+    return pattern.apply(value / 100, locale, currency=currency)
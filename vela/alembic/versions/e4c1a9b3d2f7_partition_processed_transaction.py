@@ -0,0 +1,197 @@
+"""partition processed_transaction by month
+
+Revision ID: e4c1a9b3d2f7
+Revises: b3cb4a2f8231
+Create Date: 2026-10-17 10:12:41.513092
+
+"""
+
+from datetime import date, datetime, timezone
+
+import sqlalchemy as sa
+
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "e4c1a9b3d2f7"
+down_revision = "b3cb4a2f8231"
+branch_labels = None
+depends_on = None
+
+PREMAKE_MONTHS = 3
+BACKFILL_BATCH_SIZE = 10000
+COLUMNS = (
+    "id, created_at, updated_at, transaction_id, amount, mid, datetime, account_holder_uuid, "
+    "payment_transaction_id, retailer_id, campaign_slugs"
+)
+
+
+def _add_months(month: date, months: int) -> date:
+    month_index = month.year * 12 + month.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _create_table(table_name: str, partitioned: bool) -> None:
+    op.create_table(
+        table_name,
+        sa.Column(
+            "id",
+            sa.Integer(),
+            server_default=sa.text("nextval('processed_transaction_id_seq'::regclass)"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("TIMEZONE('utc', CURRENT_TIMESTAMP)"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("TIMEZONE('utc', CURRENT_TIMESTAMP)"), nullable=False
+        ),
+        sa.Column("transaction_id", sa.String(length=128), nullable=False),
+        sa.Column("amount", sa.Integer(), nullable=False),
+        sa.Column("mid", sa.String(length=128), nullable=False),
+        sa.Column("datetime", sa.DateTime(), nullable=False),
+        sa.Column("account_holder_uuid", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("payment_transaction_id", sa.String(length=128), nullable=True),
+        sa.Column("retailer_id", sa.Integer(), nullable=True),
+        sa.Column("campaign_slugs", postgresql.ARRAY(sa.String(length=128)), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["retailer_id"], ["retailer_rewards.id"], name=f"{table_name}_retailer_id_fkey", ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint(*(("id", "created_at") if partitioned else ("id",)), name=f"{table_name}_pkey"),
+        postgresql_partition_by="RANGE (created_at)" if partitioned else None,
+    )
+
+
+def _swap_tables(new_table_name: str) -> None:
+    """Moves the processed_transaction rows into new_table_name and replaces processed_transaction with it."""
+    op.execute(f"INSERT INTO {new_table_name} ({COLUMNS}) SELECT {COLUMNS} FROM processed_transaction")  # noqa: S608
+    op.execute(f"ALTER SEQUENCE processed_transaction_id_seq OWNED BY {new_table_name}.id")
+    op.drop_table("processed_transaction")
+    op.rename_table(new_table_name, "processed_transaction")
+    op.execute(f"ALTER INDEX {new_table_name}_pkey RENAME TO processed_transaction_pkey")
+    op.execute(
+        f"ALTER TABLE processed_transaction RENAME CONSTRAINT {new_table_name}_retailer_id_fkey "
+        "TO processed_transaction_retailer_id_fkey"
+    )
+    _create_indexes()
+
+
+def _create_indexes() -> None:
+    op.create_index(
+        op.f("ix_processed_transaction_transaction_id"), "processed_transaction", ["transaction_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_processed_transaction_payment_transaction_id"),
+        "processed_transaction",
+        ["payment_transaction_id"],
+        unique=False,
+    )
+
+
+def _backfill_keys(after_id: int, up_to_id: int) -> None:
+    """Copies the keys of the processed transactions with an id in (after_id, up_to_id], BACKFILL_BATCH_SIZE ids at a time."""
+    for batch_start in range(after_id, up_to_id, BACKFILL_BATCH_SIZE):
+        op.get_bind().execute(
+            sa.text(
+                "INSERT INTO processed_transaction_key (retailer_id, transaction_id, created_at) "
+                "SELECT retailer_id, transaction_id, created_at FROM processed_transaction "
+                "WHERE id > :start AND id <= :end AND retailer_id IS NOT NULL "
+                "ON CONFLICT DO NOTHING"
+            ),
+            {"start": batch_start, "end": min(batch_start + BACKFILL_BATCH_SIZE, up_to_id)},
+        )
+
+
+def _get_max_id() -> int:
+    return op.get_bind().execute(sa.text("SELECT coalesce(max(id), 0) FROM processed_transaction")).scalar_one()
+
+
+def upgrade() -> None:
+    # The existing table becomes the partition for the current month, also holding every earlier row, and only the
+    # following months get new partitions. Everything that has to scan it is done first without blocking writes, so
+    # that the swap itself only changes the catalog. Rows created after the cutover would break the CHECK constraint,
+    # don't run this at the very end of a month.
+    current_month = datetime.now(tz=timezone.utc).date().replace(day=1)
+    cutover = _add_months(current_month, 1)
+    current_partition = f"processed_transaction_p{current_month:%Y_%m}"
+
+    op.create_table(
+        "processed_transaction_key",
+        sa.Column("retailer_id", sa.Integer(), nullable=False),
+        sa.Column("transaction_id", sa.String(length=128), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("TIMEZONE('utc', CURRENT_TIMESTAMP)"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(["retailer_id"], ["retailer_rewards.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("retailer_id", "transaction_id", name="processed_transaction_key_pkey"),
+    )
+    op.create_index(
+        op.f("ix_processed_transaction_key_created_at"), "processed_transaction_key", ["created_at"], unique=False
+    )
+    with op.get_context().autocommit_block():
+        # the partitioned table's primary key must include created_at
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS processed_transaction_id_created_at_key "
+            "ON processed_transaction (id, created_at)"
+        )
+        backfilled_id = _get_max_id()
+        _backfill_keys(0, backfilled_id)
+        # proves the rows fit in the partition's range, so attaching it does not scan the table under lock
+        op.execute(
+            "ALTER TABLE processed_transaction ADD CONSTRAINT processed_transaction_cutover_check "
+            f"CHECK (created_at < '{cutover.isoformat()}') NOT VALID"
+        )
+        op.execute("ALTER TABLE processed_transaction VALIDATE CONSTRAINT processed_transaction_cutover_check")
+
+    # blocks writes while the last keys are copied, the catalog changes below then briefly block reads too
+    op.execute("LOCK TABLE processed_transaction IN EXCLUSIVE MODE")
+    _backfill_keys(backfilled_id, _get_max_id())
+    op.execute(
+        "ALTER TABLE processed_transaction DROP CONSTRAINT process_transaction_retailer_unq, "
+        "DROP CONSTRAINT processed_transaction_pkey, "
+        "ADD CONSTRAINT processed_transaction_pkey PRIMARY KEY USING INDEX processed_transaction_id_created_at_key"
+    )
+    op.rename_table("processed_transaction", current_partition)
+    op.execute(
+        f"ALTER TABLE {current_partition} RENAME CONSTRAINT processed_transaction_pkey TO {current_partition}_pkey"
+    )
+    op.execute(
+        f"ALTER TABLE {current_partition} RENAME CONSTRAINT processed_transaction_retailer_id_fkey "
+        f"TO {current_partition}_retailer_id_fkey"
+    )
+    op.execute(f"ALTER INDEX ix_processed_transaction_transaction_id RENAME TO {current_partition}_transaction_id_idx")
+    op.execute(
+        "ALTER INDEX ix_processed_transaction_payment_transaction_id "
+        f"RENAME TO {current_partition}_payment_transaction_id_idx"
+    )
+
+    _create_table("processed_transaction", partitioned=True)
+    op.execute("ALTER SEQUENCE processed_transaction_id_seq OWNED BY processed_transaction.id")
+    _create_indexes()
+    # the matching primary key, foreign key and indexes of the current partition are attached rather than rebuilt
+    op.execute(
+        f"ALTER TABLE processed_transaction ATTACH PARTITION {current_partition} "
+        f"FOR VALUES FROM (MINVALUE) TO ('{cutover.isoformat()}')"
+    )
+    op.execute(f"ALTER TABLE {current_partition} DROP CONSTRAINT processed_transaction_cutover_check")
+
+    month = cutover
+    while month <= _add_months(current_month, PREMAKE_MONTHS):
+        op.execute(
+            f"CREATE TABLE processed_transaction_p{month:%Y_%m} PARTITION OF processed_transaction "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+
+    op.execute("CREATE TABLE processed_transaction_default PARTITION OF processed_transaction DEFAULT")
+
+
+def downgrade() -> None:
+    op.execute("LOCK TABLE processed_transaction IN EXCLUSIVE MODE")
+    _create_table("processed_transaction_unpartitioned", partitioned=False)
+    _swap_tables("processed_transaction_unpartitioned")
+    op.create_unique_constraint(
+        "process_transaction_retailer_unq", "processed_transaction", ["transaction_id", "retailer_id"]
+    )
+    op.drop_table("processed_transaction_key")
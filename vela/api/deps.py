@@ -6,7 +6,7 @@ from typing import TYPE_CHECKING
 from fastapi import Depends, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from vela import crud
+from vela.caches.retailers import get_cached_retailer_by_slug
 from vela.core.config import settings
 from vela.db.session import AsyncSessionMaker
 from vela.enums import HttpErrors
@@ -38,4 +38,4 @@ def user_is_authorised(token: str = Depends(get_authorization_token)) -> None:
 
 
 async def retailer_is_valid(retailer_slug: str, db_session: AsyncSession = Depends(get_session)) -> "RetailerRewards":
-    return await crud.get_retailer_by_slug(db_session, retailer_slug)
+    return await get_cached_retailer_by_slug(db_session, retailer_slug)
@@ -1,7 +1,7 @@
 import asyncio
 
 from datetime import datetime, timezone
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic.types import constr
@@ -20,6 +20,9 @@ from vela.internal_requests import put_carina_campaign
 from vela.models.retailer import Campaign, RetailerRewards
 from vela.schemas import CampaignsStatusChangeSchema
 
+if TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy.engine import Row
+
 router = APIRouter()
 
 
@@ -77,38 +80,94 @@ async def _check_valid_campaigns(
     return formatted_errors, status_code, valid_campaigns
 
 
-async def _campaign_status_change(
-    db_session: "AsyncSession", campaign: Campaign, requested_status: CampaignStatuses, sso_username: str
-) -> None:
-    original_status = campaign.status
+async def _put_carina_campaigns(
+    retailer: RetailerRewards, campaigns: list[Campaign], requested_status: CampaignStatuses
+) -> tuple[list[Campaign], BaseException | None]:
+    """
+    Updates the campaigns in carina concurrently.
 
-    async def _query(campaign: Campaign) -> None:
-        campaign.status = requested_status
-        now = datetime.now(tz=timezone.utc).replace(tzinfo=None)
-        if requested_status in (CampaignStatuses.CANCELLED, CampaignStatuses.ENDED):
-            campaign.end_date = now
-        elif requested_status == CampaignStatuses.ACTIVE:
-            campaign.start_date = now
+    Returns the campaigns carina has updated and the error to raise for the first campaign it has not, if any.
+    """
+    semaphore = asyncio.Semaphore(settings.CARINA_REQUESTS_CONCURRENCY)
 
-        await db_session.commit()
+    async def _put_carina_campaign(campaign: Campaign) -> tuple[int, str]:
+        async with semaphore:
+            return await put_carina_campaign(
+                retailer_slug=retailer.slug,
+                campaign_slug=campaign.slug,
+                reward_slug=campaign.reward_rule.reward_slug,
+                requested_status=requested_status.value,
+            )
 
-    await async_run_query(_query, db_session, campaign=campaign)
-
-    await db_session.refresh(campaign)
-    campaigns_status_change_activity_payload = ActivityType.get_campaign_status_change_activity_data(
-        updated_at=campaign.updated_at,
-        campaign_name=campaign.name,
-        campaign_slug=campaign.slug,
-        retailer_slug=campaign.retailer.slug,
-        original_status=original_status,
-        new_status=campaign.status,
-        sso_username=sso_username,
-    )
-    asyncio.create_task(
-        async_send_activity(campaigns_status_change_activity_payload, routing_key=ActivityType.CAMPAIGN.value)
+    carina_results = await asyncio.gather(*(_put_carina_campaign(c) for c in campaigns), return_exceptions=True)
+    carina_responses: dict[str, str] = {}
+    updated_campaigns: list[Campaign] = []
+    first_failure: tuple[Campaign, int] | BaseException | None = None
+    for campaign, carina_result in zip(campaigns, carina_results, strict=True):
+        if isinstance(carina_result, BaseException):
+            first_failure = first_failure or carina_result
+            continue
+
+        carina_status_code, carina_responses[campaign.slug] = carina_result
+        if 200 <= carina_status_code <= 300:
+            updated_campaigns.append(campaign)
+        else:
+            first_failure = first_failure or (campaign, carina_status_code)
+
+    if not isinstance(first_failure, tuple):
+        return updated_campaigns, first_failure
+
+    failed_campaign, carina_status_code = first_failure
+    return updated_campaigns, HTTPException(
+        detail={
+            "display_message": f"Unable to update campaign: {failed_campaign.slug} due to upstream errors. Carina "
+            f"responses: {carina_responses}. Successfully updated campaigns: "
+            f"{[campaign.slug for campaign in updated_campaigns]}.",
+            "code": "CARINA_RESPONSE_ERROR",
+        },
+        status_code=carina_status_code,
     )
 
 
+async def _send_status_change_activities(
+    retailer: RetailerRewards,
+    updated_campaigns: list["Row"],
+    original_statuses: dict[int, CampaignStatuses],
+    sso_username: str,
+) -> None:
+    for campaign in updated_campaigns:
+        campaigns_status_change_activity_payload = ActivityType.get_campaign_status_change_activity_data(
+            updated_at=campaign.updated_at,
+            campaign_name=campaign.name,
+            campaign_slug=campaign.slug,
+            retailer_slug=retailer.slug,
+            original_status=original_statuses[campaign.id],
+            new_status=campaign.status,
+            sso_username=sso_username,
+        )
+        await async_send_activity(campaigns_status_change_activity_payload, routing_key=ActivityType.CAMPAIGN.value)
+
+
+async def _enqueue_status_change_tasks(db_session: AsyncSession, tasks_to_run_ids: list[int]) -> None:
+    try:
+        await enqueue_many_tasks(retry_tasks_ids=tasks_to_run_ids)
+
+    except Exception:
+
+        async def _clean_up() -> None:
+            await db_session.execute(
+                RetryTask.__table__.delete()
+                .where(RetryTask.retry_task_id.in_(tasks_to_run_ids))
+                .execution_options(synchronize_session=False)
+            )
+            await db_session.commit()
+
+        await async_run_query(_clean_up, db_session, rollback_on_exc=True)
+        raise HTTPException(
+            detail="Failed to enqueue tasks.", status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        ) from None
+
+
 @router.post(
     path="/{retailer_slug}/campaigns/status_change",
     status_code=status.HTTP_200_OK,
@@ -129,8 +188,6 @@ async def campaigns_status_change(
         payload.campaign_slugs, campaigns, requested_status
     )
 
-    tasks_to_run_ids: list[int] = []
-
     # Check that this retailer will not be left with no active campaigns
     if requested_status in (CampaignStatuses.ENDED, CampaignStatuses.CANCELLED):
         await _check_remaining_active_campaigns(
@@ -138,74 +195,30 @@ async def campaigns_status_change(
         )
         balance_task_type = settings.DELETE_CAMPAIGN_BALANCES_TASK_NAME
 
-    vela_campaigns_updated = []
-    carina_responses = {}
     if valid_campaigns:
-        for campaign in valid_campaigns:
-            carina_status_code, carina_resp_msg = await put_carina_campaign(
-                retailer_slug=retailer.slug,
-                campaign_slug=campaign.slug,
-                reward_slug=campaign.reward_rule.reward_slug,
-                requested_status=requested_status.value,
+        # carina is updated concurrently, the campaigns it accepted are then all updated in a single transaction
+        # so that vela stays in line with carina even when some of the calls fail.
+        updated_campaigns, carina_error = await _put_carina_campaigns(retailer, valid_campaigns, requested_status)
+        if updated_campaigns:
+            original_statuses = {campaign.id: campaign.status for campaign in updated_campaigns}
+            updated_campaigns_rows, tasks_to_run_ids = await crud.update_campaigns_status(
+                db_session,
+                retailer,
+                updated_campaigns,
+                requested_status,
+                status_change_datetime=datetime.now(tz=timezone.utc).replace(tzinfo=None),
+                balance_task_type=balance_task_type,
+                issue_pending_rewards=bool(
+                    payload.issue_pending_rewards and requested_status == CampaignStatuses.ENDED
+                ),
             )
-            carina_responses[campaign.slug] = carina_resp_msg
-
-            if 200 <= carina_status_code <= 300:
-                if campaign.reward_rule.allocation_window > 0 and requested_status in (
-                    CampaignStatuses.CANCELLED,
-                    CampaignStatuses.ENDED,
-                ):
-                    pending_reward_retry_task = await crud.create_pending_rewards_task(
-                        db_session=db_session,
-                        campaign=campaign,
-                        retailer=retailer,
-                        issue_pending_rewards=payload.issue_pending_rewards
-                        and requested_status == CampaignStatuses.ENDED,
-                    )
-                    tasks_to_run_ids.append(pending_reward_retry_task.retry_task_id)
-                await _campaign_status_change(
-                    db_session=db_session,
-                    campaign=campaign,
-                    requested_status=requested_status,
-                    sso_username=payload.activity_metadata.sso_username,
-                )
-                vela_campaigns_updated.append(campaign.slug)
-
-                retry_tasks_ids = await crud.create_reward_cancel_and_campaign_balances_tasks(
-                    db_session=db_session,
-                    campaign=campaign,
-                    retailer=retailer,
-                    status=payload.requested_status,
-                    balance_task_type=balance_task_type,
-                )
-                tasks_to_run_ids.extend(retry_tasks_ids)
-            else:
-                raise HTTPException(
-                    detail={
-                        "display_message": f"Unable to update campaign: {campaign.slug} due to upstream errors. Carina "
-                        f"responses: {carina_responses}. Successfully updated campaigns: {vela_campaigns_updated}.",
-                        "code": "CARINA_RESPONSE_ERROR",
-                    },
-                    status_code=carina_status_code,
-                )
-
-        try:
-            await enqueue_many_tasks(retry_tasks_ids=tasks_to_run_ids)
-
-        except Exception:
-
-            async def _clean_up() -> None:
-                await db_session.execute(
-                    RetryTask.__table__.delete()
-                    .where(RetryTask.retry_task_id.in_(tasks_to_run_ids))
-                    .execution_options(synchronize_session=False)
-                )
-                await db_session.commit()
-
-            await async_run_query(_clean_up, db_session, rollback_on_exc=True)
-            raise HTTPException(
-                detail="Failed to enqueue tasks.", status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-            ) from None
+            await _send_status_change_activities(
+                retailer, updated_campaigns_rows, original_statuses, payload.activity_metadata.sso_username
+            )
+            await _enqueue_status_change_tasks(db_session, tasks_to_run_ids)
+
+        if carina_error is not None:
+            raise carina_error
 
     if errors:  # pragma: no cover
         raise HTTPException(detail=errors, status_code=status_code)
@@ -1,20 +1,31 @@
 import asyncio
 from typing import Any
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from vela import crud
-from vela.activity_utils.enums import ActivityType
+from vela.activity_utils.deferred import ProcessedTxFacts, TxHistoryActivity, TxImportActivity
 from vela.activity_utils.tasks import async_send_activity
 from vela.api.deps import get_session, retailer_is_valid, user_is_authorised
 from vela.api.tasks import enqueue_many_tasks
-from vela.core.utils import calculate_adjustment_amounts
+from vela.caches.account_holders import get_cached_account_holder_status
+from vela.caches.active_campaigns import (
+    CampaignSnapshot,
+    get_active_campaigns_snapshot,
+    get_cached_active_campaigns,
+)
+from vela.caches.stores import get_cached_store_name
+from vela.core.adjustments import calculate_adjustment_amounts_batch
+from vela.core.config import settings
+from vela.core.stage_timer import StageTimer
+from vela.core.utils import calculate_adjustment_amounts, filter_active_campaigns
 from vela.enums import HttpErrors, TransactionProcessingStatuses
-from vela.internal_requests import validate_account_holder
-from vela.models import RetailerRewards
-from vela.models.transaction import Transaction
-from vela.schemas import CreateTransactionSchema
+from vela.internal_requests import check_account_holder_status
+from vela.models import ProcessedTransaction, RetailerRewards
+from vela.schemas import CreateTransactionsBatchSchema, CreateTransactionSchema, TransactionResultSchema
 
 router = APIRouter()
 
@@ -25,37 +36,62 @@ async def _get_transaction_response(accepted_adjustments: dict, is_refund: bool)
     return "Refunds not accepted" if is_refund else "Threshold not met"
 
 
+async def _get_active_campaigns(
+    db_session: "AsyncSession", retailer: RetailerRewards, transaction_data: dict, stage_timer: StageTimer
+) -> list[CampaignSnapshot]:
+    try:
+        with stage_timer.stage("campaign_lookup"):
+            return await get_cached_active_campaigns(db_session, retailer, transaction_data["datetime"])
+    except HTTPException:
+        # raises DUPLICATE_TRANSACTION instead if this transaction has already been stored
+        with stage_timer.stage("transaction_insert"):
+            await crud.create_transaction(
+                db_session, retailer, transaction_data | {"status": TransactionProcessingStatuses.NO_ACTIVE_CAMPAIGNS}
+            )
+        raise
+
+
 async def _process_transaction(  # noqa: PLR0913
     *,
     db_session: "AsyncSession",
     retailer: RetailerRewards,
     active_campaign_slugs: list[str],
-    transaction: Transaction,
+    transaction_data: dict,
     tx_import_activity_data: dict,
     adjustment_amounts: dict,
-) -> tuple[Transaction, bool, dict]:
+    stage_timer: StageTimer,
+) -> tuple[ProcessedTransaction, bool, dict]:
     accepted_adjustments = {k: v["amount"] for k, v in adjustment_amounts.items() if v["accepted"]}
 
-    processed_transaction = await crud.create_processed_transaction(  # nested commit
-        db_session, retailer, active_campaign_slugs, transaction
-    )
+    try:
+        with stage_timer.stage("processed_insert"):
+            processed_transaction = await crud.create_processed_transaction(
+                db_session, retailer, active_campaign_slugs, transaction_data
+            )
+    except HTTPException:
+        with stage_timer.stage("transaction_insert"):
+            await crud.create_transactions(
+                db_session, retailer, [transaction_data | {"status": TransactionProcessingStatuses.DUPLICATE}]
+            )
+        raise
+
     is_refund: bool = processed_transaction.amount < 0
     tx_import_activity_data |= {
         "active_campaign_slugs": active_campaign_slugs,
         "refunds_valid": bool(accepted_adjustments or not is_refund),
     }
 
-    await crud.delete_transaction(db_session, transaction)
-    store_name = await crud.get_retailer_store_name_by_mid(db_session, retailer.id, processed_transaction.mid) or "N/A"
+    with stage_timer.stage("store_lookup"):
+        store_name = get_cached_store_name(retailer.id, processed_transaction.mid)
 
-    tx_history_activity_payload = ActivityType.get_processed_tx_activity_data(
-        processed_tx=processed_transaction,
-        retailer=retailer,
+    tx_history_activity = TxHistoryActivity(
+        processed_tx=ProcessedTxFacts.from_processed_transaction(processed_transaction),
+        retailer_slug=retailer.slug,
         adjustment_amounts=adjustment_amounts,
         is_refund=is_refund,
         store_name=store_name,
     )
-    asyncio.create_task(async_send_activity(tx_history_activity_payload, routing_key=ActivityType.TX_HISTORY.value))
+    await async_send_activity(tx_history_activity, routing_key=TxHistoryActivity.routing_key)
 
     return processed_transaction, is_refund, accepted_adjustments
 
@@ -77,48 +113,269 @@ async def record_transaction(
         "error": "N/A",
     }
     adjustment_tasks_ids = []
+    stage_timer = StageTimer("record_transaction")
+    transaction = payload.dict(exclude_unset=True)
     try:
-        transaction_data = payload.dict(exclude_unset=True)
-
         # asyncpg can't translate tz aware to naive datetimes, remove this once we move to psycopg3.
-        transaction_data["datetime"] = transaction_data["datetime"].replace(tzinfo=None)
+        transaction_data = transaction | {"datetime": transaction["datetime"].replace(tzinfo=None)}
         # ---------------------------------------------------------------------------------------- #
-        await validate_account_holder(payload.account_holder_uuid, retailer.slug, transaction_data["datetime"])
-        transaction = await crud.create_transaction(db_session, retailer, transaction_data)  # nested commit
-        active_campaigns = await crud.get_active_campaigns(db_session, retailer, transaction, join_rules=True)
-        adjustment_amounts = calculate_adjustment_amounts(campaigns=active_campaigns, tx_amount=transaction.amount)
+        with stage_timer.stage("account_validation"):
+            check_account_holder_status(
+                await get_cached_account_holder_status(payload.account_holder_uuid, retailer.slug),
+                transaction_data["datetime"],
+            )
+        active_campaigns = await _get_active_campaigns(db_session, retailer, transaction_data, stage_timer)
+        with stage_timer.stage("adjustment_calculation"):
+            adjustment_amounts = calculate_adjustment_amounts(
+                campaigns=active_campaigns, tx_amount=transaction_data["amount"]
+            )
         active_campaign_slugs = [campaign.slug for campaign in active_campaigns]
 
         processed_transaction, is_refund, accepted_adjustments = await _process_transaction(
             db_session=db_session,
-            transaction=transaction,
+            transaction_data=transaction_data,
             retailer=retailer,
             active_campaign_slugs=active_campaign_slugs,
             tx_import_activity_data=tx_import_activity_data,
             adjustment_amounts=adjustment_amounts,
+            stage_timer=stage_timer,
         )
 
         if accepted_adjustments:
-            task_ids = await crud.create_reward_adjustment_tasks(
-                db_session, processed_transaction, accepted_adjustments
-            )
+            with stage_timer.stage("task_creation"):
+                task_ids = await crud.create_reward_adjustment_tasks(
+                    db_session, retailer, [(processed_transaction, accepted_adjustments)]
+                )
             adjustment_tasks_ids.extend(task_ids)
 
         return await _get_transaction_response(accepted_adjustments, is_refund)
     except HTTPException as ex:
         tx_import_activity_data["error"] = ex.detail["code"]  # type: ignore [index]
-        if ex == HttpErrors.NO_ACTIVE_CAMPAIGNS.value:
-            transaction.status = TransactionProcessingStatuses.NO_ACTIVE_CAMPAIGNS
         raise
 
     finally:
-        await db_session.commit()  # main db commit
+        with stage_timer.stage("commit"):
+            await db_session.commit()  # main db commit
 
         if adjustment_tasks_ids:
             asyncio.create_task(enqueue_many_tasks(retry_tasks_ids=adjustment_tasks_ids))  # main db commit + rollback
 
-        tx_import_activity_payload = ActivityType.get_tx_import_activity_data(
-            transaction=payload.dict(exclude_unset=True),
-            data=tx_import_activity_data,
+        tx_import_activity = TxImportActivity(transaction=transaction, data=tx_import_activity_data)
+        await async_send_activity(tx_import_activity, routing_key=TxImportActivity.routing_key)
+        stage_timer.finish()
+
+
+class _TransactionsBatch:
+    """
+    Keeps track of the outcome of each of the transactions submitted to the batch endpoint.
+    Every result mirrors the status code and response body the single transaction endpoint would have returned.
+    """
+
+    def __init__(self, retailer: RetailerRewards, items: list[dict]) -> None:
+        self.retailer = retailer
+        self.results: list[dict] = []
+        self.transactions: dict[int, CreateTransactionSchema] = {}
+        self.transactions_data: dict[int, dict] = {}
+        self.tx_import_activity_data: dict[int, dict] = {}
+
+        for idx, item in enumerate(items):
+            transaction_id = item.get("id")
+            self.results.append(
+                {
+                    "id": str(transaction_id) if transaction_id is not None else None,
+                    "status_code": status.HTTP_200_OK,
+                    "response": None,
+                }
+            )
+            try:
+                transaction = CreateTransactionSchema.parse_obj(item)
+            except ValidationError as ex:
+                self.results[idx] |= {
+                    "status_code": status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    "response": {
+                        "display_message": "Submitted fields are missing or invalid.",
+                        "code": "FIELD_VALIDATION_ERROR",
+                        "fields": [error["loc"][-1] for error in ex.errors()],
+                    },
+                }
+                continue
+
+            transaction_data = transaction.dict(exclude_unset=True)
+            # asyncpg can't translate tz aware to naive datetimes, remove this once we move to psycopg3.
+            transaction_data["datetime"] = transaction_data["datetime"].replace(tzinfo=None)
+
+            self.transactions[idx] = transaction
+            self.transactions_data[idx] = transaction_data
+            self.tx_import_activity_data[idx] = {
+                "retailer_slug": retailer.slug,
+                "active_campaign_slugs": None,
+                "refunds_valid": None,
+                "error": "N/A",
+            }
+
+    def pending(self) -> list[int]:
+        return [idx for idx in self.transactions if self.results[idx]["response"] is None]
+
+    def reject(self, idx: int, ex: HTTPException) -> None:
+        self.results[idx] |= {"status_code": ex.status_code, "response": ex.detail}
+        self.tx_import_activity_data[idx]["error"] = ex.detail["code"]  # type: ignore [index]
+
+
+async def _validate_batch_account_holders(batch: _TransactionsBatch) -> None:
+    semaphore = asyncio.Semaphore(settings.ACCOUNT_HOLDER_VALIDATION_CONCURRENCY)
+
+    async def _get_status(account_holder_uuid: UUID) -> dict | HTTPException:
+        async with semaphore:
+            try:
+                return await get_cached_account_holder_status(account_holder_uuid, batch.retailer.slug)
+            except HTTPException as ex:
+                return ex
+
+    account_holder_uuids = list({batch.transactions[idx].account_holder_uuid for idx in batch.pending()})
+    account_holder_statuses = dict(
+        zip(
+            account_holder_uuids,
+            await asyncio.gather(*(_get_status(account_holder_uuid) for account_holder_uuid in account_holder_uuids)),
+            strict=True,
+        )
+    )
+
+    for idx in batch.pending():
+        account_holder_status = account_holder_statuses[batch.transactions[idx].account_holder_uuid]
+        try:
+            if isinstance(account_holder_status, HTTPException):
+                raise account_holder_status
+
+            check_account_holder_status(account_holder_status, batch.transactions_data[idx]["datetime"])
+        except HTTPException as ex:
+            batch.reject(idx, ex)
+
+
+async def _reject_existing_transactions(
+    db_session: AsyncSession, retailer: RetailerRewards, batch: _TransactionsBatch
+) -> None:
+    if not (pending := batch.pending()):
+        return
+
+    existing_transaction_ids = await crud.get_existing_transaction_ids(
+        db_session, retailer, [batch.transactions_data[idx]["transaction_id"] for idx in pending]
+    )
+    for idx in pending:
+        if batch.transactions_data[idx]["transaction_id"] in existing_transaction_ids:
+            batch.reject(idx, HttpErrors.DUPLICATE_TRANSACTION.value)
+
+
+async def _create_batch_processed_transactions(
+    db_session: AsyncSession, retailer: RetailerRewards, batch: _TransactionsBatch
+) -> tuple[dict[int, ProcessedTransaction], dict[int, dict], list[dict]]:
+    retailer_campaigns = (await get_active_campaigns_snapshot(db_session, retailer)).campaigns
+    rejected_transactions_data: list[dict] = []
+    processed_transactions_data: dict[int, dict] = {}
+    # transactions are grouped by their active campaigns so that each group's adjustments are calculated at once
+    campaign_groups: dict[tuple[str, ...], tuple[list[CampaignSnapshot], list[int]]] = {}
+    # a transaction_id repeated within the batch is only a duplicate once an earlier occurrence is stored, as it would
+    # be if they had been submitted one by one, earlier occurrences rejected before this point don't count.
+    stored_transaction_ids: set[str] = set()
+    for idx in batch.pending():
+        transaction_data = batch.transactions_data[idx]
+        if transaction_data["transaction_id"] in stored_transaction_ids:
+            batch.reject(idx, HttpErrors.DUPLICATE_TRANSACTION.value)
+            rejected_transactions_data.append(transaction_data | {"status": TransactionProcessingStatuses.DUPLICATE})
+            continue
+
+        stored_transaction_ids.add(transaction_data["transaction_id"])
+        if not (active_campaigns := filter_active_campaigns(retailer_campaigns, transaction_data["datetime"])):
+            batch.reject(idx, HttpErrors.NO_ACTIVE_CAMPAIGNS.value)
+            rejected_transactions_data.append(
+                transaction_data | {"status": TransactionProcessingStatuses.NO_ACTIVE_CAMPAIGNS}
+            )
+            continue
+
+        campaign_slugs = tuple(campaign.slug for campaign in active_campaigns)
+        campaign_groups.setdefault(campaign_slugs, (active_campaigns, []))[1].append(idx)
+        processed_transactions_data[idx] = transaction_data | {"campaign_slugs": list(campaign_slugs)}
+
+    adjustments: dict[int, dict] = {}
+    for active_campaigns, idxs in campaign_groups.values():
+        tx_amounts = [batch.transactions_data[idx]["amount"] for idx in idxs]
+        adjustments.update(zip(idxs, calculate_adjustment_amounts_batch(active_campaigns, tx_amounts), strict=True))
+
+    inserted_transaction_ids = await crud.create_processed_transactions(
+        db_session, retailer, list(processed_transactions_data.values())
+    )
+    processed_transactions: dict[int, ProcessedTransaction] = {}
+    for idx, processed_transaction_data in processed_transactions_data.items():
+        if processed_transaction_data["transaction_id"] in inserted_transaction_ids:
+            processed_transactions[idx] = ProcessedTransaction(retailer_id=retailer.id, **processed_transaction_data)
+        else:
+            batch.reject(idx, HttpErrors.DUPLICATE_TRANSACTION.value)
+            rejected_transactions_data.append(
+                batch.transactions_data[idx] | {"status": TransactionProcessingStatuses.DUPLICATE}
+            )
+
+    return processed_transactions, adjustments, rejected_transactions_data
+
+
+async def _send_batch_activities(
+    batch: _TransactionsBatch, processed_transactions: dict[int, ProcessedTransaction], tx_history_data: dict[int, dict]
+) -> None:
+    for idx, processed_transaction in processed_transactions.items():
+        tx_history_activity = TxHistoryActivity(
+            processed_tx=ProcessedTxFacts.from_processed_transaction(processed_transaction),
+            retailer_slug=batch.retailer.slug,
+            **tx_history_data[idx],
         )
-        asyncio.create_task(async_send_activity(tx_import_activity_payload, routing_key=ActivityType.TX_IMPORT.value))
+        await async_send_activity(tx_history_activity, routing_key=TxHistoryActivity.routing_key)
+
+    for idx, transaction in batch.transactions.items():
+        tx_import_activity = TxImportActivity(
+            # the transaction's dict with its original, timezone aware, datetime
+            transaction=batch.transactions_data[idx] | {"datetime": transaction.datetime},
+            data=batch.tx_import_activity_data[idx],
+        )
+        await async_send_activity(tx_import_activity, routing_key=TxImportActivity.routing_key)
+
+
+@router.post(
+    path="/{retailer_slug}/transactions",
+    response_model=list[TransactionResultSchema],
+    dependencies=[Depends(user_is_authorised)],
+)
+async def record_transactions(
+    payload: CreateTransactionsBatchSchema,
+    retailer: RetailerRewards = Depends(retailer_is_valid),
+    db_session: AsyncSession = Depends(get_session),
+) -> Any:
+    batch = _TransactionsBatch(retailer, payload.__root__)
+    await _validate_batch_account_holders(batch)
+    await _reject_existing_transactions(db_session, retailer, batch)
+    processed_transactions, adjustments, rejected_transactions_data = await _create_batch_processed_transactions(
+        db_session, retailer, batch
+    )
+
+    tx_history_data: dict[int, dict] = {}
+    accepted_adjustments: list[tuple[ProcessedTransaction, dict]] = []
+    for idx, processed_transaction in processed_transactions.items():
+        is_refund = processed_transaction.amount < 0
+        if accepted := {k: v["amount"] for k, v in adjustments[idx].items() if v["accepted"]}:
+            accepted_adjustments.append((processed_transaction, accepted))
+
+        batch.results[idx]["response"] = await _get_transaction_response(accepted, is_refund)
+        batch.tx_import_activity_data[idx] |= {
+            "active_campaign_slugs": processed_transaction.campaign_slugs,
+            "refunds_valid": bool(accepted or not is_refund),
+        }
+        tx_history_data[idx] = {"adjustment_amounts": adjustments[idx], "is_refund": is_refund}
+
+    await crud.create_transactions(db_session, retailer, rejected_transactions_data)
+    adjustment_tasks_ids = await crud.create_reward_adjustment_tasks(db_session, retailer, accepted_adjustments)
+    await db_session.commit()
+
+    if adjustment_tasks_ids:
+        asyncio.create_task(enqueue_many_tasks(retry_tasks_ids=adjustment_tasks_ids))
+
+    for idx, processed_transaction in processed_transactions.items():
+        tx_history_data[idx]["store_name"] = get_cached_store_name(retailer.id, processed_transaction.mid)
+
+    await _send_batch_activities(batch, processed_transactions, tx_history_data)
+    return batch.results
@@ -0,0 +1,25 @@
+from typing import TYPE_CHECKING
+
+from vela.db.instrumentation import track_db_queries
+
+if TYPE_CHECKING:  # pragma: no cover
+    from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class DBQueryMetricsMiddleware:
+    """Observes the SQL statements executed by each request in the db query histograms, labelled by route path."""
+
+    def __init__(self, app: "ASGIApp") -> None:
+        self.app = app
+
+    async def __call__(self, scope: "Scope", receive: "Receive", send: "Send") -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_db_queries() as query_stats:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                route = scope.get("route")
+                query_stats.observe(route.path if route else "unmatched")
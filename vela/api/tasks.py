@@ -1,14 +1,118 @@
-from retry_tasks_lib.utils.asynchronous import enqueue_many_retry_tasks
+import asyncio
+import logging
 
-from vela.core.config import redis_raw
-from vela.db.session import AsyncSessionMaker
+from time import perf_counter
+
+from retry_tasks_lib.utils.synchronous import enqueue_many_retry_tasks
+
+from vela.core.config import redis_raw, settings
+from vela.db.instrumentation import untrack_db_queries
+from vela.db.session import SyncSessionMaker
+from vela.tasks.prometheus.metrics import task_enqueue_batch_duration_seconds
+
+logger = logging.getLogger(__name__)
+
+
+def _enqueue_many_tasks(retry_tasks_ids: list[int]) -> None:  # pragma: no cover
+    with SyncSessionMaker() as db_session:
+        enqueue_many_retry_tasks(db_session=db_session, retry_tasks_ids=retry_tasks_ids, connection=redis_raw)
+
+
+class _TaskEnqueuer:
+    """
+    Coalesces the retry tasks enqueued by concurrent requests into micro batches.
+
+    Tasks are enqueued at most TASK_ENQUEUE_MAX_DELAY seconds after being submitted, or as soon as
+    TASK_ENQUEUE_MAX_BATCH_SIZE tasks are pending. Each batch is loaded with a single query and pushed to RQ with
+    a single redis pipeline from a worker thread so that the event loop is never blocked. The time taken by each
+    batch, excluding its wait for more tasks, is observed in task_enqueue_batch_duration_seconds.
+    """
+
+    def __init__(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pending: list[tuple[list[int], asyncio.Future]] = []
+        self._pending_count = 0
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flushing: set[asyncio.Task] = set()
+
+    def _reset(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._pending = []
+        self._pending_count = 0
+        self._flush_handle = None
+        self._flushing = set()
+
+    async def enqueue(self, retry_tasks_ids: list[int]) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._reset(loop)
+
+        future = loop.create_future()
+        self._pending.append((retry_tasks_ids, future))
+        self._pending_count += len(retry_tasks_ids)
+
+        if self._pending_count >= settings.TASK_ENQUEUE_MAX_BATCH_SIZE:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(settings.TASK_ENQUEUE_MAX_DELAY, self._flush)
+
+        await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending or self._loop is None:
+            return
+
+        batch, self._pending, self._pending_count = self._pending, [], 0
+        task = self._loop.create_task(self._enqueue_batch(batch))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    @staticmethod
+    async def _enqueue_batch(batch: list[tuple[list[int], asyncio.Future]]) -> None:
+        untrack_db_queries()
+        retry_tasks_ids = [retry_task_id for ids, _ in batch for retry_task_id in ids]
+        start = perf_counter()
+        try:
+            await asyncio.to_thread(_enqueue_many_tasks, retry_tasks_ids)
+        except Exception as ex:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(ex)
+        else:
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+        finally:
+            task_enqueue_batch_duration_seconds.labels(app=settings.PROJECT_NAME).observe(perf_counter() - start)
+
+    async def flush(self) -> None:
+        if self._loop is not asyncio.get_running_loop():
+            return
+
+        self._flush()
+        if self._flushing:
+            await asyncio.wait(self._flushing)
+
+
+task_enqueuer = _TaskEnqueuer()
 
 
 async def enqueue_many_tasks(retry_tasks_ids: list[int], raise_exc: bool | None = True) -> None:  # pragma: no cover
-    async with AsyncSessionMaker() as db_session:
-        await enqueue_many_retry_tasks(
-            db_session=db_session,
-            retry_tasks_ids=retry_tasks_ids,
-            connection=redis_raw,
-            raise_exc=raise_exc,
-        )
+    if not retry_tasks_ids:
+        return
+
+    try:
+        await task_enqueuer.enqueue(retry_tasks_ids)
+    except Exception:
+        if raise_exc:
+            raise
+
+        logger.exception("Failed to enqueue retry tasks %s", retry_tasks_ids)
+
+
+async def flush_enqueued_tasks() -> None:
+    await task_enqueuer.flush()
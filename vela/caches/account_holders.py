@@ -0,0 +1,105 @@
+import json
+
+from functools import cache
+from uuid import UUID
+
+from fastapi import HTTPException
+from redis import RedisError
+from redis.asyncio import Redis
+
+from vela.caches.base import TTLCache
+from vela.core.config import settings
+from vela.enums import HttpErrors
+from vela.internal_requests import get_account_holder_status
+
+from . import logger
+
+_NOT_FOUND = "NOT_FOUND"
+
+account_holder_status_cache: TTLCache[tuple[str, UUID], dict | str] = TTLCache(
+    "account_holder_status",
+    maxsize=settings.ACCOUNT_HOLDER_STATUS_CACHE_MAX_SIZE,
+    ttl=settings.ACCOUNT_HOLDER_STATUS_CACHE_TTL,
+)
+
+
+@cache
+def _get_redis() -> Redis:
+    return Redis.from_url(
+        settings.REDIS_URL,
+        socket_connect_timeout=settings.ACCOUNT_HOLDER_STATUS_CACHE_REDIS_TIMEOUT,
+        socket_timeout=settings.ACCOUNT_HOLDER_STATUS_CACHE_REDIS_TIMEOUT,
+        decode_responses=True,
+    )
+
+
+def _redis_key(retailer_slug: str, account_holder_uuid: UUID) -> str:
+    return f"{settings.REDIS_KEY_PREFIX}account-holder-status:{retailer_slug}:{account_holder_uuid}"
+
+
+async def _get_from_redis(retailer_slug: str, account_holder_uuid: UUID) -> tuple[dict | str | None, int]:
+    key = _redis_key(retailer_slug, account_holder_uuid)
+    try:
+        async with _get_redis().pipeline(transaction=False) as pipe:
+            value, ttl = await pipe.get(key).ttl(key).execute()
+    except RedisError as ex:
+        logger.warning("Failed to read account holder status from redis: %s", ex)
+        return None, 0
+
+    if value is None or ttl <= 0:
+        return None, 0
+
+    return value if value == _NOT_FOUND else json.loads(value), ttl
+
+
+async def _set_in_redis(retailer_slug: str, account_holder_uuid: UUID, value: dict | str, ttl: int) -> None:
+    try:
+        await _get_redis().set(
+            _redis_key(retailer_slug, account_holder_uuid), value if isinstance(value, str) else json.dumps(value), ttl
+        )
+    except RedisError as ex:
+        logger.warning("Failed to store account holder status in redis: %s", ex)
+
+
+async def _fetch_account_holder_status(account_holder_uuid: UUID, retailer_slug: str) -> tuple[dict | str, int]:
+    try:
+        account_holder_status = await get_account_holder_status(account_holder_uuid, retailer_slug)
+    except HTTPException as ex:
+        if ex != HttpErrors.USER_NOT_FOUND.value:
+            raise
+        return _NOT_FOUND, settings.ACCOUNT_HOLDER_STATUS_CACHE_NOT_FOUND_TTL
+
+    value = {"status": account_holder_status["status"], "created_at": account_holder_status["created_at"]}
+    # only active account holders are cached so that activations are picked up straight away,
+    # suspensions will take up to ACCOUNT_HOLDER_STATUS_CACHE_TTL seconds to be picked up.
+    return value, settings.ACCOUNT_HOLDER_STATUS_CACHE_TTL if value["status"] == "active" else 0
+
+
+async def get_cached_account_holder_status(account_holder_uuid: UUID, retailer_slug: str) -> dict:
+    """
+    Cached counterpart of internal_requests.get_account_holder_status.
+
+    Polaris responses are looked up in this worker's cache first and then, if ACCOUNT_HOLDER_STATUS_CACHE_USE_REDIS is
+    set, in redis. Unknown account holders are cached for ACCOUNT_HOLDER_STATUS_CACHE_NOT_FOUND_TTL seconds and keep
+    raising USER_NOT_FOUND.
+    """
+    key = (retailer_slug, account_holder_uuid)
+    value: dict | str | None = account_holder_status_cache.get(key)
+
+    if value is None and settings.ACCOUNT_HOLDER_STATUS_CACHE_USE_REDIS:
+        value, ttl = await _get_from_redis(retailer_slug, account_holder_uuid)
+        if value is not None:
+            # keep the local copy no longer than the shared one so that staleness stays bounded by the redis ttl
+            account_holder_status_cache.set(key, value, ttl)
+
+    if value is None:
+        value, ttl = await _fetch_account_holder_status(account_holder_uuid, retailer_slug)
+        if ttl > 0:
+            account_holder_status_cache.set(key, value, ttl)
+            if settings.ACCOUNT_HOLDER_STATUS_CACHE_USE_REDIS:
+                await _set_in_redis(retailer_slug, account_holder_uuid, value, ttl)
+
+    if value == _NOT_FOUND:
+        raise HttpErrors.USER_NOT_FOUND.value
+
+    return value  # type: ignore [return-value]
@@ -0,0 +1,262 @@
+import asyncio
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from fastapi import HTTPException
+from redis import Redis, RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from vela import crud
+from vela.caches.base import TTLCache
+from vela.core.config import settings
+from vela.core.rules import CompiledCampaign
+from vela.core.utils import filter_active_campaigns
+from vela.enums import HttpErrors, LoyaltyTypes, RewardCap
+from vela.models import Campaign, EarnRule, RetailerRewards, RewardRule
+
+from . import logger
+
+if TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy.engine import Connection
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Mapper, ORMExecuteState
+
+_INVALIDATE_ALL = "*"
+_SESSION_INFO_KEY = "invalidated_active_campaigns"
+_INVALIDATING_TABLE_NAMES = {Campaign.__tablename__, EarnRule.__tablename__, RewardRule.__tablename__}
+_SHARED_VERSION_KEY = f"{settings.REDIS_KEY_PREFIX}active-campaigns-version"
+
+
+@dataclass(frozen=True, slots=True)
+class EarnRuleSnapshot:
+    threshold: int
+    increment: int | None
+    increment_multiplier: Decimal
+    max_amount: int
+
+
+@dataclass(frozen=True, slots=True)
+class RewardRuleSnapshot:
+    reward_goal: int
+    reward_slug: str
+    allocation_window: int
+    reward_cap: RewardCap | None
+
+    @classmethod
+    def from_reward_rule(cls, reward_rule: RewardRule) -> "RewardRuleSnapshot":
+        return cls(
+            reward_goal=reward_rule.reward_goal,
+            reward_slug=reward_rule.reward_slug,
+            allocation_window=reward_rule.allocation_window,
+            reward_cap=reward_rule.reward_cap,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class CampaignSnapshot:
+    id: int
+    slug: str
+    loyalty_type: LoyaltyTypes
+    start_date: datetime
+    end_date: datetime | None
+    earn_rules: tuple[EarnRuleSnapshot, ...]
+    reward_rule: RewardRuleSnapshot | None
+    compiled: CompiledCampaign = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # compiled once per snapshot so that cached campaigns are evaluated without recompiling their rules
+        object.__setattr__(self, "compiled", CompiledCampaign(self))
+
+    @classmethod
+    def from_campaign(cls, campaign: Campaign) -> "CampaignSnapshot":
+        return cls(
+            id=campaign.id,
+            slug=campaign.slug,
+            loyalty_type=campaign.loyalty_type,
+            start_date=campaign.start_date,
+            end_date=campaign.end_date,
+            earn_rules=tuple(
+                EarnRuleSnapshot(
+                    threshold=earn_rule.threshold,
+                    increment=earn_rule.increment,
+                    increment_multiplier=earn_rule.increment_multiplier,
+                    max_amount=earn_rule.max_amount,
+                )
+                for earn_rule in campaign.earn_rules
+            ),
+            reward_rule=RewardRuleSnapshot.from_reward_rule(campaign.reward_rule) if campaign.reward_rule else None,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class ActiveCampaignsSnapshot:
+    version: int
+    campaigns: tuple[CampaignSnapshot, ...]
+    # the shared versions read from redis before loading the campaigns, None if they couldn't be read
+    shared_version: tuple[int, int] | None = None
+
+
+active_campaigns_cache: TTLCache[int, ActiveCampaignsSnapshot] = TTLCache(
+    "active_campaigns", maxsize=settings.RETAILER_CACHE_MAX_SIZE, ttl=settings.ACTIVE_CAMPAIGNS_CACHE_TTL
+)
+# bumped every time a retailer's snapshot is invalidated so that a snapshot built from data read before the
+# invalidation is never stored over the newer state.
+_versions: defaultdict[int, int] = defaultdict(int)
+
+
+def invalidate_active_campaigns(retailer_id: int | None = None) -> None:
+    retailer_ids = list(_versions) if retailer_id is None else [retailer_id]
+    for rid in retailer_ids:
+        _versions[rid] += 1
+        active_campaigns_cache.invalidate(rid)
+
+
+@cache
+def _get_redis() -> Redis:
+    # a blocking client run in worker threads by the api, unlike an asyncio client it isn't bound to a single loop
+    return Redis.from_url(
+        settings.REDIS_URL,
+        socket_connect_timeout=settings.ACTIVE_CAMPAIGNS_CACHE_REDIS_TIMEOUT,
+        socket_timeout=settings.ACTIVE_CAMPAIGNS_CACHE_REDIS_TIMEOUT,
+    )
+
+
+def _shared_version_key(retailer_id: int | str) -> str:
+    return f"{_SHARED_VERSION_KEY}:{retailer_id}"
+
+
+def _bump_shared_versions(retailer_ids: set[int | str]) -> None:
+    """
+    Invalidates the retailers' snapshots cached by every other process, _INVALIDATE_ALL invalidates all of them.
+    Without redis they are only invalidated once they expire, ACTIVE_CAMPAIGNS_CACHE_TTL seconds after being built.
+    """
+    try:
+        with _get_redis().pipeline(transaction=False) as pipe:
+            for retailer_id in retailer_ids:
+                pipe.incr(_SHARED_VERSION_KEY if retailer_id == _INVALIDATE_ALL else _shared_version_key(retailer_id))
+            pipe.execute()
+    except RedisError as ex:
+        logger.warning("Failed to publish the invalidation of cached active campaigns: %s", ex)
+
+
+async def _get_shared_version(retailer_id: int) -> tuple[int, int] | None:
+    try:
+        all_version, retailer_version = await asyncio.to_thread(
+            _get_redis().mget, _SHARED_VERSION_KEY, _shared_version_key(retailer_id)
+        )
+    except RedisError as ex:
+        logger.warning("Failed to read the version of cached active campaigns: %s", ex)
+        return None
+
+    return int(all_version or 0), int(retailer_version or 0)
+
+
+async def get_active_campaigns_snapshot(
+    db_session: "AsyncSession", retailer: RetailerRewards
+) -> ActiveCampaignsSnapshot:
+    """
+    Returns the retailer's cached snapshot unless another process has changed its campaigns or rules since it was
+    built, which costs a single redis round trip per call.
+    """
+    shared_version = await _get_shared_version(retailer.id)
+    if (snapshot := active_campaigns_cache.get(retailer.id)) is not None:
+        if shared_version is None or snapshot.shared_version == shared_version:
+            return snapshot
+
+        invalidate_active_campaigns(retailer.id)
+
+    version = _versions[retailer.id]
+    try:
+        campaigns = await crud.get_active_campaigns(db_session, retailer, join_rules=True)
+    except HTTPException as ex:
+        if ex != HttpErrors.NO_ACTIVE_CAMPAIGNS.value:
+            raise
+        campaigns = []
+
+    snapshot = ActiveCampaignsSnapshot(
+        version=version,
+        campaigns=tuple(CampaignSnapshot.from_campaign(campaign) for campaign in campaigns),
+        shared_version=shared_version,
+    )
+    if _versions[retailer.id] == version:
+        active_campaigns_cache.set(retailer.id, snapshot)
+
+    return snapshot
+
+
+async def get_cached_active_campaigns(
+    db_session: "AsyncSession", retailer: RetailerRewards, tx_datetime: datetime | None = None
+) -> list[CampaignSnapshot]:
+    """
+    Cached counterpart of crud.get_active_campaigns(..., join_rules=True), returns immutable snapshots of the
+    retailer's active campaigns and their rules, raising NO_ACTIVE_CAMPAIGNS if none are active at tx_datetime.
+    """
+    campaigns = list((await get_active_campaigns_snapshot(db_session, retailer)).campaigns)
+    if tx_datetime is not None:
+        campaigns = filter_active_campaigns(campaigns, tx_datetime)
+
+    if not campaigns:
+        raise HttpErrors.NO_ACTIVE_CAMPAIGNS.value
+
+    return campaigns
+
+
+def _mark_invalidated(target: Any, retailer_id: int | str) -> None:
+    if (session := object_session(target)) is not None:
+        session.info.setdefault(_SESSION_INFO_KEY, set()).add(retailer_id)
+    else:  # pragma: no cover
+        invalidate_active_campaigns(None if retailer_id == _INVALIDATE_ALL else retailer_id)  # type: ignore [arg-type]
+        _bump_shared_versions({retailer_id})
+
+
+@event.listens_for(Campaign, "after_insert")
+@event.listens_for(Campaign, "after_update")
+@event.listens_for(Campaign, "after_delete")
+def _campaign_changed(mapper: "Mapper", connection: "Connection", target: Campaign) -> None:
+    _mark_invalidated(target, target.retailer_id)
+
+
+@event.listens_for(EarnRule, "after_insert")
+@event.listens_for(EarnRule, "after_update")
+@event.listens_for(EarnRule, "after_delete")
+@event.listens_for(RewardRule, "after_insert")
+@event.listens_for(RewardRule, "after_update")
+@event.listens_for(RewardRule, "after_delete")
+def _rule_changed(mapper: "Mapper", connection: "Connection", target: EarnRule | RewardRule) -> None:
+    # rules only know their campaign id, rule changes are rare enough to just drop every snapshot.
+    _mark_invalidated(target, _INVALIDATE_ALL)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bulk_statement_executed(orm_execute_state: "ORMExecuteState") -> None:
+    # bulk UPDATE and DELETE statements bypass the mapper events above
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and getattr(
+        orm_execute_state.statement.table, "name", None
+    ) in _INVALIDATING_TABLE_NAMES:
+        orm_execute_state.session.info.setdefault(_SESSION_INFO_KEY, set()).add(_INVALIDATE_ALL)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    if not (retailer_ids := session.info.pop(_SESSION_INFO_KEY, None)):
+        return
+
+    logger.info("Campaigns updated, invalidating cached active campaigns for retailers: %s", retailer_ids)
+    if _INVALIDATE_ALL in retailer_ids:
+        invalidate_active_campaigns()
+    else:
+        for retailer_id in retailer_ids:
+            invalidate_active_campaigns(retailer_id)
+
+    _bump_shared_versions(retailer_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop(_SESSION_INFO_KEY, None)
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, Generic, TypeVar
+
+from vela.core.config import settings
+from vela.tasks.prometheus.metrics import cache_requests_total
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Bounded, per process, least recently used cache whose entries expire `ttl` seconds after being set.
+
+    Hits and misses are recorded in the cache_requests_total prometheus counter labelled with the cache's name.
+    """
+
+    def __init__(self, name: str, *, maxsize: int, ttl: float) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _record(self, result: str) -> None:
+        cache_requests_total.labels(app=settings.PROJECT_NAME, cache=self.name, result=result).inc()
+
+    def get(self, key: K, default: Any = None) -> V | Any:
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                self._record("miss")
+                return default
+
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self._record("miss")
+                return default
+
+            self._data.move_to_end(key)
+
+        self._record("hit")
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
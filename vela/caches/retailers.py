@@ -0,0 +1,51 @@
+from typing import TYPE_CHECKING
+
+from sqlalchemy import event, inspect
+
+from vela import crud
+from vela.caches.base import TTLCache
+from vela.core.config import settings
+from vela.models import RetailerRewards
+
+from . import logger
+
+if TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy.engine import Connection
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Mapper
+
+retailers_cache: TTLCache[str, RetailerRewards] = TTLCache(
+    "retailers", maxsize=settings.RETAILER_CACHE_MAX_SIZE, ttl=settings.RETAILER_CACHE_TTL
+)
+
+
+async def get_cached_retailer_by_slug(db_session: "AsyncSession", retailer_slug: str) -> RetailerRewards:
+    """
+    Same as crud.get_retailer_by_slug, including raising INVALID_RETAILER for unknown slugs, but only queries the db
+    when the retailer is not in this worker's cache.
+
+    The cached instance is never attached to a session, a copy of it is merged into the provided session
+    without emitting any SQL so that relationships and identity map lookups keep working as usual.
+    """
+    retailer: RetailerRewards | None = retailers_cache.get(retailer_slug)
+    if retailer is None:
+        retailer = await crud.get_retailer_by_slug(db_session, retailer_slug)
+        db_session.expunge(retailer)
+        retailers_cache.set(retailer_slug, retailer)
+
+    return await db_session.merge(retailer, load=False)
+
+
+@event.listens_for(RetailerRewards, "after_insert")
+@event.listens_for(RetailerRewards, "after_delete")
+def _invalidate_retailer(mapper: "Mapper", connection: "Connection", target: RetailerRewards) -> None:
+    retailers_cache.invalidate(target.slug)
+
+
+@event.listens_for(RetailerRewards, "after_update")
+def _invalidate_retailer_on_change(mapper: "Mapper", connection: "Connection", target: RetailerRewards) -> None:
+    attrs = inspect(target).attrs
+    if attrs.status.history.has_changes() or attrs.slug.history.has_changes():
+        logger.info("Retailer '%s' updated, invalidating cached retailer.", target.slug)
+        for slug in (*attrs.slug.history.deleted, target.slug):
+            retailers_cache.invalidate(slug)
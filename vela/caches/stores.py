@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from sqlalchemy import event
+
+from vela import crud
+from vela.core.config import settings
+from vela.db.instrumentation import untrack_db_queries
+from vela.db.session import AsyncSessionMaker
+from vela.models import RetailerStore
+from vela.tasks.prometheus.metrics import cache_requests_total
+
+from . import logger
+
+if TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy.engine import Connection
+    from sqlalchemy.orm import Mapper
+
+UNKNOWN_STORE_NAME = "N/A"
+
+
+@dataclass(slots=True)
+class _StoreNames:
+    names: dict[str, str]
+    expires_at: float
+
+
+_store_names: dict[int, _StoreNames] = {}
+_refresh_tasks: dict[int, asyncio.Task] = {}
+
+
+async def _refresh_store_names(retailer_id: int) -> None:
+    untrack_db_queries()
+    try:
+        async with AsyncSessionMaker() as db_session:
+            names = await crud.get_retailer_store_names(db_session, retailer_id)
+    except Exception as ex:
+        logger.warning("Failed to load store names for retailer %s: %s", retailer_id, ex)
+        return
+
+    _store_names[retailer_id] = _StoreNames(names, time.monotonic() + settings.STORE_NAMES_CACHE_TTL)
+
+
+def _schedule_refresh(retailer_id: int) -> None:
+    if retailer_id in _refresh_tasks:
+        return
+
+    task = asyncio.get_running_loop().create_task(_refresh_store_names(retailer_id))
+    _refresh_tasks[retailer_id] = task
+    task.add_done_callback(lambda _: _refresh_tasks.pop(retailer_id, None))
+
+
+def get_cached_store_name(retailer_id: int, mid: str) -> str:
+    """
+    Returns the name of the retailer's store with the provided MID without waiting on the db.
+
+    Each retailer's MID to store name map is loaded, and reloaded once older than STORE_NAMES_CACHE_TTL seconds, in
+    the background. Until the first load completes, and for unknown MIDs, UNKNOWN_STORE_NAME is returned.
+    """
+    store_names = _store_names.get(retailer_id)
+    if store_names is None or store_names.expires_at <= time.monotonic():
+        _schedule_refresh(retailer_id)
+
+    name = store_names.names.get(mid) if store_names else None
+    cache_requests_total.labels(
+        app=settings.PROJECT_NAME, cache="store_names", result="miss" if name is None else "hit"
+    ).inc()
+    return name or UNKNOWN_STORE_NAME
+
+
+def invalidate_store_names(retailer_id: int | None = None) -> None:
+    """Marks the cached store names as expired, they are still served until their reload completes."""
+    for rid in list(_store_names) if retailer_id is None else [retailer_id]:
+        if store_names := _store_names.get(rid):
+            store_names.expires_at = 0
+
+
+def clear_store_names() -> None:
+    for task in _refresh_tasks.values():
+        task.cancel()
+    _refresh_tasks.clear()
+    _store_names.clear()
+
+
+@event.listens_for(RetailerStore, "after_insert")
+@event.listens_for(RetailerStore, "after_update")
+@event.listens_for(RetailerStore, "after_delete")
+def _store_changed(mapper: "Mapper", connection: "Connection", target: RetailerStore) -> None:
+    invalidate_store_names(target.retailer_id)
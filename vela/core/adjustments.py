@@ -0,0 +1,118 @@
+"""
+Batched counterpart of vela.core.utils.calculate_adjustment_amounts.
+
+The earn rules of a set of campaigns are compiled once into a rule table that is then applied to any number of
+transaction amounts at once with NumPy.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from vela.core.utils import compile_campaign
+from vela.enums import LoyaltyTypes
+
+if TYPE_CHECKING:  # pragma: no cover
+    from vela.caches.active_campaigns import CampaignSnapshot
+    from vela.models.retailer import Campaign
+
+
+@dataclass(frozen=True, slots=True)
+class AdjustmentRuleTable:
+    """
+    One column per CompiledCampaign field, one row per campaign.
+    """
+
+    campaigns: Sequence["Campaign | CampaignSnapshot"]
+    slugs: tuple[str, ...]
+    loyalty_types: tuple[LoyaltyTypes, ...]
+    reported_thresholds: tuple[int | None, ...]
+    has_earn_rule: tuple[bool, ...]
+    threshold: tuple[int, ...]
+    increment: tuple[int, ...]
+    increment_multiplier_100: tuple[int, ...]
+    max_amount: tuple[int, ...]
+    allocation_window: tuple[int, ...]
+
+
+def compile_adjustment_rules(campaigns: Sequence["Campaign | CampaignSnapshot"]) -> AdjustmentRuleTable:
+    rows = []
+    for campaign in campaigns:
+        compiled = compile_campaign(campaign)
+        earn_rule = compiled.earn_rule
+        rows.append(
+            (
+                compiled.slug,
+                compiled.loyalty_type,
+                compiled.threshold,
+                earn_rule is not None,
+                earn_rule.threshold if earn_rule else 0,
+                earn_rule.increment if earn_rule else 0,
+                earn_rule.multiplier_100 if earn_rule else 0,
+                earn_rule.max_amount if earn_rule else 0,
+                earn_rule.allocation_window if earn_rule else 0,
+            )
+        )
+
+    columns = tuple(zip(*rows, strict=True)) if rows else ((),) * 9
+    return AdjustmentRuleTable(campaigns, *columns)
+
+
+def calculate_adjustments_array(
+    rule_table: AdjustmentRuleTable, tx_amounts: Sequence[int]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns two (transactions, campaigns) arrays: the accepted flags and the adjustment amounts in hundredths.
+    """
+    amounts = np.asarray(tx_amounts, dtype=np.int64)[:, None]
+    threshold = np.asarray(rule_table.threshold, dtype=np.int64)
+    multiplier = np.asarray(rule_table.increment_multiplier_100, dtype=np.int64)
+    max_amount = np.asarray(rule_table.max_amount, dtype=np.int64)
+    loyalty_types = np.asarray(rule_table.loyalty_types, dtype=object)
+    is_accumulator = (loyalty_types == LoyaltyTypes.ACCUMULATOR) & np.asarray(rule_table.has_earn_rule, dtype=bool)
+    is_stamps = (loyalty_types == LoyaltyTypes.STAMPS) & np.asarray(rule_table.has_earn_rule, dtype=bool)
+
+    meets_threshold = amounts >= threshold
+    accepted_refund = (amounts < 0) & (np.asarray(rule_table.allocation_window, dtype=np.int64) != 0)
+    over_max = (max_amount != 0) & (np.abs(amounts) > max_amount)
+    capped = np.where(accepted_refund, -max_amount, max_amount) * 100
+    accumulator_accepted = np.where(over_max, accepted_refund | (amounts > 0), accepted_refund | meets_threshold)
+    accumulator_amounts = np.where(over_max, capped, amounts * multiplier)
+
+    stamps_amounts = np.asarray(rule_table.increment, dtype=np.int64) * multiplier
+    accepted = (is_accumulator & accumulator_accepted) | (is_stamps & meets_threshold)
+    adjustments = np.where(is_accumulator, accumulator_amounts, stamps_amounts)
+    return accepted, np.where(accepted, adjustments, 0)
+
+
+def calculate_adjustment_amounts_batch(
+    campaigns: Sequence["Campaign | CampaignSnapshot"] | AdjustmentRuleTable, tx_amounts: Sequence[int]
+) -> list[dict]:
+    """
+    Returns calculate_adjustment_amounts(campaigns, tx_amount) for each of the provided tx_amounts.
+
+    Accepted adjustment amounts are returned as Decimals with two decimal places.
+    """
+    rule_table = campaigns if isinstance(campaigns, AdjustmentRuleTable) else compile_adjustment_rules(campaigns)
+    if not tx_amounts:
+        return []
+
+    accepted, adjustments = calculate_adjustments_array(rule_table, tx_amounts)
+    rows = list(zip(rule_table.slugs, rule_table.loyalty_types, rule_table.reported_thresholds, strict=True))
+    return [
+        {
+            slug: {
+                "type": loyalty_type,
+                "amount": Decimal(amount).scaleb(-2) if is_accepted else 0,
+                "threshold": threshold,
+                "accepted": is_accepted,
+            }
+            for (slug, loyalty_type, threshold), is_accepted, amount in zip(
+                rows, tx_accepted, tx_adjustments, strict=True
+            )
+        }
+        for tx_accepted, tx_adjustments in zip(accepted.tolist(), adjustments.tolist(), strict=True)
+    ]
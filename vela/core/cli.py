@@ -13,25 +13,32 @@ from rq import Worker
 
 from vela.core.config import redis_raw, settings
 from vela.db.session import SyncSessionMaker
+from vela.scheduled_tasks.partitions import maintain_processed_transaction_partitions
 from vela.scheduled_tasks.scheduler import cron_scheduler as vela_cron_scheduler
 from vela.scheduled_tasks.task_cleanup import cleanup_old_tasks
 from vela.tasks.prometheus.metrics import job_queue_summary, task_statuses, tasks_summary
+from vela.tasks.worker import run_thread_pool_worker
 
 cli = typer.Typer()
 logger = logging.getLogger(__name__)
 
 
 @cli.command()
-def task_worker(burst: bool = False) -> None:  # pragma: no cover
+def task_worker(burst: bool = False, threaded: bool = False, concurrency: int = 0) -> None:  # pragma: no cover
     if settings.ACTIVATE_TASKS_METRICS:
         # -------- this is the prometheus monkey patch ------- #
-        values.ValueClass = values.MultiProcessValue(os.getppid)
+        # forked work horses record their metrics under the worker's pid, threaded workers record them directly
+        values.ValueClass = values.MultiProcessValue(os.getpid if threaded else os.getppid)
         # ---------------------------------------------------- #
         registry = CollectorRegistry()
         MultiProcessCollector(registry)
         logger.info("Starting prometheus metrics server...")
         start_prometheus_server(settings.PROMETHEUS_HTTP_SERVER_PORT, registry=registry)
 
+    if threaded:
+        run_thread_pool_worker(burst=burst, concurrency=concurrency or None)
+        return
+
     worker = Worker(
         queues=settings.TASK_QUEUES,
         connection=redis_raw,
@@ -44,7 +51,10 @@ def task_worker(burst: bool = False) -> None:  # pragma: no cover
 
 @cli.command()
 def cron_scheduler(
-    report_tasks: bool = True, report_rq_queues: bool = True, task_cleanup: bool = True
+    report_tasks: bool = True,
+    report_rq_queues: bool = True,
+    task_cleanup: bool = True,
+    partition_maintenance: bool = True,
 ) -> None:  # pragma: no cover
     logger.info("Initialising scheduler...")
 
@@ -90,6 +100,12 @@ def cron_scheduler(
             schedule_fn=lambda: settings.TASK_CLEANUP_SCHEDULE,
             coalesce_jobs=True,
         )
+    if partition_maintenance:
+        vela_cron_scheduler.add_job(
+            maintain_processed_transaction_partitions,
+            schedule_fn=lambda: settings.PARTITION_MAINTENANCE_SCHEDULE,
+            coalesce_jobs=True,
+        )
 
     logger.info(f"Starting scheduler {vela_cron_scheduler}...")
     vela_cron_scheduler.run()
@@ -8,18 +8,21 @@ class JSONFormatter(logging.Formatter):
         pass
 
     def format(self, record: logging.LogRecord) -> str:
-        return json.dumps(
-            {
-                "timestamp": record.created,
-                "level": record.levelno,
-                "levelname": record.levelname,
-                "process": record.processName,
-                "thread": record.threadName,
-                "file": record.pathname,
-                "line": record.lineno,
-                "module": record.module,
-                "function": record.funcName,
-                "name": record.name,
-                "message": record.getMessage(),
-            }
-        )
+        log = {
+            "timestamp": record.created,
+            "level": record.levelno,
+            "levelname": record.levelname,
+            "process": record.processName,
+            "thread": record.threadName,
+            "file": record.pathname,
+            "line": record.lineno,
+            "module": record.module,
+            "function": record.funcName,
+            "name": record.name,
+            "message": record.getMessage(),
+        }
+        # structured values passed with extra={"data": ...}
+        if (data := getattr(record, "data", None)) is not None:
+            log["data"] = data
+
+        return json.dumps(log)
@@ -0,0 +1,112 @@
+"""
+Campaigns compiled into plain rule objects.
+
+calculate_adjustment_amounts runs on these objects instead of the ORM models so that no instrumented attribute or
+Decimal arithmetic is involved per transaction. Campaign snapshots compile their rules once when they are cached.
+"""
+
+from collections.abc import Callable, Sequence
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+from vela.enums import LoyaltyTypes
+
+if TYPE_CHECKING:  # pragma: no cover
+    from vela.caches.active_campaigns import CampaignSnapshot, EarnRuleSnapshot
+    from vela.models.retailer import Campaign, EarnRule
+
+AdjustmentAmount = int | Decimal
+
+
+class CompiledEarnRule:
+    """
+    An earn rule with its increment_multiplier stored in hundredths, matching the Numeric(scale=2) column it comes
+    from, so that adjustment amounts are calculated with integer arithmetic.
+    """
+
+    __slots__ = ("allocation_window", "evaluate", "increment", "max_amount", "multiplier_100", "threshold")
+
+    def __init__(
+        self, earn_rule: "EarnRule | EarnRuleSnapshot", loyalty_type: LoyaltyTypes, allocation_window: int
+    ) -> None:
+        self.threshold: int = earn_rule.threshold
+        self.increment: int = earn_rule.increment or 0
+        self.multiplier_100 = multiplier_to_hundredths(earn_rule.increment_multiplier)
+        self.max_amount: int = earn_rule.max_amount or 0
+        self.allocation_window: int = allocation_window or 0
+        self.evaluate: Callable[[CompiledEarnRule, int], tuple[bool, AdjustmentAmount]] = _EVALUATORS.get(
+            loyalty_type, _reject
+        )
+
+    def multiply(self, amount: int) -> AdjustmentAmount:
+        if self.multiplier_100 % 100 == 0:
+            return amount * (self.multiplier_100 // 100)
+
+        return Decimal(amount * self.multiplier_100).scaleb(-2)
+
+
+class CompiledCampaign:
+    """The fields of a campaign that calculate_adjustment_amounts needs."""
+
+    __slots__ = ("earn_rule", "loyalty_type", "slug", "threshold")
+
+    def __init__(self, campaign: "Campaign | CampaignSnapshot") -> None:
+        self.slug: str = campaign.slug
+        self.loyalty_type: LoyaltyTypes = campaign.loyalty_type
+        # NOTE: Business logic mandates that the earn rules of a campaign must have the same threshold.
+        # in case of discrepacies we set the threshold to the lowest of all thresholds.
+        self.threshold: int | None = None
+        for earn_rule in campaign.earn_rules:
+            self.threshold = min(self.threshold, earn_rule.threshold) if self.threshold else earn_rule.threshold
+
+        allocation_window = campaign.reward_rule.allocation_window if campaign.reward_rule else 0
+        # only the last earn rule of a campaign determines its adjustment
+        self.earn_rule: CompiledEarnRule | None = (
+            CompiledEarnRule(campaign.earn_rules[-1], campaign.loyalty_type, allocation_window)
+            if campaign.earn_rules
+            else None
+        )
+
+    def adjustment(self, tx_amount: int) -> dict:
+        accepted, amount = (False, 0) if self.earn_rule is None else self.earn_rule.evaluate(self.earn_rule, tx_amount)
+        return {"type": self.loyalty_type, "amount": amount, "threshold": self.threshold, "accepted": accepted}
+
+
+def multiplier_to_hundredths(increment_multiplier: Decimal | int) -> int:
+    value = Decimal(increment_multiplier).scaleb(2)
+    if value != value.to_integral_value():
+        raise ValueError(f"increment_multiplier {increment_multiplier} has more than two decimal places")
+
+    return int(value)
+
+
+def _evaluate_accumulator(earn_rule: CompiledEarnRule, tx_amount: int) -> tuple[bool, AdjustmentAmount]:
+    accepted_refund = tx_amount < 0 and earn_rule.allocation_window != 0
+
+    if earn_rule.max_amount and abs(tx_amount) > earn_rule.max_amount:
+        if accepted_refund:
+            return True, -earn_rule.max_amount
+        if tx_amount > 0:
+            return True, earn_rule.max_amount
+    elif accepted_refund or tx_amount >= earn_rule.threshold:
+        return True, earn_rule.multiply(tx_amount)
+
+    return False, 0
+
+
+def _evaluate_stamps(earn_rule: CompiledEarnRule, tx_amount: int) -> tuple[bool, AdjustmentAmount]:
+    if tx_amount >= earn_rule.threshold:
+        return True, earn_rule.multiply(earn_rule.increment)
+
+    return False, 0
+
+
+def _reject(earn_rule: CompiledEarnRule, tx_amount: int) -> tuple[bool, AdjustmentAmount]:
+    return False, 0
+
+
+_EVALUATORS = {LoyaltyTypes.ACCUMULATOR: _evaluate_accumulator, LoyaltyTypes.STAMPS: _evaluate_stamps}
+
+
+def calculate_compiled_adjustment_amounts(campaigns: Sequence[CompiledCampaign], tx_amount: int) -> dict[str, dict]:
+    return {campaign.slug: campaign.adjustment(tx_amount) for campaign in campaigns}
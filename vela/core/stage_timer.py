@@ -0,0 +1,58 @@
+import logging
+
+from collections.abc import Generator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from time import perf_counter
+
+import sentry_sdk
+
+from vela.core.config import settings
+from vela.tasks.prometheus.metrics import request_stage_duration_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class StageTimer:
+    """
+    Times the stages of a request into the request_stage_duration_seconds histogram.
+
+    When SENTRY_STAGE_SPANS is enabled each stage is also a sentry span of the request's transaction, and requests
+    slower than SLOW_REQUEST_LOG_THRESHOLD seconds have their stage timings logged by finish().
+    """
+
+    __slots__ = ("_start", "durations", "endpoint")
+
+    def __init__(self, endpoint: str) -> None:
+        self.endpoint = endpoint
+        self.durations: dict[str, float] = {}
+        self._start = perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Generator[None, None, None]:
+        span: AbstractContextManager = (
+            sentry_sdk.start_span(op=f"{self.endpoint}.{name}") if settings.SENTRY_STAGE_SPANS else nullcontext()
+        )
+        start = perf_counter()
+        try:
+            with span:
+                yield
+        finally:
+            duration = perf_counter() - start
+            self.durations[name] = self.durations.get(name, 0.0) + duration
+            request_stage_duration_seconds.labels(
+                app=settings.PROJECT_NAME, endpoint=self.endpoint, stage=name
+            ).observe(duration)
+
+    def finish(self) -> None:
+        total = perf_counter() - self._start
+        if not settings.SLOW_REQUEST_LOG_THRESHOLD or total < settings.SLOW_REQUEST_LOG_THRESHOLD:
+            return
+
+        stages_ms = {name: round(duration * 1000, 2) for name, duration in self.durations.items()}
+        logger.warning(
+            "Slow %s request: %.2fms (%s)",
+            self.endpoint,
+            total * 1000,
+            ", ".join(f"{name}={duration}ms" for name, duration in stages_ms.items()),
+            extra={"data": {"endpoint": self.endpoint, "total_ms": round(total * 1000, 2), "stages_ms": stages_ms}},
+        )
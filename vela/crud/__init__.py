@@ -1,3 +1,4 @@
 from .campaign import *
 from .retailer import *
+from .retry_task import *
 from .transaction import *
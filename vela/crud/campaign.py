@@ -1,7 +1,6 @@
-from typing import TYPE_CHECKING
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
 
-from retry_tasks_lib.db.models import RetryTask
-from retry_tasks_lib.utils.asynchronous import async_create_task
 from sqlalchemy.future import select
 from sqlalchemy.orm import noload, selectinload
 
@@ -10,7 +9,10 @@ from vela.db.base_class import async_run_query
 from vela.enums import CampaignStatuses
 from vela.models import Campaign, RetailerRewards
 
+from .retry_task import create_retry_tasks
+
 if TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy.engine import Row
     from sqlalchemy.ext.asyncio import AsyncSession
 
 
@@ -36,64 +38,68 @@ async def get_campaigns_by_slug(
     return await async_run_query(_query, db_session, rollback_on_exc=False)
 
 
-async def create_reward_cancel_and_campaign_balances_tasks(
+async def update_campaigns_status(  # noqa: PLR0913
     db_session: "AsyncSession",
     retailer: RetailerRewards,
-    campaign: Campaign,
-    status: CampaignStatuses,
+    campaigns: list[Campaign],
+    requested_status: CampaignStatuses,
+    *,
+    status_change_datetime: datetime,
     balance_task_type: str,
-) -> list[int]:
-    async def _query() -> list[RetryTask]:
-        tasks = []
-        if status is CampaignStatuses.CANCELLED:
-            tasks.append(
-                await async_create_task(
-                    db_session=db_session,
-                    task_type_name=settings.REWARD_CANCELLATION_TASK_NAME,
-                    params={
-                        "retailer_slug": retailer.slug,
-                        "campaign_slug": campaign.slug,
-                        "cancel_datetime": campaign.updated_at,
-                    },
-                )
+    issue_pending_rewards: bool,
+) -> tuple[list["Row"], list[int]]:
+    """
+    Updates the status of all the provided campaigns with a single UPDATE and creates all their follow up retry tasks
+    in bulk, everything is committed at once.
+
+    Returns the updated campaigns' id, slug, name, status and updated_at and the ids of the new retry tasks.
+    """
+    values: dict[str, Any] = {"status": requested_status}
+    if requested_status in (CampaignStatuses.CANCELLED, CampaignStatuses.ENDED):
+        values["end_date"] = status_change_datetime
+    elif requested_status == CampaignStatuses.ACTIVE:
+        values["start_date"] = status_change_datetime
+
+    campaigns_order = {campaign.id: i for i, campaign in enumerate(campaigns)}
+    pending_rewards_campaign_slugs = [
+        campaign.slug
+        for campaign in campaigns
+        if "end_date" in values and campaign.reward_rule and campaign.reward_rule.allocation_window > 0
+    ]
+
+    async def _query() -> tuple[list["Row"], list[int]]:
+        updated_campaigns = (
+            await db_session.execute(
+                Campaign.__table__.update()
+                .where(Campaign.id.in_(list(campaigns_order)))
+                .values(values)
+                .returning(Campaign.id, Campaign.slug, Campaign.name, Campaign.status, Campaign.updated_at)
             )
-
-        tasks.append(
-            await async_create_task(
-                db_session=db_session,
-                task_type_name=balance_task_type,
-                params={
-                    "retailer_slug": retailer.slug,
-                    "campaign_slug": campaign.slug,
-                },
+        ).all()
+        updated_campaigns.sort(key=lambda row: campaigns_order[row.id])
+
+        tasks_params: dict[str, list[dict]] = {
+            settings.PENDING_REWARDS_TASK_NAME: [
+                {"retailer_slug": retailer.slug, "campaign_slug": slug, "issue_pending_rewards": issue_pending_rewards}
+                for slug in pending_rewards_campaign_slugs
+            ],
+            settings.REWARD_CANCELLATION_TASK_NAME: [
+                {"retailer_slug": retailer.slug, "campaign_slug": row.slug, "cancel_datetime": row.updated_at}
+                for row in updated_campaigns
+                if requested_status is CampaignStatuses.CANCELLED
+            ],
+            balance_task_type: [
+                {"retailer_slug": retailer.slug, "campaign_slug": row.slug} for row in updated_campaigns
+            ],
+        }
+        retry_task_ids: list[int] = []
+        for task_type_name, params_list in tasks_params.items():
+            retry_task_ids.extend(
+                await create_retry_tasks(db_session, task_type_name=task_type_name, params_list=params_list)
             )
-        )
-
-        await db_session.commit()
-        return tasks
-
-    return [task.retry_task_id for task in await async_run_query(_query, db_session)]
-
-
-async def create_pending_rewards_task(
-    db_session: "AsyncSession",
-    campaign: Campaign,
-    retailer: RetailerRewards,
-    issue_pending_rewards: bool | None = False,
-) -> RetryTask:
-    async def _query() -> list[RetryTask]:
-        task = await async_create_task(
-            db_session=db_session,
-            task_type_name=settings.PENDING_REWARDS_TASK_NAME,
-            params={
-                "retailer_slug": retailer.slug,
-                "campaign_slug": campaign.slug,
-                "issue_pending_rewards": issue_pending_rewards,
-            },
-        )
 
         await db_session.commit()
-        return task
+        return updated_campaigns, retry_task_ids
 
     return await async_run_query(_query, db_session)
 
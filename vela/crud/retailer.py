@@ -3,6 +3,7 @@ from typing import TYPE_CHECKING
 from sqlalchemy.future import select
 from sqlalchemy.orm import joinedload
 
+from vela.core.utils import filter_active_campaigns
 from vela.db.base_class import async_run_query
 from vela.enums import CampaignStatuses, HttpErrors
 from vela.models import Campaign, EarnRule, RetailerRewards, Transaction
@@ -49,16 +50,8 @@ async def get_active_campaigns(
 
     campaigns = await async_run_query(_query, db_session, rollback_on_exc=False)
 
-    campaigns = (
-        [
-            campaign
-            for campaign in campaigns
-            if campaign.start_date <= transaction.datetime
-            and (campaign.end_date is None or campaign.end_date > transaction.datetime)
-        ]
-        if transaction is not None
-        else campaigns
-    )
+    if transaction is not None:
+        campaigns = filter_active_campaigns(campaigns, transaction.datetime)
 
     if not campaigns:
         raise HttpErrors.NO_ACTIVE_CAMPAIGNS.value
@@ -84,15 +77,16 @@ async def get_campaign_with_rules(db_session: "AsyncSession", campaign_slugs: li
     return await async_run_query(_query, db_session, rollback_on_exc=False)
 
 
-async def get_retailer_store_name_by_mid(db_session: "AsyncSession", retailer_id: int, mid: str) -> str | None:
-    async def _query() -> str | None:
-        return (
-            await db_session.execute(
-                select(RetailerStore.store_name).where(
-                    RetailerStore.mid == mid,
-                    RetailerStore.retailer_id == retailer_id,
+async def get_retailer_store_names(db_session: "AsyncSession", retailer_id: int) -> dict[str, str]:
+    """Returns all the retailer's store names by MID."""
+
+    async def _query() -> dict[str, str]:
+        return dict(
+            (
+                await db_session.execute(
+                    select(RetailerStore.mid, RetailerStore.store_name).where(RetailerStore.retailer_id == retailer_id)
                 )
-            )
-        ).scalar_one_or_none()
+            ).all()
+        )
 
-    return await async_run_query(_query, db_session)
+    return await async_run_query(_query, db_session, rollback_on_exc=False)
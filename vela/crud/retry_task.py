@@ -0,0 +1,69 @@
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Any
+
+from retry_tasks_lib.db.models import RetryTask, TaskType, TaskTypeKeyValue
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+
+from vela.db.base_class import async_run_query
+
+if TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# keeps each statement well below postgres' limit of 32767 bind parameters
+BULK_INSERT_CHUNK_SIZE = 5000
+
+
+def _chunks(rows: list[dict], size: int = BULK_INSERT_CHUNK_SIZE) -> Iterator[list[dict]]:
+    for i in range(0, len(rows), size):
+        yield rows[i : i + size]
+
+
+async def create_retry_tasks(
+    db_session: "AsyncSession", *, task_type_name: str, params_list: list[dict[str, Any]]
+) -> list[int]:
+    """
+    Bulk counterpart of retry_tasks_lib's async_create_task: the task type and its key ids are fetched once and all
+    the tasks and their key values are inserted with multi row inserts.
+
+    Returns the new retry_task_ids in the same order as params_list, nothing is committed.
+    """
+
+    async def _query() -> list[int]:
+        task_type: TaskType = (
+            await db_session.execute(
+                select(TaskType).options(selectinload(TaskType.task_type_keys)).where(TaskType.name == task_type_name)
+            )
+        ).scalar_one()
+        key_ids_by_name = task_type.get_key_ids_by_name()
+
+        retry_task_ids: list[int] = []
+        for chunk in _chunks([{"task_type_id": task_type.task_type_id}] * len(params_list)):
+            retry_task_ids.extend(
+                (await db_session.execute(insert(RetryTask).values(chunk).returning(RetryTask.retry_task_id)))
+                .scalars()
+                .all()
+            )
+
+        # ids are assigned in insertion order, sorting them restores the params_list order regardless of the order
+        # in which postgres returns them.
+        retry_task_ids.sort()
+
+        key_values = [
+            {"retry_task_id": kv.retry_task_id, "task_type_key_id": kv.task_type_key_id, "value": kv.value}
+            for retry_task_id, params in zip(retry_task_ids, params_list, strict=True)
+            # transient RetryTask used only to serialise the values the same way async_create_task does.
+            for kv in RetryTask(retry_task_id=retry_task_id).get_task_type_key_values(
+                [(key_ids_by_name[key], value) for key, value in params.items()]
+            )
+        ]
+        for chunk in _chunks(key_values):
+            await db_session.execute(insert(TaskTypeKeyValue).values(chunk))
+
+        return retry_task_ids
+
+    if not params_list:
+        return []
+
+    return await async_run_query(_query, db_session)
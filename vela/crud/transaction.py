@@ -3,97 +3,198 @@ from uuid import uuid4
 
 from retry_tasks_lib.db.models import RetryTask
 from retry_tasks_lib.enums import RetryTaskStatuses
-from retry_tasks_lib.utils.asynchronous import async_create_task
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import Integer, String, bindparam, cast, exists
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
 
 from vela.core.config import settings
 from vela.db.base_class import async_run_query
-from vela.enums import HttpErrors, TransactionProcessingStatuses
-from vela.models import ProcessedTransaction, RetailerRewards, Transaction
+from vela.enums import HttpErrors
+from vela.models import ProcessedTransaction, RetailerRewards, Transaction, processed_transaction_key
+
+from .retry_task import create_retry_tasks
 
 if TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy.engine import Row
     from sqlalchemy.ext.asyncio import AsyncSession
 
 
-async def create_transaction(
-    db_session: "AsyncSession", retailer: RetailerRewards, transaction_data: dict
-) -> Transaction:
-    async def _query() -> Transaction:
-        transaction = Transaction(retailer_id=retailer.id, **transaction_data)
-        nested_trans = await db_session.begin_nested()
-        db_session.add(transaction)
-        try:
-            await nested_trans.commit()
-        except IntegrityError:
-            await nested_trans.rollback()
-            raise HttpErrors.DUPLICATE_TRANSACTION.value from None
-
-        return transaction
-
-    return await async_run_query(_query, db_session)
+async def create_transaction(db_session: "AsyncSession", retailer: RetailerRewards, transaction_data: dict) -> None:
+    """Stores a transaction that could not be processed, raises DUPLICATE_TRANSACTION if it was already stored."""
 
+    async def _query() -> int | None:
+        return (
+            await db_session.execute(
+                insert(Transaction)
+                .values(transaction_data | {"retailer_id": retailer.id})
+                .on_conflict_do_nothing(constraint="transaction_retailer_unq")
+                .returning(Transaction.id)
+            )
+        ).scalar_one_or_none()
 
-async def delete_transaction(db_session: "AsyncSession", transaction: Transaction) -> None:
-    async def _query() -> None:
-        await db_session.delete(transaction)
-
-    await async_run_query(_query, db_session)
+    if await async_run_query(_query, db_session, rollback_on_exc=False) is None:
+        raise HttpErrors.DUPLICATE_TRANSACTION.value
 
 
 async def create_processed_transaction(
-    db_session: "AsyncSession", retailer: RetailerRewards, campaign_slugs: list[str], transaction: Transaction
+    db_session: "AsyncSession", retailer: RetailerRewards, campaign_slugs: list[str], transaction_data: dict
 ) -> ProcessedTransaction:
-    async def _query() -> ProcessedTransaction:
-        processed_transaction = ProcessedTransaction(
-            retailer_id=retailer.id,
-            campaign_slugs=campaign_slugs,
-            transaction_id=transaction.transaction_id,
-            amount=transaction.amount,
-            mid=transaction.mid,
-            datetime=transaction.datetime,
-            account_holder_uuid=transaction.account_holder_uuid,
-            payment_transaction_id=transaction.payment_transaction_id,
+    """
+    Checks for an existing transaction and processed transaction and inserts the processed transaction in a single
+    statement, raises DUPLICATE_TRANSACTION if either already exists.
+    """
+    values = transaction_data | {"retailer_id": retailer.id, "campaign_slugs": campaign_slugs}
+    columns = ProcessedTransaction.__table__.c
+
+    async def _query() -> "Row | None":
+        new_key = (
+            insert(processed_transaction_key)
+            .from_select(
+                ["retailer_id", "transaction_id"],
+                select(
+                    cast(bindparam("key_retailer_id", retailer.id, type_=Integer), Integer),
+                    cast(
+                        bindparam("key_transaction_id", transaction_data["transaction_id"], type_=String(128)),
+                        String(128),
+                    ),
+                ).where(
+                    ~exists().where(
+                        Transaction.retailer_id == retailer.id,
+                        Transaction.transaction_id == transaction_data["transaction_id"],
+                    )
+                ),
+            )
+            .on_conflict_do_nothing()
+            .returning(processed_transaction_key.c.transaction_id)
+            .cte("new_key")
+        )
+        return (
+            await db_session.execute(
+                insert(ProcessedTransaction)
+                .from_select(
+                    list(values),
+                    select(
+                        *(cast(bindparam(k, v, type_=columns[k].type), columns[k].type) for k, v in values.items())
+                    ).select_from(new_key),
+                )
+                .returning(ProcessedTransaction.id, ProcessedTransaction.created_at, ProcessedTransaction.updated_at)
+            )
+        ).one_or_none()
+
+    if (row := await async_run_query(_query, db_session, rollback_on_exc=False)) is None:
+        raise HttpErrors.DUPLICATE_TRANSACTION.value
+
+    return ProcessedTransaction(**values, **row._mapping)
+
+
+async def get_existing_transaction_ids(
+    db_session: "AsyncSession", retailer: RetailerRewards, transaction_ids: list[str]
+) -> set[str]:
+    async def _query() -> set[str]:
+        return set(
+            (
+                await db_session.execute(
+                    select(Transaction.transaction_id).where(
+                        Transaction.retailer_id == retailer.id,
+                        Transaction.transaction_id.in_(transaction_ids),
+                    )
+                )
+            )
+            .scalars()
+            .all()
         )
-        nested_trans = await db_session.begin_nested()
-        db_session.add(processed_transaction)
-        transaction.status = TransactionProcessingStatuses.PROCESSED
-        try:
-            await nested_trans.commit()
-        except IntegrityError:
-            await nested_trans.rollback()
-            transaction.status = TransactionProcessingStatuses.DUPLICATE
-            raise HttpErrors.DUPLICATE_TRANSACTION.value from None
 
-        return processed_transaction
+    return await async_run_query(_query, db_session, rollback_on_exc=False)
 
-    return await async_run_query(_query, db_session)
 
+async def create_transactions(
+    db_session: "AsyncSession", retailer: RetailerRewards, transactions_data: list[dict]
+) -> None:
+    async def _query() -> None:
+        await db_session.execute(
+            insert(Transaction)
+            .values([transaction_data | {"retailer_id": retailer.id} for transaction_data in transactions_data])
+            .on_conflict_do_nothing(constraint="transaction_retailer_unq")
+        )
 
-async def create_reward_adjustment_tasks(
-    db_session: "AsyncSession", processed_transaction: ProcessedTransaction, adj_amounts: dict
-) -> list[int]:
-    async def _query() -> list[RetryTask]:
-        adjustments = []
-        for campaign_slug, amount in adj_amounts.items():
-            adjustment_task = await async_create_task(  # pragma: no cover
-                db_session,
-                task_type_name=settings.REWARD_ADJUSTMENT_TASK_NAME,
-                params={
-                    "account_holder_uuid": processed_transaction.account_holder_uuid,
-                    "retailer_slug": processed_transaction.retailer.slug,
-                    "processed_transaction_id": processed_transaction.transaction_id,
-                    "campaign_slug": campaign_slug,
-                    "adjustment_amount": int(amount),
-                    "pre_allocation_token": uuid4(),
-                    "transaction_datetime": processed_transaction.datetime,
-                },
+    if transactions_data:
+        await async_run_query(_query, db_session, rollback_on_exc=False)
+
+
+async def create_processed_transactions(
+    db_session: "AsyncSession", retailer: RetailerRewards, processed_transactions_data: list[dict]
+) -> set[str]:
+    """
+    Inserts all the provided processed transactions whose transaction_id has not been processed yet and returns the
+    transaction_ids of the rows that have been inserted, any transaction_id missing from the result is a duplicate.
+    """
+
+    # a transaction_id repeated within the batch is a duplicate of its first occurrence
+    first_occurrences: dict[str, dict] = {}
+    for data in processed_transactions_data:
+        first_occurrences.setdefault(data["transaction_id"], data)
+
+    async def _query() -> set[str]:
+        inserted_transaction_ids = set(
+            (
+                await db_session.execute(
+                    insert(processed_transaction_key)
+                    .values(
+                        [
+                            {"retailer_id": retailer.id, "transaction_id": data["transaction_id"]}
+                            for data in processed_transactions_data
+                        ]
+                    )
+                    .on_conflict_do_nothing()
+                    .returning(processed_transaction_key.c.transaction_id)
+                )
             )
+            .scalars()
+            .all()
+        )
+        if inserted_transaction_ids:
+            await db_session.execute(
+                insert(ProcessedTransaction).values(
+                    [
+                        data | {"retailer_id": retailer.id}
+                        for transaction_id, data in first_occurrences.items()
+                        if transaction_id in inserted_transaction_ids
+                    ]
+                )
+            )
+
+        return inserted_transaction_ids
+
+    if not processed_transactions_data:
+        return set()
 
-            adjustments.append(adjustment_task)
+    return await async_run_query(_query, db_session, rollback_on_exc=False)
 
-        return adjustments
 
-    return [task.retry_task_id for task in await async_run_query(_query, db_session)]
+async def create_reward_adjustment_tasks(
+    db_session: "AsyncSession",
+    retailer: RetailerRewards,
+    adjustments: list[tuple[ProcessedTransaction, dict]],
+) -> list[int]:
+    return await create_retry_tasks(
+        db_session,
+        task_type_name=settings.REWARD_ADJUSTMENT_TASK_NAME,
+        params_list=[
+            {
+                "account_holder_uuid": processed_transaction.account_holder_uuid,
+                "retailer_slug": retailer.slug,
+                "processed_transaction_id": processed_transaction.transaction_id,
+                "campaign_slug": campaign_slug,
+                "adjustment_amount": int(amount),
+                "pre_allocation_token": uuid4(),
+                "allocation_token": uuid4(),
+                "post_allocation_token": uuid4(),
+                "transaction_datetime": processed_transaction.datetime,
+            }
+            for processed_transaction, adj_amounts in adjustments
+            for campaign_slug, amount in adj_amounts.items()
+        ],
+    )
 
 
 async def update_reward_adjustment_task_status(
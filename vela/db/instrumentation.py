@@ -0,0 +1,101 @@
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import event
+
+from vela.core.config import settings
+from vela.tasks.prometheus.metrics import (
+    db_slowest_statement_seconds,
+    db_statements_histogram,
+    db_time_seconds,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy.engine import Connection, Engine
+
+_QUERY_START_KEY = "vela_query_start"
+
+
+@dataclass(slots=True)
+class QueryStats:
+    statements: int = 0
+    total_time: float = 0.0
+    slowest: float = 0.0
+
+    def record(self, duration: float) -> None:
+        self.statements += 1
+        self.total_time += duration
+        self.slowest = max(duration, self.slowest)
+
+    def observe(self, name: str) -> None:
+        labels = {"app": settings.PROJECT_NAME, "name": name}
+        db_statements_histogram.labels(**labels).observe(self.statements)
+        db_time_seconds.labels(**labels).observe(self.total_time)
+        db_slowest_statement_seconds.labels(**labels).observe(self.slowest)
+
+
+# worker threads and greenlets started from a tracked scope share its QueryStats, as they run in a copy of its context
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_db_queries() -> Generator[QueryStats, None, None]:
+    """Records the statements executed, on any instrumented engine, within the block into the yielded QueryStats."""
+    query_stats = QueryStats()
+    token = _query_stats.set(query_stats)
+    try:
+        yield query_stats
+    finally:
+        _query_stats.reset(token)
+
+
+def untrack_db_queries() -> None:
+    """
+    Stops recording the statements executed in the current context into the enclosing track_db_queries block.
+
+    Called at the start of background tasks, as asyncio tasks run in a copy of the context of the request that
+    created them and would otherwise count their statements towards that request.
+    """
+    _query_stats.set(None)
+
+
+def db_query_metrics(task_name: str) -> Callable:
+    """Decorator for tasks, observes the statements run by each call in the db query histograms."""
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with track_db_queries() as query_stats:
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    query_stats.observe(task_name)
+
+        return wrapper
+
+    return decorator
+
+
+def _before_cursor_execute(conn: "Connection", *args: Any) -> None:
+    if _query_stats.get() is not None:
+        conn.info[_QUERY_START_KEY] = perf_counter()
+
+
+def _after_cursor_execute(conn: "Connection", *args: Any) -> None:
+    if (query_stats := _query_stats.get()) is not None and (start := conn.info.pop(_QUERY_START_KEY, None)):
+        query_stats.record(perf_counter() - start)
+
+
+def instrument_engine(engine: "Engine") -> None:
+    """
+    Times every statement executed by the engine within a track_db_queries block.
+
+    Statements run outside of one only cost a context variable lookup.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
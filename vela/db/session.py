@@ -4,6 +4,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 
 from vela.core.config import settings
+from vela.db.instrumentation import instrument_engine
 
 null_pool = {"poolclass": NullPool} if (settings.USE_NULL_POOL or settings.TESTING) else {}
 
@@ -22,5 +23,10 @@ sync_engine = create_engine(
     future=True,
     **null_pool,
 )
+
+if settings.DB_QUERY_METRICS:
+    instrument_engine(async_engine.sync_engine)
+    instrument_engine(sync_engine)
+
 AsyncSessionMaker = sessionmaker(bind=async_engine, future=True, expire_on_commit=False, class_=AsyncSession)
 SyncSessionMaker = sessionmaker(bind=sync_engine, future=True, expire_on_commit=False)
@@ -21,6 +21,78 @@ logger = logging.getLogger(__name__)
 timeout = aiohttp.ClientTimeout(total=10, connect=3.03)
 
 
+def _trace_config_ctx_factory(trace_request_ctx: SimpleNamespace | None) -> SimpleNamespace:
+    return SimpleNamespace(label_url=getattr(trace_request_ctx, "label_url", None), trace_request_ctx=trace_request_ctx)
+
+
+class _ClientSessionManager:
+    """
+    Holds the application wide aiohttp.ClientSession so that connections to Polaris and Carina are pooled and kept
+    alive across requests instead of being opened for each call.
+
+    The session is bound to the event loop it was created in, if it is requested from a different loop
+    (e.g. from within a test client) the previous one is closed and a new one is created.
+    """
+
+    def __init__(self) -> None:
+        self._session: aiohttp.ClientSession | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        trace_config = aiohttp.TraceConfig(trace_config_ctx_factory=_trace_config_ctx_factory)  # type: ignore [arg-type]
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=settings.INTERNAL_REQUESTS_CONNECTION_LIMIT,
+                limit_per_host=settings.INTERNAL_REQUESTS_CONNECTION_LIMIT_PER_HOST,
+                keepalive_timeout=settings.INTERNAL_REQUESTS_KEEPALIVE_TIMEOUT,
+            ),
+            raise_for_status=False,
+            timeout=timeout,
+            trace_configs=[trace_config],
+        )
+
+    @staticmethod
+    def _close_stale_session(session: aiohttp.ClientSession, loop: asyncio.AbstractEventLoop) -> None:
+        if loop.is_running():
+            # the session's connections can only be closed from the thread running its loop
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        elif session.connector is not None:
+            # closing the connector releases the session's connections without awaiting on its loop
+            session.connector.close()
+
+    def get(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            if self._session is not None and not self._session.closed and self._loop is not None:
+                self._close_stale_session(self._session, self._loop)
+
+            self._session = self._create_session()
+            self._loop = loop
+
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+        self._session = None
+        self._loop = None
+
+
+client_session_manager = _ClientSessionManager()
+
+
+async def open_client_session() -> None:
+    client_session_manager.get()
+
+
+async def close_client_session() -> None:
+    await client_session_manager.close()
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_fixed(0.1),
@@ -85,22 +157,19 @@ async def send_async_request_with_retry(  # noqa: PLR0913
         label_kwargs[k] = f"[{k}]" if k in exclude_from_label_url else v
     label_url = url_template.format(**label_kwargs)
 
-    def _trace_config_ctx_factory(trace_request_ctx: SimpleNamespace | None) -> SimpleNamespace:
-        return SimpleNamespace(label_url=label_url, trace_request_ctx=trace_request_ctx)
-
-    trace_config = aiohttp.TraceConfig(trace_config_ctx_factory=_trace_config_ctx_factory)  # type: ignore [arg-type]
-    trace_config.on_request_end.append(on_request_end)
-    trace_config.on_request_exception.append(on_request_exception)
-
-    async with (
-        aiohttp.ClientSession(raise_for_status=False, trace_configs=[trace_config]) as session,
-        session.request(method, url, headers=headers, json=json, timeout=timeout) as response,
-    ):
+    async with client_session_manager.get().request(
+        method,
+        url,
+        headers=headers,
+        json=json,
+        timeout=timeout,
+        trace_request_ctx=SimpleNamespace(label_url=label_url),
+    ) as response:
         json_response = await response.json()
         return response.status, json_response
 
 
-async def validate_account_holder(account_holder_uuid: UUID, retailer_slug: str, tx_datetime: datetime) -> None:
+async def get_account_holder_status(account_holder_uuid: UUID, retailer_slug: str) -> dict:
     url = f"{settings.POLARIS_BASE_URL}/{retailer_slug}/accounts/{account_holder_uuid}/status"
     with sentry_sdk.start_span(op="http.client", description=f"GET {url}") as span:
         try:
@@ -129,10 +198,14 @@ async def validate_account_holder(account_holder_uuid: UUID, retailer_slug: str,
         logger.exception("Failed to fetch account holder status from Polaris.", exc_info=msg)
         raise HttpErrors.GENERIC_HANDLED_ERROR.value
 
-    if resp_json["status"] != "active":
+    return resp_json
+
+
+def check_account_holder_status(account_holder_status: dict, tx_datetime: datetime) -> None:
+    if account_holder_status["status"] != "active":
         raise HttpErrors.USER_NOT_ACTIVE.value
 
-    if resp_json["created_at"] > tx_datetime.timestamp():
+    if account_holder_status["created_at"] > tx_datetime.timestamp():
         raise HttpErrors.INVALID_TX_DATE.value
 
 
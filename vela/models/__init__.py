@@ -1,2 +1,2 @@
 from .retailer import Campaign, EarnRule, RetailerRewards, RetailerStore, RewardRule
-from .transaction import ProcessedTransaction, Transaction
+from .transaction import ProcessedTransaction, Transaction, processed_transaction_key
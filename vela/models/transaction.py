@@ -1,10 +1,22 @@
 from typing import TYPE_CHECKING, ClassVar
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import (
+    DDL,
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Integer,
+    PrimaryKeyConstraint,
+    String,
+    Table,
+    UniqueConstraint,
+    event,
+)
 from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import relationship
 
-from vela.db.base_class import Base, TimestampMixin
+from vela.db.base_class import Base, TimestampMixin, utc_timestamp_sql
 from vela.enums import TransactionProcessingStatuses
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -30,8 +42,16 @@ class Transaction(Base, TimestampMixin):
 
 
 class ProcessedTransaction(Base, TimestampMixin):
+    """
+    Partitioned by month of created_at, see vela.scheduled_tasks.partitions. Partitioned tables' unique constraints
+    must include the partition key, the uniqueness of transaction_id per retailer is enforced by
+    processed_transaction_key instead.
+    """
+
     __tablename__ = "processed_transaction"
 
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    created_at = Column(DateTime, server_default=utc_timestamp_sql, nullable=False, primary_key=True)
     transaction_id = Column(String(128), nullable=False, index=True)
     amount = Column(Integer, nullable=False)
     mid = Column(String(128), nullable=False)
@@ -43,5 +63,24 @@ class ProcessedTransaction(Base, TimestampMixin):
 
     retailer = relationship("RetailerRewards", back_populates="processed_transactions")
 
-    __table_args__ = (UniqueConstraint("transaction_id", "retailer_id", name="process_transaction_retailer_unq"),)
+    __table_args__ = ({"postgresql_partition_by": "RANGE (created_at)"},)
     __mapper_args__: ClassVar[dict] = {"eager_defaults": True}
+
+
+# rows outside of the monthly partitions, the partition maintenance job keeps it empty by creating partitions ahead
+event.listen(
+    ProcessedTransaction.__table__,
+    "after_create",
+    DDL("CREATE TABLE processed_transaction_default PARTITION OF processed_transaction DEFAULT"),
+)
+
+# deduplicates transaction ids for as long as their processed transactions are kept, the partition maintenance job
+# deletes the keys older than PROCESSED_TRANSACTION_RETENTION_MONTHS together with their partitions
+processed_transaction_key = Table(
+    "processed_transaction_key",
+    Base.metadata,
+    Column("retailer_id", Integer, ForeignKey("retailer_rewards.id", ondelete="CASCADE"), nullable=False),
+    Column("transaction_id", String(128), nullable=False),
+    Column("created_at", DateTime, server_default=utc_timestamp_sql, nullable=False, index=True),
+    PrimaryKeyConstraint("retailer_id", "transaction_id", name="processed_transaction_key_pkey"),
+)
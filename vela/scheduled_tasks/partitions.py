@@ -0,0 +1,154 @@
+import re
+
+from datetime import date, datetime
+from typing import TYPE_CHECKING
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import text
+
+from vela.core.config import settings
+from vela.db.session import SyncSessionMaker
+from vela.models import ProcessedTransaction, processed_transaction_key
+from vela.scheduled_tasks.scheduler import acquire_lock, cron_scheduler
+
+from . import logger
+
+if TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy.orm import Session
+
+PARENT_TABLE_NAME = ProcessedTransaction.__tablename__
+DEFAULT_PARTITION_NAME = f"{PARENT_TABLE_NAME}_default"
+KEY_TABLE_NAME = processed_transaction_key.name
+PARTITION_NAME_REGEX = re.compile(rf"^{PARENT_TABLE_NAME}_p(\d{{4}})_(\d{{2}})$")
+
+
+def add_months(month: date, months: int) -> date:
+    month_index = month.year * 12 + month.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE_NAME}_p{month:%Y_%m}"
+
+
+def _get_monthly_partitions(db_session: "Session") -> dict[date, str]:
+    partition_names = db_session.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = :parent_table_name"
+        ),
+        {"parent_table_name": PARENT_TABLE_NAME},
+    ).scalars()
+    return {
+        date(int(match.group(1)), int(match.group(2)), 1): name
+        for name in partition_names
+        if (match := PARTITION_NAME_REGEX.match(name))
+    }
+
+
+def _create_partition(db_session: "Session", month: date) -> None:
+    """
+    Creates the month's partition. Postgres refuses to create it while the default partition holds rows for that
+    month, so any such rows are moved out of the default partition and back in through the parent, in the same
+    transaction, which lands them in the new partition.
+    """
+    month_range = {"start": month, "end": add_months(month, 1)}
+    # stops rows for the month landing in the default partition between moving them out and creating the partition
+    db_session.execute(text(f"LOCK TABLE {DEFAULT_PARTITION_NAME} IN EXCLUSIVE MODE"))
+    stray_rows = db_session.execute(
+        text(
+            f"SELECT count(*) FROM {DEFAULT_PARTITION_NAME} "  # noqa: S608
+            "WHERE created_at >= :start AND created_at < :end"
+        ),
+        month_range,
+    ).scalar_one()
+    if stray_rows:
+        logger.warning(
+            "Moving %d rows from %s into partition %s...", stray_rows, DEFAULT_PARTITION_NAME, partition_name(month)
+        )
+        db_session.execute(
+            text(f"CREATE TEMPORARY TABLE stray_processed_transaction (LIKE {PARENT_TABLE_NAME}) ON COMMIT DROP")
+        )
+        db_session.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION_NAME} "  # noqa: S608
+                "WHERE created_at >= :start AND created_at < :end RETURNING *) "
+                "INSERT INTO stray_processed_transaction SELECT * FROM moved"
+            ),
+            month_range,
+        )
+
+    db_session.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARENT_TABLE_NAME} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        )
+    )
+    if stray_rows:
+        db_session.execute(
+            text(f"INSERT INTO {PARENT_TABLE_NAME} SELECT * FROM stray_processed_transaction")  # noqa: S608
+        )
+    db_session.commit()
+
+
+def _drop_partition(db_session: "Session", name: str) -> None:
+    db_session.execute(text(f"ALTER TABLE {PARENT_TABLE_NAME} DETACH PARTITION {name}"))
+    db_session.execute(text(f"DROP TABLE {name}"))
+    db_session.commit()
+
+
+def _delete_expired_keys(db_session: "Session", oldest_kept_month: date) -> int:
+    """
+    Deletes the processed_transaction_key rows created before oldest_kept_month in batches of
+    PROCESSED_TRANSACTION_KEY_CLEANUP_BATCH_SIZE, each committed on its own, and returns how many have been deleted.
+    """
+    deleted = 0
+    while True:
+        batch_deleted = db_session.execute(
+            text(
+                f"DELETE FROM {KEY_TABLE_NAME} WHERE (retailer_id, transaction_id) IN ("  # noqa: S608
+                f"SELECT retailer_id, transaction_id FROM {KEY_TABLE_NAME} WHERE created_at < :oldest_kept_month "
+                "LIMIT :batch_size)"
+            ),
+            {
+                "oldest_kept_month": oldest_kept_month,
+                "batch_size": settings.PROCESSED_TRANSACTION_KEY_CLEANUP_BATCH_SIZE,
+            },
+        ).rowcount
+        db_session.commit()
+        deleted += batch_deleted
+        if batch_deleted < settings.PROCESSED_TRANSACTION_KEY_CLEANUP_BATCH_SIZE:
+            return deleted
+
+
+@acquire_lock(runner=cron_scheduler)
+def maintain_processed_transaction_partitions() -> None:
+    """
+    Creates the monthly processed_transaction partitions for the current month and the next
+    PROCESSED_TRANSACTION_PARTITIONS_PREMAKE_MONTHS months, so that no row lands in the default partition. The
+    partition of the month processed_transaction was partitioned in also holds every earlier row.
+
+    Partitions whose whole month is older than PROCESSED_TRANSACTION_RETENTION_MONTHS months are detached and dropped,
+    and so are the processed_transaction_key rows created before that month. That is the deduplication window: a
+    transaction id can be processed again once its processed transaction has been dropped.
+    """
+    current_month = datetime.now(tz=ZoneInfo(cron_scheduler.trigger_timezone)).date().replace(day=1)
+
+    with SyncSessionMaker() as db_session:
+        existing_partitions = _get_monthly_partitions(db_session)
+        for months in range(settings.PROCESSED_TRANSACTION_PARTITIONS_PREMAKE_MONTHS + 1):
+            month = add_months(current_month, months)
+            if month not in existing_partitions:
+                logger.info("Creating partition %s...", partition_name(month))
+                _create_partition(db_session, month)
+
+        oldest_kept_month = add_months(current_month, -settings.PROCESSED_TRANSACTION_RETENTION_MONTHS)
+        for month, name in sorted(existing_partitions.items()):
+            if month < oldest_kept_month:
+                logger.info("Dropping partition %s...", name)
+                _drop_partition(db_session, name)
+
+        if deleted_keys := _delete_expired_keys(db_session, oldest_kept_month):
+            logger.info("Deleted %d %s rows created before %s.", deleted_keys, KEY_TABLE_NAME, oldest_kept_month)
@@ -1,5 +1,6 @@
 import logging
 from collections.abc import Callable
+from contextvars import ContextVar
 from datetime import datetime, timezone
 from functools import wraps
 from logging import Logger
@@ -15,17 +16,39 @@ from vela.core.config import redis, settings
 from . import logger
 
 
+LOCK_TIMEOUT_SECS = 3600
+
+# the key and value of the lock held by the scheduled task running in the current context
+_held_lock: ContextVar[tuple[str, str] | None] = ContextVar("held_lock", default=None)
+
+
 class Runner(Protocol):
     uid: str
     name: str
 
 
+def extend_lock(lock_timeout_secs: int = LOCK_TIMEOUT_SECS) -> bool:
+    """
+    Resets the expiry of the lock held by the running scheduled task, for use by tasks that may run for longer than
+    the lock timeout. Returns False if the lock is no longer held by this runner.
+    """
+    if (held_lock := _held_lock.get()) is None:
+        return False
+
+    func_lock_key, value = held_lock
+    if redis.get(func_lock_key) != value:
+        logger.warning("Lock %s is no longer held by this runner.", func_lock_key)
+        return False
+
+    return bool(redis.expire(func_lock_key, lock_timeout_secs))
+
+
 def acquire_lock(runner: Runner) -> Callable:
     """
     Decorator for use with scheduled tasks to ensure a scheduled task won't be
     run concurrently somewhere else.
     """
-    lock_timeout_secs = 3600
+    lock_timeout_secs = LOCK_TIMEOUT_SECS
 
     def decorater(func: Callable) -> Callable:
         @wraps(func)
@@ -36,11 +59,13 @@ def acquire_lock(runner: Runner) -> Callable:
                 # This assumes jobs will be completed within LOCK_TIMEOUT_SECS
                 # seconds and if the lock expires then another process can run
                 # the function without consequence
+                token = _held_lock.set((func_lock_key, value))
                 try:
                     func(*args, **kwargs)
                 except Exception as ex:
                     logger.exception("Unexpected error occurred while running '%s'", func.__qualname__, exc_info=ex)
                 finally:
+                    _held_lock.reset(token)
                     redis.delete(func_lock_key)
             else:
                 msg = f"{runner} could not run {func.__qualname__}. Could not acquire the lock."
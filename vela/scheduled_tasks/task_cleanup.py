@@ -1,21 +1,84 @@
+import time
+
 from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
 from zoneinfo import ZoneInfo
 
 from retry_tasks_lib.db.models import RetryTask, RetryTaskStatuses
-from sqlalchemy import delete
+from sqlalchemy.future import select
 
-from vela.core.config import settings
+from vela.core.config import redis, settings
 from vela.db.session import SyncSessionMaker
-from vela.scheduled_tasks.scheduler import acquire_lock, cron_scheduler
+from vela.scheduled_tasks.scheduler import acquire_lock, cron_scheduler, extend_lock
+from vela.tasks.prometheus.metrics import task_cleanup_deleted_total, task_cleanup_duration_seconds
 
 from . import logger
 
+if TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy.orm import Session
+
+# tasks in a successful terminal state
+DELETEABLE_TASK_STATUSES = {
+    RetryTaskStatuses.SUCCESS,
+    RetryTaskStatuses.CANCELLED,
+    RetryTaskStatuses.REQUEUED,
+    RetryTaskStatuses.CLEANUP,
+}
+PROGRESS_KEY = f"{settings.REDIS_KEY_PREFIX}{cron_scheduler.name}:cleanup_old_tasks:progress"
+PROGRESS_TTL_SECS = 2 * 24 * 3600
+
+
+def _get_resume_id(time_reference: datetime) -> int:
+    """Returns the id after which the previous, interrupted, run for the same time reference stopped, if any."""
+    if not (progress := redis.get(PROGRESS_KEY)):
+        return 0
+
+    progress_time_reference, _, last_deleted_id = progress.rpartition("|")
+    if progress_time_reference != time_reference.isoformat():
+        return 0
+
+    logger.info("Resuming task cleanup after task %s", last_deleted_id)
+    return int(last_deleted_id)
+
+
+def _delete_tasks_batch(db_session: "Session", time_reference: datetime, after_id: int) -> list[int]:
+    """
+    Deletes up to TASK_CLEANUP_BATCH_SIZE deleteable tasks with a retry_task_id greater than after_id, walking the
+    primary key so that each batch is a bounded id range, and commits.
+    """
+    deleted_ids = (
+        db_session.execute(
+            RetryTask.__table__.delete()
+            .where(
+                RetryTask.retry_task_id.in_(
+                    select(RetryTask.retry_task_id)
+                    .where(
+                        RetryTask.retry_task_id > after_id,
+                        RetryTask.status.in_(DELETEABLE_TASK_STATUSES),
+                        RetryTask.created_at < time_reference,
+                    )
+                    .order_by(RetryTask.retry_task_id)
+                    .limit(settings.TASK_CLEANUP_BATCH_SIZE)
+                )
+            )
+            .returning(RetryTask.retry_task_id)
+        )
+        .scalars()
+        .all()
+    )
+    db_session.commit()
+    return deleted_ids
+
 
 @acquire_lock(runner=cron_scheduler)
 def cleanup_old_tasks() -> None:
     """
     Delete retry_task data (including related db objects i.e task_type_key_values)
     which are greater than TASK_DATA_RETENTION_DAYS days old.
+
+    Tasks are deleted in batches of TASK_CLEANUP_BATCH_SIZE, each committed on its own and followed by a
+    TASK_CLEANUP_BATCH_PAUSE_SECONDS pause. Progress is stored in redis so that an interrupted run is resumed by the
+    next run for the same day.
     """
     # today at midnight - 6 * 30 days (circa 6 months ago)
     tz_info = ZoneInfo(cron_scheduler.trigger_timezone)
@@ -23,22 +86,22 @@ def cleanup_old_tasks() -> None:
         days=settings.TASK_DATA_RETENTION_DAYS
     )
 
-    # tasks in a successful terminal state
-    deleteable_task_statuses = {
-        RetryTaskStatuses.SUCCESS,
-        RetryTaskStatuses.CANCELLED,
-        RetryTaskStatuses.REQUEUED,
-        RetryTaskStatuses.CLEANUP,
-    }
-
     logger.info("Cleaning up tasks created before %s...", time_reference.date())
+    start = time.perf_counter()
+    after_id = _get_resume_id(time_reference)
+    count = 0
     with SyncSessionMaker() as db_session:
-        result = db_session.execute(
-            delete(RetryTask).where(
-                RetryTask.status.in_(deleteable_task_statuses),
-                RetryTask.created_at < time_reference,
-            )
-        )
-        db_session.commit()
-        count = result.rowcount
+        while deleted_ids := _delete_tasks_batch(db_session, time_reference, after_id):
+            after_id = max(deleted_ids)
+            count += len(deleted_ids)
+            task_cleanup_deleted_total.labels(app=settings.PROJECT_NAME).inc(len(deleted_ids))
+            redis.set(PROGRESS_KEY, f"{time_reference.isoformat()}|{after_id}", PROGRESS_TTL_SECS)
+            if len(deleted_ids) < settings.TASK_CLEANUP_BATCH_SIZE:
+                break
+
+            extend_lock()
+            time.sleep(settings.TASK_CLEANUP_BATCH_PAUSE_SECONDS)
+
+    redis.delete(PROGRESS_KEY)
+    task_cleanup_duration_seconds.labels(app=settings.PROJECT_NAME).observe(time.perf_counter() - start)
     logger.info("Deleted %d tasks. ( °╭ ︿ ╮°)", count)
@@ -1,2 +1,2 @@
 from .campaign import CampaignsStatusChangeSchema
-from .transaction import CreateTransactionSchema
+from .transaction import CreateTransactionsBatchSchema, CreateTransactionSchema, TransactionResultSchema
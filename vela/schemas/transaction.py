@@ -1,9 +1,11 @@
 from datetime import datetime as dt
 from datetime import timezone
 
-from pydantic import BaseModel, Field, StrictInt, constr, validator
+from pydantic import BaseModel, Field, StrictInt, conlist, constr, validator
 from pydantic.types import UUID4
 
+from vela.core.config import settings
+
 
 # I pass in an empty string for any of these fields: id, datetime, MID or loyalty_id
 class CreateTransactionSchema(BaseModel):  # pragma: no cover
@@ -25,3 +27,15 @@ class CreateTransactionSchema(BaseModel):  # pragma: no cover
             raise ValueError("invalid datetime") from ex
 
         return processed_datetime
+
+
+class CreateTransactionsBatchSchema(BaseModel):  # pragma: no cover
+    # items are validated one by one against CreateTransactionSchema so that a single
+    # malformed transaction does not cause the whole batch to be rejected
+    __root__: conlist(dict, min_items=1, max_items=settings.TRANSACTION_BATCH_MAX_SIZE)  # type: ignore [valid-type]
+
+
+class TransactionResultSchema(BaseModel):
+    id: str | None
+    status_code: int
+    response: str | dict
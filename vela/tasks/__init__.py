@@ -1,6 +1,10 @@
 import logging
+import os
+import threading
 
 import requests
+
+from requests.adapters import HTTPAdapter
 from tenacity import retry
 from tenacity.before import before_log
 from tenacity.retry import retry_if_exception_type, retry_if_result
@@ -13,6 +17,54 @@ from vela.tasks.prometheus.synchronous import update_metrics_exception_handler,
 logger = logging.getLogger(__name__)
 
 
+class _RequestsSessionManager:
+    """
+    Holds a pooled, keep-alive requests.Session per process so that consecutive task requests to Polaris and Carina
+    reuse their connections.
+
+    RQ forks a work horse for each job, the pooled sockets can't be shared with the parent so a child process
+    always creates its own session. The threads of a threaded task worker share their process' session, which is
+    created under a lock so that concurrent first uses don't each create one.
+    """
+
+    def __init__(self) -> None:
+        self._session: requests.Session | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=settings.TASK_REQUESTS_POOL_CONNECTIONS,
+            pool_maxsize=settings.TASK_REQUESTS_POOL_MAXSIZE,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def get(self) -> requests.Session:
+        session = self._session
+        if session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    self._session = self._create_session()
+                    self._pid = os.getpid()
+                session = self._session
+
+        return session
+
+    def close(self) -> None:
+        with self._lock:
+            if self._session is not None and self._pid == os.getpid():
+                self._session.close()
+
+            self._session = None
+            self._pid = None
+
+
+requests_session_manager = _RequestsSessionManager()
+
+
 @retry(
     stop=stop_after_attempt(2),
     wait=wait_fixed(1),
@@ -79,7 +131,7 @@ def send_request_with_metrics(  # noqa: PLR0913
     hooks = {"response": update_metrics_hook(label_url)} if settings.ACTIVATE_TASKS_METRICS else {}
 
     try:
-        return requests.request(
+        return requests_session_manager.get().request(
             method,
             url_template.format(**url_kwargs),
             hooks=hooks,
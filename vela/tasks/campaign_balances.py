@@ -6,6 +6,7 @@ from retry_tasks_lib.enums import RetryTaskStatuses
 from retry_tasks_lib.utils.synchronous import retryable_task
 
 from vela.core.config import settings
+from vela.db.instrumentation import db_query_metrics
 from vela.db.session import SyncSessionMaker
 from vela.tasks.prometheus.metrics import tasks_run_total
 from vela.tasks.prometheus.synchronous import task_processing_time_callback_fn
@@ -49,6 +50,7 @@ def _process_campaign_balances_update(task_type_name: str, task_params: dict) ->
 
 # NOTE: Inter-dependency: If this function's name or module changes, ensure that
 # it is relevantly reflected in the TaskType table
+@db_query_metrics(task_name="update-campaign-balances")
 @retryable_task(db_session_factory=SyncSessionMaker, metrics_callback_fn=task_processing_time_callback_fn)
 def update_campaign_balances(retry_task: RetryTask, db_session: "Session") -> None:
     if settings.ACTIVATE_TASKS_METRICS:
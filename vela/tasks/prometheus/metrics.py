@@ -42,3 +42,67 @@ tasks_processing_time_histogram = Histogram(
     documentation="Total time taken by a task to process",
     labelnames=("app", "task_name"),
 )
+
+cache_requests_total = Counter(
+    name=f"{METRIC_NAME_PREFIX}cache_requests_total",
+    documentation="Total in-process cache lookups by cache name and result (hit or miss).",
+    labelnames=("app", "cache", "result"),
+)
+
+activities_dropped_total = Counter(
+    name=f"{METRIC_NAME_PREFIX}activities_dropped_total",
+    documentation="Total activities dropped because the activity publisher queue was full.",
+    labelnames=("app", "routing_key"),
+)
+
+activity_publisher_queue_size = Gauge(
+    name=f"{METRIC_NAME_PREFIX}activity_publisher_queue_size",
+    documentation="The current number of activities waiting to be published",
+    labelnames=("app",),
+)
+
+task_cleanup_deleted_total = Counter(
+    name=f"{METRIC_NAME_PREFIX}task_cleanup_deleted_total",
+    documentation="Total retry tasks deleted by the task cleanup job.",
+    labelnames=("app",),
+)
+
+task_cleanup_duration_seconds = Histogram(
+    name=f"{METRIC_NAME_PREFIX}task_cleanup_duration_seconds",
+    documentation="Time taken by a task cleanup job run",
+    labelnames=("app",),
+    buckets=(1, 10, 60, 300, 900, 1800, 3600, 7200, float("inf")),
+)
+
+db_statements_histogram = Histogram(
+    name=f"{METRIC_NAME_PREFIX}db_statements",
+    documentation="SQL statements executed per api request, labelled by route, or per task run, labelled by task name",
+    labelnames=("app", "name"),
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89, float("inf")),
+)
+
+db_time_seconds = Histogram(
+    name=f"{METRIC_NAME_PREFIX}db_time_seconds",
+    documentation="Total time spent executing SQL statements per api request or per task run",
+    labelnames=("app", "name"),
+)
+
+db_slowest_statement_seconds = Histogram(
+    name=f"{METRIC_NAME_PREFIX}db_slowest_statement_seconds",
+    documentation="Time taken by the slowest SQL statement of each api request or task run",
+    labelnames=("app", "name"),
+)
+
+request_stage_duration_seconds = Histogram(
+    name=f"{METRIC_NAME_PREFIX}request_stage_duration_seconds",
+    documentation="Time taken by each stage of an api request",
+    labelnames=("app", "endpoint", "stage"),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, float("inf")),
+)
+
+task_enqueue_batch_duration_seconds = Histogram(
+    name=f"{METRIC_NAME_PREFIX}task_enqueue_batch_duration_seconds",
+    documentation="Time taken to load and push to RQ each micro batch of retry tasks enqueued by the api",
+    labelnames=("app",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, float("inf")),
+)
@@ -7,11 +7,14 @@ from uuid import uuid4
 from retry_tasks_lib.db.models import RetryTask
 from retry_tasks_lib.enums import RetryTaskStatuses
 from retry_tasks_lib.utils.synchronous import RetryTaskAdditionalQueryData, retryable_task
+from sqlalchemy.exc import NoResultFound
 from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
 
 from vela.activity_utils.utils import pence_integer_to_currency_string
 from vela.core.config import redis_raw, settings
 from vela.db.base_class import sync_run_query
+from vela.db.instrumentation import db_query_metrics
 from vela.db.session import SyncSessionMaker
 from vela.enums import CampaignStatuses
 from vela.models import Campaign, RetailerRewards, RewardRule
@@ -113,17 +116,6 @@ def _process_pending_reward_allocation(  # noqa: PLR0913
     return response_audit
 
 
-def _get_reward_rule(db_session: "Session", campaign_slug: str) -> RewardRule:
-    reward_rule: RewardRule = sync_run_query(
-        lambda: db_session.execute(
-            select(RewardRule).where(RewardRule.campaign_id == Campaign.id, Campaign.slug == campaign_slug)
-        ).scalar_one(),
-        db_session,
-        rollback_on_exc=False,
-    )
-    return reward_rule
-
-
 def _number_of_rewards_achieved(reward_rule: RewardRule, new_balance: int, adjustment_amount: int) -> tuple[int, bool]:
     n_reward_achieved = new_balance // reward_rule.reward_goal
     trc_reached = False
@@ -202,25 +194,27 @@ def _process_balance_adjustment(  # noqa: PLR0913
     return resp_data["new_balance"], response_audit
 
 
-def _set_param_value(
-    db_session: "Session", retry_task: RetryTask, param_name: str, param_value: Any, commit: bool = True
-) -> str:
-    def _query() -> str:
-        key_ids_by_name = retry_task.task_type.get_key_ids_by_name()
-        task_type_key_val = retry_task.get_task_type_key_values([(key_ids_by_name[param_name], param_value)])[0]
-        db_session.add(task_type_key_val)
-        if commit:
-            db_session.commit()
+def _set_param_values(db_session: "Session", retry_task: RetryTask, param_values: dict[str, Any]) -> None:
+    """Persists all the provided params of retry_task in one commit."""
 
-        return task_type_key_val.value
+    def _query() -> None:
+        key_ids_by_name = retry_task.task_type.get_key_ids_by_name()
+        db_session.add_all(
+            retry_task.get_task_type_key_values(
+                [(key_ids_by_name[name], value) for name, value in param_values.items()]
+            )
+        )
+        db_session.commit()
 
-    return sync_run_query(_query, db_session)
+    sync_run_query(_query, db_session)
 
 
 def _get_campaign(db_session: "Session", retailer_slug: str, campaign_slug: str) -> Campaign:
+    """Loads the campaign together with its reward rule, so its status and reward rule are fetched in one query."""
     campaign: Campaign = sync_run_query(
         lambda: db_session.execute(
             select(Campaign)
+            .options(joinedload(Campaign.reward_rule))
             .join(RetailerRewards)
             .where(RetailerRewards.slug == retailer_slug, Campaign.slug == campaign_slug)
         ).scalar_one(),
@@ -295,55 +289,65 @@ class TokenParamNames(Enum):
     POST_ALLOCATION_TOKEN = "post_allocation_token"  # noqa: S105
 
 
-# NOTE: Inter-dependency: If this function's name or module changes, ensure that
-# it is relevantly reflected in the TaskType table
-@retryable_task(
-    db_session_factory=SyncSessionMaker,
-    exclusive_constraints=[
-        RetryTaskAdditionalQueryData(
-            matching_val_keys=["account_holder_uuid", "campaign_slug"],
-            additional_statuses=[RetryTaskStatuses.FAILED],
-        )
-    ],
-    redis_connection=redis_raw,
-    metrics_callback_fn=task_processing_time_callback_fn,
-)
-def adjust_balance(retry_task: RetryTask, db_session: "Session") -> None:
-    update_metrics()
-    task_params: dict = retry_task.get_params()
-    processed_tx_id = task_params["processed_transaction_id"]
-    log_suffix = f"(tx_id: {processed_tx_id}, retry_task_id: {retry_task.retry_task_id})"
+class _AdjustBalanceContext:
+    """
+    The params of an adjust_balance retry task, decoded once.
 
-    campaign = _get_campaign(db_session, task_params["retailer_slug"], task_params["campaign_slug"])
-    if campaign.status in (CampaignStatuses.ENDED, CampaignStatuses.CANCELLED):
-        retry_task.update_task(db_session, status=RetryTaskStatuses.CANCELLED, clear_next_attempt_time=True)
-        return
+    Idempotency tokens are generated when the task is created, any token missing from an older task is persisted,
+    together with the others missing, before the first request is sent so that a retry always reuses them. Response
+    audits are appended to the task and committed with its final status, or by commit_response_audits on failure.
+    """
+
+    __slots__ = ("db_session", "params", "retry_task")
+
+    def __init__(self, db_session: "Session", retry_task: RetryTask) -> None:
+        self.db_session = db_session
+        self.retry_task = retry_task
+        self.params: dict = retry_task.get_params()
 
+    def ensure_tokens(self) -> None:
+        if missing_tokens := {
+            token_name.value: str(uuid4()) for token_name in TokenParamNames if not self.params.get(token_name.value)
+        }:
+            _set_param_values(self.db_session, self.retry_task, missing_tokens)
+            self.params |= missing_tokens
+
+    def token(self, token_name: TokenParamNames) -> str:
+        return str(self.params[token_name.value])
+
+    def add_response_audit(self, response_audit: dict) -> None:
+        self.retry_task.audit_data = [*(self.retry_task.audit_data or []), response_audit]
+
+    def commit_response_audits(self) -> None:
+        sync_run_query(self.db_session.commit, self.db_session)
+
+
+def _adjust_balance(task_context: _AdjustBalanceContext, campaign: Campaign, log_suffix: str) -> None:
+    task_params = task_context.params
+    processed_tx_id = task_params["processed_transaction_id"]
     retailer_slug = task_params["retailer_slug"]
     campaign_slug = task_params["campaign_slug"]
     account_holder_uuid = task_params["account_holder_uuid"]
-    reward_rule = _get_reward_rule(db_session, campaign_slug)
+    if (reward_rule := campaign.reward_rule) is None:
+        raise NoResultFound(f"Campaign '{campaign_slug}' has no reward rule")
 
     adjustment_amount = task_params["adjustment_amount"]
     logger.info("Adjusting balance by %s %s", adjustment_amount, log_suffix)
 
-    pre_allocation_token = retry_task.get_params().get(TokenParamNames.PRE_ALLOCATION_TOKEN.value) or _set_param_value(
-        db_session, retry_task, TokenParamNames.PRE_ALLOCATION_TOKEN.value, str(uuid4())
-    )
     reason = "Refund" if adjustment_amount < 0 else "Purchase"
     new_balance, response_audit = _process_balance_adjustment(
         account_holder_uuid=account_holder_uuid,
         retailer_slug=retailer_slug,
         campaign_slug=campaign_slug,
         adjustment_amount=adjustment_amount,
-        idempotency_token=pre_allocation_token,
+        idempotency_token=task_context.token(TokenParamNames.PRE_ALLOCATION_TOKEN),
         reason=f"{reason} transaction id: {processed_tx_id}",
         tx_datetime=task_params["transaction_datetime"],
         tx_id=processed_tx_id,
         loyalty_type=campaign.loyalty_type.value,
     )
     logger.info("Balance adjusted - new balance: %s %s", new_balance, log_suffix)
-    retry_task.update_task(db_session, response_audit=response_audit)
+    task_context.add_response_audit(response_audit)
 
     rewards_achieved_n, trc_reached = _number_of_rewards_achieved(reward_rule, new_balance, adjustment_amount)
 
@@ -364,45 +368,72 @@ def adjust_balance(retry_task: RetryTask, db_session: "Session") -> None:
             )
             post_msg = "Decreasing balance by total rewards value (%s) %s"
 
-        allocation_token = retry_task.get_params().get(TokenParamNames.ALLOCATION_TOKEN.value) or _set_param_value(
-            db_session, retry_task, TokenParamNames.ALLOCATION_TOKEN.value, str(uuid4())
-        )
-
         response_audit = _process_reward_path(
             log_suffix=log_suffix,
             task_params=task_params,
             campaign_slug=campaign_slug,
             reward_rule=reward_rule,
-            allocation_token=allocation_token,
+            allocation_token=task_context.token(TokenParamNames.ALLOCATION_TOKEN),
             count=rewards_achieved_n,
             tot_cost_to_user=tot_cost_to_user,
         )
-        retry_task.update_task(db_session, response_audit=response_audit)
+        task_context.add_response_audit(response_audit)
 
         logger.info(post_msg, tot_cost_to_user, log_suffix)
 
-        post_allocation_token = retry_task.get_params().get(
-            TokenParamNames.POST_ALLOCATION_TOKEN.value
-        ) or _set_param_value(db_session, retry_task, TokenParamNames.POST_ALLOCATION_TOKEN.value, str(uuid4()))
-
         reason = _get_balance_adjustment_reason(
             campaign.loyalty_type.value,
             reward_rule.reward_goal,
             rewards_achieved_n,
-            campaign.reward_rule.allocation_window,
+            reward_rule.allocation_window,
         )
 
         balance, response_audit = _process_balance_adjustment(
             retailer_slug=retailer_slug,
             account_holder_uuid=account_holder_uuid,
             campaign_slug=campaign_slug,
-            idempotency_token=post_allocation_token,
+            idempotency_token=task_context.token(TokenParamNames.POST_ALLOCATION_TOKEN),
             adjustment_amount=-tot_cost_to_user,
             reason=reason,
             is_transaction=False,
             loyalty_type=campaign.loyalty_type.value,
         )
         logger.info(f"Balance readjusted - new balance: {balance} {log_suffix}")
-        retry_task.update_task(db_session, response_audit=response_audit)
+        task_context.add_response_audit(response_audit)
+
+
+# NOTE: Inter-dependency: If this function's name or module changes, ensure that
+# it is relevantly reflected in the TaskType table
+@db_query_metrics(task_name=settings.REWARD_ADJUSTMENT_TASK_NAME)
+@retryable_task(
+    db_session_factory=SyncSessionMaker,
+    exclusive_constraints=[
+        RetryTaskAdditionalQueryData(
+            matching_val_keys=["account_holder_uuid", "campaign_slug"],
+            additional_statuses=[RetryTaskStatuses.FAILED],
+        )
+    ],
+    redis_connection=redis_raw,
+    metrics_callback_fn=task_processing_time_callback_fn,
+)
+def adjust_balance(retry_task: RetryTask, db_session: "Session") -> None:
+    update_metrics()
+    task_context = _AdjustBalanceContext(db_session, retry_task)
+    task_params = task_context.params
+    processed_tx_id = task_params["processed_transaction_id"]
+    log_suffix = f"(tx_id: {processed_tx_id}, retry_task_id: {retry_task.retry_task_id})"
+
+    campaign = _get_campaign(db_session, task_params["retailer_slug"], task_params["campaign_slug"])
+    if campaign.status in (CampaignStatuses.ENDED, CampaignStatuses.CANCELLED):
+        retry_task.update_task(db_session, status=RetryTaskStatuses.CANCELLED, clear_next_attempt_time=True)
+        return
+
+    task_context.ensure_tokens()
+    try:
+        _adjust_balance(task_context, campaign, log_suffix)
+    except Exception:
+        # keeps the audits of the requests that succeeded before the failure
+        task_context.commit_response_audits()
+        raise
 
     retry_task.update_task(db_session, status=RetryTaskStatuses.SUCCESS, clear_next_attempt_time=True)
@@ -0,0 +1,119 @@
+import signal
+
+from threading import Thread
+from types import FrameType
+from uuid import uuid4
+
+from retry_tasks_lib.utils.error_handler import job_meta_handler
+from rq import SimpleWorker
+from rq.scheduler import RQScheduler
+from rq.timeouts import BaseDeathPenalty, TimerDeathPenalty
+
+from vela.core.config import redis_raw, settings
+
+from . import logger, requests_session_manager
+
+
+class ThreadWorker(SimpleWorker):
+    """
+    A SimpleWorker run in a thread of a ThreadPoolWorker.
+
+    Jobs run in the worker's thread and time out with a timer instead of SIGALRM, signals are only received by the
+    main thread so the pool handles them and asks every worker to stop.
+    """
+
+    # rq types BaseWorker.death_penalty_class as type[UnixSignalDeathPenalty], though any BaseDeathPenalty works
+    death_penalty_class: type[BaseDeathPenalty] = TimerDeathPenalty  # type: ignore [assignment]
+    # blocking dequeues are kept short so that an idle worker notices a stop request quickly
+    idle_dequeue_timeout = 5
+
+    @property
+    def dequeue_timeout(self) -> int:
+        return min(self.idle_dequeue_timeout, super().dequeue_timeout)
+
+    def _install_signal_handlers(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        """Warm shutdown: the current job, if any, is completed before leaving the work loop."""
+        self._stop_requested = True
+
+
+class ThreadPoolWorker:
+    """
+    Runs `concurrency` ThreadWorkers in the current process, all consuming the same queues.
+
+    The task functions block on the pooled requests session and on their own database sessions, so running them in
+    threads lets a single process have several tasks in flight. retryable_task still locks each retry task row, so a
+    task is never run twice at the same time.
+
+    The rq scheduler runs in a process forked from the pool's main thread before the worker threads are started, as a
+    process forked while other threads run can inherit locks held by them. Unlike a forking worker, the pool doesn't
+    take the scheduler over later on if another process held its locks at start up.
+    """
+
+    def __init__(self, queues: list[str], concurrency: int) -> None:
+        self.queues = queues
+        self.scheduler: RQScheduler | None = None
+        name = uuid4().hex
+        self.workers = [
+            ThreadWorker(
+                queues=queues,
+                name=f"{name}-{i}",
+                connection=redis_raw,
+                log_job_description=True,
+                exception_handlers=[job_meta_handler],
+            )
+            for i in range(concurrency)
+        ]
+
+    def _request_stop(self, signum: int, frame: FrameType | None) -> None:  # noqa: ARG002
+        logger.info("Got signal %s, stopping task workers after their current jobs...", signal.Signals(signum).name)
+        for worker in self.workers:
+            worker.stop()
+
+    def _start_scheduler(self, burst: bool) -> None:
+        self.scheduler = RQScheduler(self.queues, connection=redis_raw)
+        self.scheduler.acquire_locks()
+        if not self.scheduler.acquired_locks:
+            return
+
+        if burst:
+            self.scheduler.enqueue_scheduled_jobs()
+            self.scheduler.release_locks()
+        else:
+            self.scheduler.start()
+
+    def _stop_scheduler(self) -> None:
+        if self.scheduler and self.scheduler._process and self.scheduler._process.is_alive():
+            self.scheduler._process.terminate()
+            self.scheduler._process.join()
+
+    def work(self, burst: bool = False, with_scheduler: bool = False) -> None:
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGTERM, self._request_stop)
+
+        if with_scheduler:
+            self._start_scheduler(burst)
+
+        threads = [
+            Thread(target=worker.work, kwargs={"burst": burst, "with_scheduler": False}, name=worker.name)
+            for worker in self.workers
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            for thread in threads:
+                thread.join()
+        finally:
+            self._stop_scheduler()
+            requests_session_manager.close()
+
+
+def run_thread_pool_worker(burst: bool = False, concurrency: int | None = None) -> None:
+    concurrency = concurrency or settings.TASK_WORKER_CONCURRENCY
+    # the TASK_QUEUES validator fills in the default queues as a generator, which the first worker would exhaust
+    queues = list(settings.TASK_QUEUES or ())
+    logger.info("Starting %d threaded task workers...", concurrency)
+    ThreadPoolWorker(queues=queues, concurrency=concurrency).work(burst=burst, with_scheduler=True)